@@ -3,6 +3,8 @@ from dotenv import load_dotenv
 # Load .env for local dev (no-op if file doesn't exist, e.g. on Cloud Run)
 load_dotenv()
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -10,11 +12,31 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
+from reusable_components import cache_invalidation, email_notification_helper, email_outbox
+from reusable_components.http_client import close_http_client, start_http_client
 from routers import course_router, sponsor_router, enrollment_router, zoho_router, email_router, staff_router, pdf_router, address_router, otp_router, student_router, init_router, instructor_application_router, tesda_router
 
 limiter = Limiter(key_func=get_remote_address)
 
-app = FastAPI(title="Training Center API")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Clear in-process caches when another instance invalidates them
+    cache_invalidation.start_listener()
+    # Pooled keep-alive connections for every Zoho call
+    await start_http_client()
+    # Zoho Mail token and account ID, fetched once rather than by the first email
+    await email_notification_helper.warm_up()
+    # Deliver queued emails in the background
+    email_outbox.start_dispatcher()
+    yield
+    await email_outbox.stop_dispatcher()
+    await enrollment_router.flush_email_logs()
+    await close_http_client()
+    cache_invalidation.stop_listener()
+
+
+app = FastAPI(title="Training Center API", lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -0,0 +1,71 @@
+"""
+Compact, content-addressed address bundle for client-side resolution.
+
+The whole location hierarchy (with districts) is packed once at import into
+an interned string table plus nested index arrays, then gzip-compressed.
+Clients fetch it from a URL that carries its content hash, cache it forever
+and resolve regions, provinces, cities and barangays locally.
+
+Format (all names are indices into `strings`):
+
+    {
+      "format": 1,
+      "version": "<hash>",
+      "strings": ["Region IX (Zamboanga Peninsula)", "Zamboanga del Norte", ...],
+      "regions": [
+        [region, [
+          [province, [
+            [city, district, [barangay, ...]],
+            ...
+          ]],
+          ...
+        ]],
+        ...
+      ]
+    }
+
+`district` points at "" when a city has none.
+"""
+
+import gzip
+import hashlib
+import json
+
+BUNDLE_FORMAT = 1
+
+
+def build_bundle(locations: dict, districts: dict, regions: list[str]) -> dict:
+    """Pack `regions` of the hierarchy; returns version, JSON bytes and gzip bytes."""
+    strings: list[str] = []
+    ids: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in ids:
+            ids[value] = len(strings)
+            strings.append(value)
+        return ids[value]
+
+    packed = []
+    for region in regions:
+        provinces = []
+        for province, cities in locations[region].items():
+            district_map = districts.get(province, {})
+            provinces.append([intern(province), [
+                [intern(city), intern(district_map.get(city, "")), [intern(b) for b in barangays]]
+                for city, barangays in cities.items()
+            ]])
+        packed.append([intern(region), provinces])
+
+    body = {"strings": strings, "regions": packed}
+    version = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    raw = json.dumps(
+        {"format": BUNDLE_FORMAT, "version": version, **body},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return {
+        "version": version,
+        "json": raw,
+        # mtime=0 keeps the compressed bytes identical across instances
+        "gzip": gzip.compress(raw, compresslevel=9, mtime=0),
+    }
@@ -0,0 +1,136 @@
+"""
+In-memory typeahead over the bundled address data.
+
+Every region, province, city and barangay is indexed under its normalized
+name (accents, case and punctuation folded, so "pinan" finds "Piñan") and
+under each later word of the name ("miguel" finds "San Miguel"). Keys are
+kept in sorted arrays, one pair per level, so a prefix query is a bisect
+plus a short forward scan.
+
+Results are ranked by level (region, province, city, barangay), then
+whole-name before later-word matches, then alphabetically. When a query
+of FUZZY_MIN_LENGTH+ characters has fewer than `limit` prefix matches, the
+variants of the query one edit away (delete, transpose, replace, insert)
+that are a prefix of some key are searched too, ranked the same way after
+the exact matches. Variants are generated by walking a trie of key
+prefixes, so only edits that can still lead to a key are ever built.
+
+Usage:
+    index = build_search_index(locations, districts)
+    results = search(index, "zambo", limit=10)
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+
+LEVELS = ("region", "province", "city", "barangay")
+FUZZY_MIN_LENGTH = 4
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lower-case ASCII words: accents dropped, punctuation folded to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.lower()).strip()
+
+
+def build_search_index(locations: dict, districts: dict) -> dict:
+    records: list[dict] = []
+    pairs = {(level, later): [] for level in LEVELS for later in (False, True)}
+
+    def add(level: str, name: str, **where):
+        idx = len(records)
+        records.append({"type": level, "name": name, **where})
+        words = normalize(name).split(" ")
+        pairs[(level, False)].append((" ".join(words), idx))
+        for i in range(1, len(words)):
+            pairs[(level, True)].append((" ".join(words[i:]), idx))
+
+    for region, provinces in locations.items():
+        add("region", region)
+        for province, cities in provinces.items():
+            add("province", province, region=region)
+            district_map = districts.get(province, {})
+            for city, barangays in cities.items():
+                where = {"region": region, "province": province, "city": city,
+                         "district": district_map.get(city, "")}
+                add("city", city, **{k: v for k, v in where.items() if k != "city"})
+                for barangay in barangays:
+                    add("barangay", barangay, **where)
+
+    # Rank order: each level's whole-name keys, then its later-word keys
+    arrays = []
+    for key in ((level, later) for level in LEVELS for later in (False, True)):
+        entries = sorted(pairs[key])
+        arrays.append(([k for k, _ in entries], [i for _, i in entries]))
+
+    # Trie of key prefixes, flattened: prefix -> characters that can follow it
+    trie: dict[str, set[str]] = {"": set()}
+    for keys, _ in arrays:
+        for k in keys:
+            for n in range(len(k)):
+                trie.setdefault(k[:n], set()).add(k[n])
+            trie.setdefault(k, set())
+
+    return {
+        "records": records,
+        "arrays": arrays,
+        "trie": {prefix: "".join(sorted(chars)) for prefix, chars in trie.items()},
+    }
+
+
+def _one_edit_variants(q: str, trie: dict[str, str]) -> set[str]:
+    """Strings one edit from q that are a prefix of some key."""
+    variants = set()
+    for i in range(len(q)):
+        head = q[:i]
+        if head not in trie:
+            break  # no key continues past here, so later edits cannot help
+        rest = q[i + 1:]
+        variants.add(head + rest)  # delete
+        if rest:
+            variants.add(head + rest[0] + q[i] + rest[1:])  # transpose
+        for c in trie[head]:
+            variants.add(head + c + rest)  # replace
+            # Insert (appending at the end is already covered by prefix matching)
+            variants.add(head + c + q[i:])
+    variants.discard(q)
+    return {v for v in variants if v in trie and v.strip()}
+
+
+def _scan(index: dict, prefixes: list[str], match: str, seen: set[int], results: list[dict], limit: int):
+    """Append records under any of `prefixes`, in rank order, until `limit` results."""
+    records = index["records"]
+    for keys, ids in index["arrays"]:
+        candidates = []
+        for prefix in prefixes:
+            i = bisect_left(keys, prefix)
+            found = 0
+            while i < len(keys) and found < limit and keys[i].startswith(prefix):
+                if ids[i] not in seen:
+                    candidates.append((keys[i], ids[i]))
+                    found += 1
+                i += 1
+        for _, idx in sorted(candidates):
+            if len(results) >= limit:
+                return
+            if idx not in seen:
+                seen.add(idx)
+                results.append({**records[idx], "match": match})
+
+
+def search(index: dict, query: str, limit: int = 10) -> list[dict]:
+    """Ranked address matches for a typeahead query."""
+    q = normalize(query)
+    if not q or limit <= 0:
+        return []
+    seen: set[int] = set()
+    results: list[dict] = []
+
+    _scan(index, [q], "prefix", seen, results, limit)
+    if len(results) < limit and len(q) >= FUZZY_MIN_LENGTH:
+        _scan(index, list(_one_edit_variants(q, index["trie"])), "fuzzy", seen, results, limit)
+    return results
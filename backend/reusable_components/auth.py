@@ -36,16 +36,10 @@ def create_applicant_jwt(email: str, name: str = "", enrollment_ids: list = None
     return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
-def verify_jwt(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    token = credentials.credentials
+def decode_jwt(token: str) -> dict:
+    """Decode a session JWT (admin or applicant), raising 401 if it is invalid or expired."""
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        if payload.get("role") == "applicant":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Applicant tokens cannot access admin endpoints",
-            )
-        return payload
+        return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,27 +52,25 @@ def verify_jwt(credentials: HTTPAuthorizationCredentials = Depends(security)) ->
         )
 
 
-def verify_applicant_jwt(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """Verify a JWT and ensure it has the 'applicant' role."""
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        if payload.get("role") != "applicant":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not an applicant token",
-            )
-        return payload
-    except jwt.ExpiredSignatureError:
+def verify_jwt(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    payload = decode_jwt(credentials.credentials)
+    if payload.get("role") == "applicant":
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Applicant tokens cannot access admin endpoints",
         )
-    except jwt.InvalidTokenError:
+    return payload
+
+
+def verify_applicant_jwt(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Verify a JWT and ensure it has the 'applicant' role."""
+    payload = decode_jwt(credentials.credentials)
+    if payload.get("role") != "applicant":
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not an applicant token",
         )
+    return payload
 
 
 def refresh_jwt(payload: dict) -> str:
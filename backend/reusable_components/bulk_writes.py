@@ -0,0 +1,117 @@
+"""
+Bulk multi-document writes.
+
+Multi-document transitions (closing a batch's enrollment, changing a
+student's email, reordering sponsors, ...) queue their writes on a
+BulkMutation instead of issuing one round trip per document. On commit the
+writes are packed into WriteBatches of at most 500 operations and the
+batches are committed in parallel.
+
+All writes queued for the same document (e.g. an update plus its changelog
+entries) are kept in one batch, so every document is either fully updated
+or untouched. When a batch fails, its documents are retried one by one so
+the result names exactly which documents could not be written.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from reusable_components.changelog import stage_changelog, with_status_stamp
+from reusable_components.firebase import db
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_WRITES = 500
+DEFAULT_MAX_WORKERS = 8
+
+
+class BulkMutation:
+    """Collects per-document writes and commits them in chunked, parallel batches."""
+
+    def __init__(self):
+        # doc path -> (doc_ref, [callable(batch)], write count)
+        self._groups: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def _add(self, doc_ref, op, writes: int):
+        ref, ops, count = self._groups.get(doc_ref.path, (doc_ref, [], 0))
+        if count + writes > MAX_BATCH_WRITES:
+            raise ValueError(f"Too many writes queued for {doc_ref.path} (max {MAX_BATCH_WRITES})")
+        ops.append(op)
+        self._groups[doc_ref.path] = (ref, ops, count + writes)
+
+    def update(self, doc_ref, updates: dict, entries: list[dict] | None = None):
+        """Queue an update, with optional changelog entries written alongside it."""
+        entries = entries or []
+        fields = with_status_stamp(updates, entries)
+
+        def op(batch):
+            batch.update(doc_ref, fields)
+            stage_changelog(batch, doc_ref, entries)
+
+        self._add(doc_ref, op, 1 + len(entries))
+
+    def set(self, doc_ref, data: dict, merge: bool = False):
+        self._add(doc_ref, lambda batch: batch.set(doc_ref, data, merge=merge), 1)
+
+    def delete(self, doc_ref):
+        self._add(doc_ref, lambda batch: batch.delete(doc_ref), 1)
+
+    def _chunks(self) -> list[list[tuple]]:
+        chunks, current, current_writes = [], [], 0
+        for group in self._groups.values():
+            writes = group[2]
+            if current and current_writes + writes > MAX_BATCH_WRITES:
+                chunks.append(current)
+                current, current_writes = [], 0
+            current.append(group)
+            current_writes += writes
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _commit_groups(groups: list[tuple]):
+        batch = db.batch()
+        for _ref, ops, _count in groups:
+            for op in ops:
+                op(batch)
+        batch.commit()
+
+    def _commit_chunk(self, groups: list[tuple]) -> tuple[list[str], list[dict]]:
+        try:
+            self._commit_groups(groups)
+            return [ref.id for ref, _ops, _count in groups], []
+        except Exception as e:
+            if len(groups) == 1:
+                logger.warning("Bulk write failed for %s: %s", groups[0][0].path, e)
+                return [], [{"id": groups[0][0].id, "path": groups[0][0].path, "error": str(e)}]
+
+        # Isolate the failing documents
+        succeeded, failed = [], []
+        for group in groups:
+            ok, errors = self._commit_chunk([group])
+            succeeded += ok
+            failed += errors
+        return succeeded, failed
+
+    def commit(self, max_workers: int = DEFAULT_MAX_WORKERS) -> dict:
+        """Commit all queued writes. Returns {"succeeded": [doc ids], "failed": [{id, path, error}]}."""
+        chunks = self._chunks()
+        self._groups = {}
+        if not chunks:
+            return {"succeeded": [], "failed": []}
+
+        if len(chunks) == 1:
+            results = [self._commit_chunk(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                results = list(pool.map(self._commit_chunk, chunks))
+
+        succeeded, failed = [], []
+        for ok, errors in results:
+            succeeded += ok
+            failed += errors
+        return {"succeeded": succeeded, "failed": failed}
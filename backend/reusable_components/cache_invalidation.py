@@ -0,0 +1,88 @@
+"""
+Cross-instance cache invalidation.
+
+In-process caches (see ttl_cache.py) only live in the Cloud Run instance
+that filled them. When an admin write invalidates a cache, publish() clears
+it locally and bumps `cache_versions/{name}`; every instance keeps one
+on_snapshot listener on that small collection and clears its own copy as
+soon as a version changes, so stale course dates, prices and sponsors are
+gone within seconds everywhere instead of after the TTL.
+
+Routers register a local clear function per cache name with
+on_invalidate(); main.py starts the listener at startup.
+"""
+
+import logging
+import uuid
+from typing import Callable
+
+from firebase_admin import firestore
+
+from reusable_components.firebase import db
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSIONS_COLLECTION = "cache_versions"
+
+# Lets an instance skip the echo of its own invalidations
+INSTANCE_ID = uuid.uuid4().hex
+
+_handlers: dict[str, Callable[[], None]] = {}
+_watch = None
+_initial_snapshot_seen = False
+
+
+def on_invalidate(name: str, handler: Callable[[], None]):
+    """Register the function that clears this instance's copy of cache `name`."""
+    _handlers[name] = handler
+
+
+def publish(name: str):
+    """Clear cache `name` here and signal every other instance to clear theirs."""
+    _handlers[name]()
+    try:
+        db.collection(CACHE_VERSIONS_COLLECTION).document(name).set({
+            "version": firestore.Increment(1),
+            "source": INSTANCE_ID,
+            "updated_at": firestore.SERVER_TIMESTAMP,
+        }, merge=True)
+    except Exception as e:
+        # Other instances fall back to their TTL
+        logger.warning("Failed to publish invalidation for cache %s: %s", name, e)
+
+
+def _on_snapshot(_docs, changes, _read_time):
+    global _initial_snapshot_seen
+    # The first callback lists every existing document as ADDED; nothing has changed yet
+    if not _initial_snapshot_seen:
+        _initial_snapshot_seen = True
+        return
+    for change in changes:
+        if change.type.name == "REMOVED":
+            continue
+        doc = change.document
+        if (doc.to_dict() or {}).get("source") == INSTANCE_ID:
+            continue
+        handler = _handlers.get(doc.id)
+        if handler:
+            logger.info("Cache %s invalidated by another instance", doc.id)
+            handler()
+
+
+def start_listener():
+    """Start listening for invalidations (idempotent)."""
+    global _watch, _initial_snapshot_seen
+    if _watch is not None:
+        return
+    _initial_snapshot_seen = False
+    try:
+        _watch = db.collection(CACHE_VERSIONS_COLLECTION).on_snapshot(_on_snapshot)
+    except Exception as e:
+        logger.warning("Cache invalidation listener not started: %s", e)
+
+
+def stop_listener():
+    global _watch
+    if _watch is not None:
+        _watch.unsubscribe()
+        _watch = None
@@ -0,0 +1,106 @@
+"""
+Append-only changelog stored as a subcollection.
+
+Each document (enrollment, instructor application, ...) keeps its history in
+`{doc}/changelog/{entry_id}` instead of an ever-growing `changelog` array on
+the parent. Entries are written in the same WriteBatch/transaction as the
+mutation they describe, so a write never has to read or rewrite the history.
+
+Entry IDs sort chronologically (`{updatedAt}-{seq}-{suffix}`), so the default
+document-ID index is enough to page through history in order.
+
+Documents written before the migration may still carry a legacy `changelog`
+array; readers merge it in until scripts/migrate_changelog_subcollection.py
+has moved it.
+"""
+
+import uuid
+
+from fastapi import HTTPException
+from firebase_admin import firestore
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from reusable_components.firebase import async_db, db
+
+CHANGELOG_SUBCOLLECTION = "changelog"
+DEFAULT_PAGE_SIZE = 50
+LEGACY_CURSOR = "legacy"
+
+
+def changelog_entry_id(entry: dict, seq: int, suffix: str | None = None) -> str:
+    """Chronologically sortable entry ID."""
+    updated_at = entry.get("updatedAt", "")
+    if hasattr(updated_at, "isoformat"):
+        updated_at = updated_at.isoformat()
+    return f"{updated_at}-{seq:03d}-{suffix or uuid.uuid4().hex[:8]}"
+
+
+def stage_changelog(writer, doc_ref, entries: list[dict]):
+    """Add changelog entry writes to a WriteBatch or Transaction (sync or async)."""
+    col = doc_ref.collection(CHANGELOG_SUBCOLLECTION)
+    for seq, entry in enumerate(entries):
+        writer.set(col.document(changelog_entry_id(entry, seq)), entry)
+
+
+def with_status_stamp(updates: dict, entries: list[dict]) -> dict:
+    """Denormalize the latest status change onto the parent document."""
+    if any(entry.get("field") == "status" for entry in entries):
+        updates["status_changed_at"] = firestore.SERVER_TIMESTAMP
+    return updates
+
+
+def update_with_changelog(doc_ref, updates: dict, entries: list[dict]):
+    """Apply `updates` to a sync doc_ref and append `entries`, atomically."""
+    batch = db.batch()
+    batch.update(doc_ref, with_status_stamp(updates, entries))
+    stage_changelog(batch, doc_ref, entries)
+    batch.commit()
+
+
+async def update_with_changelog_async(doc_ref, updates: dict, entries: list[dict]):
+    """Async variant of update_with_changelog() for AsyncDocumentReference."""
+    batch = async_db.batch()
+    batch.update(doc_ref, with_status_stamp(updates, entries))
+    stage_changelog(batch, doc_ref, entries)
+    await batch.commit()
+
+
+def _serialize(entry: dict) -> dict:
+    if hasattr(entry.get("updatedAt"), "isoformat"):
+        entry["updatedAt"] = entry["updatedAt"].isoformat()
+    return entry
+
+
+def read_changelog(doc_ref, legacy: list | None = None) -> list[dict]:
+    """Full history, oldest first (legacy array entries, then subcollection)."""
+    col = doc_ref.collection(CHANGELOG_SUBCOLLECTION)
+    entries = [_serialize(dict(e)) for e in (legacy or [])]
+    entries += [_serialize(doc.to_dict()) for doc in col.order_by(FieldPath.document_id()).stream()]
+    return entries
+
+
+def read_changelog_page(doc_ref, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                        legacy: list | None = None) -> tuple[list[dict], str | None]:
+    """One page of history, newest first. Returns (entries, next_cursor).
+
+    An unmigrated legacy array is served as one final page after the subcollection.
+    """
+    legacy_page = [_serialize(dict(e)) for e in reversed(legacy or [])]
+    if cursor == LEGACY_CURSOR:
+        return legacy_page, None
+
+    col = doc_ref.collection(CHANGELOG_SUBCOLLECTION)
+    query = col.order_by(FieldPath.document_id(), direction=firestore.Query.DESCENDING)
+    if cursor:
+        cursor_doc = col.document(cursor).get()
+        if not cursor_doc.exists:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.start_after(cursor_doc)
+    docs = list(query.limit(limit + 1).stream())
+
+    entries = [_serialize(doc.to_dict()) for doc in docs[:limit]]
+    if len(docs) > limit:
+        return entries, docs[limit - 1].id
+    if legacy_page:
+        return (entries, LEGACY_CURSOR) if entries else (legacy_page, None)
+    return entries, None
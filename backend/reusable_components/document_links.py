@@ -0,0 +1,69 @@
+"""
+Stable links to stored documents.
+
+Detail endpoints used to sign a GCS URL for every stored file on every read.
+They now return a link to GET /api/documents/{enrollment_id}/{doc_type}/{slot}/open
+instead, which signs a single URL when the file is actually opened and
+redirects to it.
+
+Links are opened from plain <a href> tags, which cannot send the Bearer
+header, so each link carries a short-lived token scoped to that one file.
+The token is an HMAC computed locally (no network round trip) with a key
+derived from JWT_SECRET_KEY, so it can never be used as a session JWT.
+"""
+
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+import jwt
+
+from reusable_components.auth import JWT_ALGORITHM, JWT_SECRET_KEY
+
+DOCUMENT_LINK_EXPIRY_MINUTES = 60
+SUPPORTING_DOC_TYPE = "supporting"
+DOCUMENT_SLOTS = ("applicant_upload", "official_scan")
+
+_LINK_KEY = f"{JWT_SECRET_KEY}:document_link"
+
+
+def _resource(enrollment_id: str, doc_type: str, slot: str) -> str:
+    return f"{enrollment_id}/{doc_type}/{slot}"
+
+
+def document_link(enrollment_id: str, doc_type: str, slot: str) -> str:
+    """Root-relative open URL for one stored file, valid for DOCUMENT_LINK_EXPIRY_MINUTES."""
+    now = datetime.now(timezone.utc)
+    token = jwt.encode({
+        "doc": _resource(enrollment_id, doc_type, slot),
+        "exp": now + timedelta(minutes=DOCUMENT_LINK_EXPIRY_MINUTES),
+        "iat": now,
+    }, _LINK_KEY, algorithm=JWT_ALGORITHM)
+    path = "/".join(quote(part, safe="") for part in (enrollment_id, doc_type, slot))
+    return f"/api/documents/{path}/open?token={token}"
+
+
+def verify_document_link(token: str, enrollment_id: str, doc_type: str, slot: str) -> bool:
+    try:
+        payload = jwt.decode(token, _LINK_KEY, algorithms=[JWT_ALGORITHM])
+    except jwt.InvalidTokenError:
+        return False
+    return payload.get("doc") == _resource(enrollment_id, doc_type, slot)
+
+
+def attach_document_links(enrollment_id: str, documents: dict) -> dict:
+    """Set file_url on every filled document slot to its open link."""
+    for doc_type, doc_data in documents.items():
+        for slot_key in DOCUMENT_SLOTS:
+            slot = doc_data.get(slot_key)
+            if slot and slot.get("gcs_path"):
+                slot["file_url"] = document_link(enrollment_id, doc_type, slot_key)
+    return documents
+
+
+def attach_supporting_links(enrollment_id: str, supporting: list[dict]) -> list[dict]:
+    """Set file_url on supporting documents (keyed by their GCS file name)."""
+    for entry in supporting:
+        if entry.get("gcs_path"):
+            file_key = entry["gcs_path"].rsplit("/", 1)[-1]
+            entry["file_url"] = document_link(enrollment_id, SUPPORTING_DOC_TYPE, file_key)
+    return supporting
@@ -1,8 +1,13 @@
+import asyncio
 import logging
 import os
+import time
+from datetime import datetime, timedelta, timezone
 
 import httpx
 
+from reusable_components.http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 ENVIRONMENT = os.getenv("ENVIRONMENT", "dev")
@@ -16,19 +21,48 @@ ZOHO_MAIL_CLIENT_ID = os.getenv("ZOHO_MAIL_SELF_CLIENT_ID", "")
 ZOHO_MAIL_CLIENT_SECRET = os.getenv("ZOHO_MAIL_SELF_SECRET_ID", "")
 ZOHO_MAIL_REFRESH_TOKEN = os.getenv("ZOHO_MAIL_REFRESH_TOKEN", "")
 
-ZOHO_TOKEN_URL = "https://accounts.zoho.com/oauth/v2/token"
-ZOHO_MAIL_API = "https://mail.zoho.com/api"
+# Overridable so local runs can use scripts/fake_zoho.py instead of Zoho
+ZOHO_ACCOUNTS_URL = os.getenv("ZOHO_ACCOUNTS_URL", "https://accounts.zoho.com")
+ZOHO_TOKEN_URL = f"{ZOHO_ACCOUNTS_URL}/oauth/v2/token"
+ZOHO_MAIL_API = os.getenv("ZOHO_MAIL_API_URL", "https://mail.zoho.com/api")
+
+# Refresh this long before Zoho's expires_in so no request goes out with a dying token
+TOKEN_REFRESH_MARGIN_SECONDS = 300
 
 # In-memory cache (lives for Cloud Run instance lifetime)
 _access_token: str | None = None
+_token_expires_at = 0.0  # time.monotonic() deadline for _access_token
 _account_id: str | None = None
 
+# Single-flight guards: concurrent callers wait for one refresh/lookup instead of each starting their own
+_token_lock = asyncio.Lock()
+_account_lock = asyncio.Lock()
+
+
+def _refresh_after(token_data: dict) -> int:
+    """Seconds until a token should be refreshed: expires_in minus the margin (at most half its life)."""
+    lifetime = int(token_data.get("expires_in") or 3600)
+    return lifetime - min(TOKEN_REFRESH_MARGIN_SECONDS, lifetime // 2)
+
+
+def zoho_token_expiry(token_data: dict) -> datetime:
+    """When a token from Zoho's token endpoint should be refreshed."""
+    return datetime.now(timezone.utc) + timedelta(seconds=_refresh_after(token_data))
 
-async def _refresh_access_token() -> str:
-    """Exchange refresh token for a new access token."""
-    global _access_token
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
+
+async def _refresh_access_token(stale_token: str | None = None) -> str:
+    """Exchange the refresh token for a new access token, once for all concurrent callers.
+
+    stale_token is the token the caller saw fail (or expire); if another
+    caller already replaced it while this one waited for the lock, the new
+    token is returned without another request to Zoho.
+    """
+    global _access_token, _token_expires_at
+    async with _token_lock:
+        if _access_token and _access_token != stale_token and time.monotonic() < _token_expires_at:
+            return _access_token
+
+        response = await get_http_client().post(
             ZOHO_TOKEN_URL,
             data={
                 "grant_type": "refresh_token",
@@ -37,38 +71,52 @@ async def _refresh_access_token() -> str:
                 "refresh_token": ZOHO_MAIL_REFRESH_TOKEN,
             },
         )
-    data = response.json()
-    if "error" in data:
-        logger.error("Zoho token refresh failed: %s", data)
-        raise RuntimeError(f"Zoho token refresh failed: {data.get('error')}")
+        data = response.json()
+        if "error" in data:
+            logger.error("Zoho token refresh failed: %s", data)
+            raise RuntimeError(f"Zoho token refresh failed: {data.get('error')}")
 
-    _access_token = data["access_token"]
-    return _access_token
+        _access_token = data["access_token"]
+        _token_expires_at = time.monotonic() + _refresh_after(data)
+        return _access_token
 
 
 async def _get_account_id() -> str:
-    """Fetch and cache the Zoho Mail account ID."""
+    """Fetch and cache the Zoho Mail account ID (warm_up() does this at startup)."""
     global _account_id
     if _account_id:
         return _account_id
 
-    token = await _get_access_token()
-    response = await _make_request("get", f"{ZOHO_MAIL_API}/accounts", token=token)
-    data = response.json()
+    async with _account_lock:
+        if _account_id:
+            return _account_id
+        response = await _make_request("get", f"{ZOHO_MAIL_API}/accounts")
+        data = response.json()
 
-    accounts = data if isinstance(data, list) else data.get("data", [])
-    if not accounts:
-        raise RuntimeError("No Zoho Mail accounts found")
+        accounts = data if isinstance(data, list) else data.get("data", [])
+        if not accounts:
+            raise RuntimeError("No Zoho Mail accounts found")
 
-    _account_id = accounts[0]["accountId"]
-    return _account_id
+        _account_id = accounts[0]["accountId"]
+        return _account_id
 
 
 async def _get_access_token() -> str:
-    """Return cached access token or refresh it."""
-    if _access_token:
+    """Return the cached access token, refreshing it ahead of expiry."""
+    if _access_token and time.monotonic() < _token_expires_at:
         return _access_token
-    return await _refresh_access_token()
+    return await _refresh_access_token(stale_token=_access_token)
+
+
+async def warm_up():
+    """Fetch the access token and account ID at startup so the first email doesn't pay for them."""
+    if not ZOHO_MAIL_REFRESH_TOKEN:
+        return
+    try:
+        await _get_account_id()
+    except Exception as e:
+        # Retried lazily on the first send
+        logger.warning("Zoho Mail warm-up failed: %s", e)
 
 
 async def _make_request(method: str, url: str, token: str | None = None, **kwargs) -> httpx.Response:
@@ -76,27 +124,48 @@ async def _make_request(method: str, url: str, token: str | None = None, **kwarg
     if not token:
         token = await _get_access_token()
 
+    client = get_http_client()
     headers = {"Authorization": f"Zoho-oauthtoken {token}"}
-    async with httpx.AsyncClient() as client:
-        response = await getattr(client, method)(url, headers=headers, **kwargs)
+    response = await client.request(method, url, headers=headers, **kwargs)
 
     if response.status_code == 401:
-        new_token = await _refresh_access_token()
+        new_token = await _refresh_access_token(stale_token=token)
         headers = {"Authorization": f"Zoho-oauthtoken {new_token}"}
-        async with httpx.AsyncClient() as client:
-            response = await getattr(client, method)(url, headers=headers, **kwargs)
+        response = await client.request(method, url, headers=headers, **kwargs)
 
     return response
 
 
-async def send_email(to: str, subject: str, html_content: str, from_email: str = "noreply@brighthii.com") -> dict:
+async def send_email(
+    to: str,
+    subject: str,
+    html_content: str,
+    from_email: str = "noreply@brighthii.com",
+    idempotency_key: str | None = None,
+    hook: tuple[str, dict] | None = None,
+    max_age: timedelta | None = None,
+) -> str:
     """
-    Send an email via Zoho Mail API.
+    Queue an email for background delivery (see email_outbox).
 
     Args:
         to: Recipient email address
         subject: Email subject line
         html_content: HTML body content
+        idempotency_key: Queue at most one email per key
+        hook: (name, payload) of an email_outbox.on_delivered handler to run once sent
+        max_age: Give up (dead-letter) if not delivered within this time
+
+    Returns:
+        Outbox job id
+    """
+    from reusable_components.email_outbox import enqueue_email
+    return await enqueue_email(to, subject, html_content, from_email, idempotency_key=idempotency_key, hook=hook, max_age=max_age)
+
+
+async def deliver_email(to: str, subject: str, html_content: str, from_email: str = "noreply@brighthii.com") -> dict:
+    """
+    Send an email via Zoho Mail API now (the outbox dispatcher calls this).
 
     Returns:
         Zoho API response data
@@ -0,0 +1,372 @@
+"""
+Durable email outbox.
+
+send_email() (email_notification_helper) does not call Zoho inline any more:
+it writes a job to `email_outbox` and returns, so Zoho latency and outages
+never reach the request that triggered the email. A dispatcher started in
+the app lifespan claims due jobs, delivers them with deliver_email() and
+then runs the job's delivery hook (e.g. appending to an enrollment's
+emails_sent), so nothing is recorded as sent before Zoho accepted it.
+
+Job lifecycle:
+
+    pending --claim--> sending --delivered--> sent
+       ^                  |
+       +----- retry ------+--- MAX_ATTEMPTS failures ---> dead
+
+Claiming is a transaction that flips the job to `sending` and pushes
+next_attempt_at out by LEASE_SECONDS. If an instance dies mid-send the job
+becomes claimable again when the lease runs out, so delivery is
+at-least-once. Failed attempts back off exponentially; `dead` jobs stay in
+the collection (dead letters) until requeue() is called.
+
+Enqueueing with an idempotency_key stores the job under a hash of that key,
+and enqueueing the same key again is a no-op. Enqueueing with a max_age
+(e.g. OTP codes) sets deliver_by; a job still undelivered by then goes
+straight to `dead` instead of being retried.
+
+The body (html_content) is cleared once a job is sent or has expired, and
+every job carries expire_at, RETENTION after it was last queued. The
+collection has a Firestore TTL policy on expire_at
+(emulator-data/firestore.indexes.json fieldOverrides), which deletes old
+jobs, dead letters included.
+
+Jobs live in Firestore; EMAIL_OUTBOX_STORE=memory keeps them in process
+instead (local runs and tests). Jobs are only delivered while the
+dispatcher runs, i.e. inside the app, not in one-off scripts.
+
+The dispatcher is a background task, so on Cloud Run the backend service
+is deployed with CPU always allocated (--no-cpu-throttling) and
+--min-instances=1 (cloudbuild-*.yaml); with request-only CPU, queued jobs
+would stall until the next request. Every instance polls the queue (one
+query per POLL_SECONDS when idle); the claim transaction makes sure each
+job is sent by only one of them.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from google.api_core.exceptions import AlreadyExists
+from google.cloud.firestore import FieldFilter, async_transactional
+
+from reusable_components.firebase import async_db
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLLECTION = "email_outbox"
+
+MAX_ATTEMPTS = 6
+LEASE_SECONDS = 120
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+# Other instances' jobs and retries are picked up on this interval; local enqueues wake the dispatcher at once
+POLL_SECONDS = 15
+# Jobs are deleted by the Firestore TTL policy on expire_at this long after being queued
+RETENTION = timedelta(days=30)
+DISPATCH_BATCH = 20
+CONCURRENCY = 4
+
+_CLAIMABLE = ["pending", "sending"]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+# ── Stores ──
+
+
+class FirestoreOutboxStore:
+    def __init__(self, collection: str = OUTBOX_COLLECTION):
+        self.collection = collection
+
+    def _ref(self, job_id: str):
+        return async_db.collection(self.collection).document(job_id)
+
+    async def add(self, job_id: str, job: dict) -> bool:
+        try:
+            await self._ref(job_id).create(job)
+            return True
+        except AlreadyExists:
+            return False
+
+    async def due(self, now: datetime, limit: int) -> list[str]:
+        query = (
+            async_db.collection(self.collection)
+            .where(filter=FieldFilter("status", "in", _CLAIMABLE))
+            .where(filter=FieldFilter("next_attempt_at", "<=", now))
+            .order_by("next_attempt_at")
+            .limit(limit)
+        )
+        return [doc.id async for doc in query.stream()]
+
+    async def claim(self, job_id: str, now: datetime) -> dict | None:
+        doc_ref = self._ref(job_id)
+
+        @async_transactional
+        async def _run(transaction):
+            snapshot = await doc_ref.get(transaction=transaction)
+            job = snapshot.to_dict() if snapshot.exists else None
+            if not job or job.get("status") not in _CLAIMABLE or job["next_attempt_at"] > now:
+                return None
+            claimed = _claimed(job, now)
+            transaction.update(doc_ref, {k: claimed[k] for k in ("status", "attempts", "next_attempt_at")})
+            return claimed
+
+        return await _run(async_db.transaction())
+
+    async def get(self, job_id: str) -> dict | None:
+        snapshot = await self._ref(job_id).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    async def update(self, job_id: str, fields: dict):
+        await self._ref(job_id).update(fields)
+
+    async def list(self, status: str, limit: int) -> list[dict]:
+        query = (
+            async_db.collection(self.collection)
+            .where(filter=FieldFilter("status", "==", status))
+            .order_by("created_at", direction="DESCENDING")
+            .limit(limit)
+        )
+        return [{**doc.to_dict(), "id": doc.id} async for doc in query.stream()]
+
+
+class MemoryOutboxStore:
+    """In-process stand-in with the same behaviour (single event loop)."""
+
+    def __init__(self):
+        self.jobs: dict[str, dict] = {}
+
+    async def add(self, job_id: str, job: dict) -> bool:
+        if job_id in self.jobs:
+            return False
+        self.jobs[job_id] = dict(job)
+        return True
+
+    async def due(self, now: datetime, limit: int) -> list[str]:
+        ready = [
+            (job["next_attempt_at"], job_id) for job_id, job in self.jobs.items()
+            if job["status"] in _CLAIMABLE and job["next_attempt_at"] <= now
+        ]
+        return [job_id for _, job_id in sorted(ready)[:limit]]
+
+    async def claim(self, job_id: str, now: datetime) -> dict | None:
+        job = self.jobs.get(job_id)
+        if not job or job["status"] not in _CLAIMABLE or job["next_attempt_at"] > now:
+            return None
+        self.jobs[job_id] = _claimed(job, now)
+        return dict(self.jobs[job_id])
+
+    async def get(self, job_id: str) -> dict | None:
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def update(self, job_id: str, fields: dict):
+        self.jobs[job_id].update(fields)
+
+    async def list(self, status: str, limit: int) -> list[dict]:
+        matching = [{**job, "id": job_id} for job_id, job in self.jobs.items() if job["status"] == status]
+        return sorted(matching, key=lambda j: j["created_at"], reverse=True)[:limit]
+
+
+def _claimed(job: dict, now: datetime) -> dict:
+    return {
+        **job,
+        "status": "sending",
+        "attempts": job.get("attempts", 0) + 1,
+        "next_attempt_at": now + timedelta(seconds=LEASE_SECONDS),
+    }
+
+
+store = MemoryOutboxStore() if os.getenv("EMAIL_OUTBOX_STORE") == "memory" else FirestoreOutboxStore()
+
+
+# ── Delivery hooks ──
+
+_hooks: dict[str, Callable[[dict], Awaitable[None]]] = {}
+
+
+def on_delivered(name: str, handler: Callable[[dict], Awaitable[None]]):
+    """Register an async handler run with a job's hook payload after it is delivered."""
+    _hooks[name] = handler
+
+
+# ── Enqueue ──
+
+_wake: asyncio.Event | None = None
+
+
+async def enqueue_email(
+    to: str,
+    subject: str,
+    html_content: str,
+    from_email: str,
+    idempotency_key: str | None = None,
+    hook: tuple[str, dict] | None = None,
+    max_age: timedelta | None = None,
+) -> str:
+    """Persist an email for background delivery and return its job id.
+
+    With max_age, the email is dropped (dead-lettered) if it cannot be
+    delivered within that time.
+    """
+    if idempotency_key:
+        job_id = hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest()[:32]
+    else:
+        job_id = uuid.uuid4().hex
+    now = _now()
+    job = {
+        "to": to,
+        "subject": subject,
+        "html_content": html_content,
+        "from_email": from_email,
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+        "deliver_by": now + max_age if max_age else None,
+        "expire_at": now + RETENTION,
+        "idempotency_key": idempotency_key,
+        "hook": {"name": hook[0], "payload": hook[1]} if hook else None,
+    }
+    if not await store.add(job_id, job):
+        logger.info("Email %s already queued (idempotency key %s)", job_id, idempotency_key)
+    elif _wake is not None:
+        _wake.set()
+    return job_id
+
+
+async def requeue(job_id: str):
+    """Send a dead-lettered job through the outbox again."""
+    now = _now()
+    await store.update(job_id, {"status": "pending", "attempts": 0, "next_attempt_at": now, "expire_at": now + RETENTION})
+    if _wake is not None:
+        _wake.set()
+
+
+# ── Dispatcher ──
+
+_dispatcher: asyncio.Task | None = None
+_stopping = False
+_in_flight: set[str] = set()
+_tasks: set[asyncio.Task] = set()
+
+
+async def _process(job_id: str, slots: asyncio.Semaphore):
+    async with slots:
+        try:
+            await _deliver(job_id)
+        except Exception:
+            logger.exception("Outbox job %s failed unexpectedly", job_id)
+        finally:
+            _in_flight.discard(job_id)
+
+
+async def _deliver(job_id: str):
+    from reusable_components.email_notification_helper import deliver_email
+
+    job = await store.claim(job_id, _now())
+    if job is None:
+        return  # taken by another instance, or no longer due
+
+    deliver_by = job.get("deliver_by")
+    if deliver_by and _now() >= deliver_by:
+        logger.warning("Email %s to %s expired before delivery", job_id, job["to"])
+        await store.update(job_id, {
+            "status": "dead", "last_error": "Expired before delivery", "dead_at": _now(), "html_content": None,
+        })
+        return
+
+    try:
+        await deliver_email(job["to"], job["subject"], job["html_content"], job["from_email"])
+    except Exception as e:
+        next_attempt_at = _now() + _retry_delay(job["attempts"])
+        expired = bool(deliver_by) and next_attempt_at >= deliver_by
+        if job["attempts"] >= MAX_ATTEMPTS or expired:
+            logger.error("Email %s to %s dead after %d attempts: %s", job_id, job["to"], job["attempts"], e)
+            dead = {"status": "dead", "last_error": str(e), "dead_at": _now()}
+            if expired:
+                dead["html_content"] = None  # can never be delivered now
+            await store.update(job_id, dead)
+        else:
+            logger.warning("Email %s to %s failed (attempt %d): %s", job_id, job["to"], job["attempts"], e)
+            await store.update(job_id, {
+                "status": "pending",
+                "last_error": str(e),
+                "next_attempt_at": next_attempt_at,
+            })
+        return
+
+    # The body is only needed to send; don't keep it (OTP codes) once sent
+    await store.update(job_id, {"status": "sent", "sent_at": _now(), "html_content": None})
+
+    hook = job.get("hook")
+    if hook:
+        handler = _hooks.get(hook["name"])
+        if handler is None:
+            logger.warning("No delivery hook registered for %s", hook["name"])
+            return
+        try:
+            await handler(hook.get("payload") or {})
+        except Exception as e:
+            logger.warning("Delivery hook %s failed for email %s: %s", hook["name"], job_id, e)
+
+
+async def _dispatch_loop(concurrency: int):
+    slots = asyncio.Semaphore(concurrency)
+    while not _stopping:
+        _wake.clear()
+        try:
+            job_ids = await store.due(_now(), DISPATCH_BATCH)
+        except Exception as e:
+            logger.warning("Failed to poll email outbox: %s", e)
+            job_ids = []
+        for job_id in job_ids:
+            if job_id not in _in_flight:
+                _in_flight.add(job_id)
+                task = asyncio.create_task(_process(job_id, slots))
+                _tasks.add(task)
+                task.add_done_callback(_tasks.discard)
+        if len(job_ids) < DISPATCH_BATCH:
+            # Sleep until an enqueue (or stop) wakes us, or the poll interval passes
+            waiter = asyncio.ensure_future(_wake.wait())
+            await asyncio.wait({waiter}, timeout=POLL_SECONDS)
+            waiter.cancel()
+        elif _tasks:
+            # A full batch: poll again once the in-flight sends are done, not on a timer
+            await asyncio.wait(set(_tasks), timeout=POLL_SECONDS)
+
+
+def start_dispatcher(concurrency: int = CONCURRENCY):
+    """Start draining the outbox on the running event loop (idempotent)."""
+    global _dispatcher, _wake, _stopping
+    if _dispatcher is not None:
+        return
+    _stopping = False
+    _wake = asyncio.Event()
+    _dispatcher = asyncio.create_task(_dispatch_loop(concurrency))
+
+
+async def stop_dispatcher(grace_seconds: float = 10):
+    """Stop polling and give in-flight sends a moment to finish (unfinished ones are re-leased)."""
+    global _dispatcher, _wake, _stopping
+    if _dispatcher is None:
+        return
+    _stopping = True
+    _wake.set()
+    await asyncio.wait({_dispatcher}, timeout=grace_seconds)
+    _dispatcher.cancel()
+    if _tasks:
+        await asyncio.wait(set(_tasks), timeout=grace_seconds)
+    _dispatcher = None
+    _wake = None
@@ -1,6 +1,6 @@
 import os
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
 
 # Initialize Firebase
 # Dev: uses local emulators with emulator credentials
@@ -16,3 +16,6 @@ if not firebase_admin._apps:
         firebase_admin.initialize_app()
 
 db = firestore.client()
+
+# AsyncClient for async route handlers (never blocks the event loop)
+async_db = firestore_async.client()
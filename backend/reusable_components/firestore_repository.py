@@ -0,0 +1,116 @@
+"""
+Firestore data-access layer.
+
+Async route handlers use AsyncRepository, which is backed by the Firestore
+AsyncClient, so a Firestore round trip never blocks the uvicorn event loop.
+Sync handlers (which FastAPI already runs on a threadpool) use the matching
+SyncRepository facade over the regular client via `repo.sync`.
+
+Filters are (field, op, value) tuples, e.g. ("status", "==", "completed").
+"""
+
+from google.cloud.firestore import FieldFilter
+
+from reusable_components.firebase import async_db, db
+
+ENROLLMENTS_COLLECTION = "pending_enrollment_application"
+STUDENT_USERS_COLLECTION = "student_users"
+COURSE_BATCHES_COLLECTION = "course_batches"
+OTP_CODES_COLLECTION = "otp_codes"
+
+
+def _build_query(collection_ref, filters, order_by=None, descending=False, limit=None):
+    query = collection_ref
+    for field, op, value in filters:
+        query = query.where(filter=FieldFilter(field, op, value))
+    if order_by:
+        direction = "DESCENDING" if descending else "ASCENDING"
+        query = query.order_by(order_by, direction=direction)
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
+class SyncRepository:
+    """Blocking repository for sync (threadpool) route handlers."""
+
+    def __init__(self, collection: str):
+        self.collection = collection
+
+    def ref(self, doc_id: str):
+        return db.collection(self.collection).document(doc_id)
+
+    def get(self, doc_id: str):
+        return self.ref(doc_id).get()
+
+    def add(self, data: dict) -> str:
+        _, doc_ref = db.collection(self.collection).add(data)
+        return doc_ref.id
+
+    def set(self, doc_id: str, data: dict, merge: bool = False):
+        self.ref(doc_id).set(data, merge=merge)
+
+    def update(self, doc_id: str, fields: dict):
+        self.ref(doc_id).update(fields)
+
+    def delete(self, doc_id: str):
+        self.ref(doc_id).delete()
+
+    def find(self, *filters, order_by: str = None, descending: bool = False, limit: int = None) -> list:
+        query = _build_query(db.collection(self.collection), filters, order_by, descending, limit)
+        return list(query.stream())
+
+    def find_one(self, *filters):
+        docs = self.find(*filters, limit=1)
+        return docs[0] if docs else None
+
+    def get_all(self, doc_ids) -> list:
+        refs = [self.ref(doc_id) for doc_id in dict.fromkeys(doc_ids)]
+        return list(db.get_all(refs)) if refs else []
+
+
+class AsyncRepository:
+    """Non-blocking repository for async route handlers."""
+
+    def __init__(self, collection: str):
+        self.collection = collection
+        self.sync = SyncRepository(collection)
+
+    def ref(self, doc_id: str):
+        return async_db.collection(self.collection).document(doc_id)
+
+    async def get(self, doc_id: str):
+        return await self.ref(doc_id).get()
+
+    async def add(self, data: dict) -> str:
+        _, doc_ref = await async_db.collection(self.collection).add(data)
+        return doc_ref.id
+
+    async def set(self, doc_id: str, data: dict, merge: bool = False):
+        await self.ref(doc_id).set(data, merge=merge)
+
+    async def update(self, doc_id: str, fields: dict):
+        await self.ref(doc_id).update(fields)
+
+    async def delete(self, doc_id: str):
+        await self.ref(doc_id).delete()
+
+    async def find(self, *filters, order_by: str = None, descending: bool = False, limit: int = None) -> list:
+        query = _build_query(async_db.collection(self.collection), filters, order_by, descending, limit)
+        return [doc async for doc in query.stream()]
+
+    async def find_one(self, *filters):
+        docs = await self.find(*filters, limit=1)
+        return docs[0] if docs else None
+
+    async def get_all(self, doc_ids) -> list:
+        refs = [self.ref(doc_id) for doc_id in dict.fromkeys(doc_ids)]
+        if not refs:
+            return []
+        return [doc async for doc in async_db.get_all(refs)]
+
+
+enrollment_repo = AsyncRepository(ENROLLMENTS_COLLECTION)
+student_user_repo = AsyncRepository(STUDENT_USERS_COLLECTION)
+course_batch_repo = AsyncRepository(COURSE_BATCHES_COLLECTION)
+otp_code_repo = AsyncRepository(OTP_CODES_COLLECTION)
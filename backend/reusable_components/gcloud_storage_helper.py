@@ -1,11 +1,14 @@
 import os
 import re
-from datetime import timedelta
+import threading
+from datetime import datetime, timedelta
 from google.cloud import storage
 from google.oauth2 import service_account
 from google.auth import default as google_auth_default
 from google.auth.transport import requests as google_auth_requests
 
+from reusable_components.ttl_cache import TTLCache
+
 ENVIRONMENT = os.getenv("ENVIRONMENT", "dev")
 
 # Bucket mapping: dev → dev.brighthii.com, staging → staging.brighthii.com, prod → brighthii.com
@@ -17,6 +20,16 @@ _BUCKET_MAP = {
 
 _client = None
 
+# Signing credentials are shared process-wide and refreshed only near expiry
+_credentials = None
+_credentials_lock = threading.Lock()
+_CREDENTIALS_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Signed URLs are reused until shortly before they expire (one cache per lifetime)
+_signed_url_caches: dict[int, TTLCache] = {}
+_SIGNED_URL_CACHE_SIZE = 2048
+_SIGNED_URL_REUSE_MARGIN = timedelta(minutes=10)
+
 
 def _get_client():
     global _client
@@ -82,19 +95,32 @@ def upload_from_path(file_path: str, destination_path: str, content_type: str =
     return blob.public_url
 
 
-def generate_signed_url(gcs_path: str, expiration_minutes: int = 60, bucket_name: str = None) -> str:
-    """Generate a signed URL for a GCS object (time-limited access)."""
-    client = _get_client()
-    bucket = client.bucket(bucket_name or get_bucket_name())
-    blob = bucket.blob(gcs_path)
+def _get_signing_credentials():
+    """Default credentials with a valid access token, refreshed only when close to expiry."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            _credentials, _project = google_auth_default()
+        expiry = _credentials.expiry  # naive UTC
+        if not _credentials.token or expiry is None or expiry - _CREDENTIALS_REFRESH_MARGIN <= datetime.utcnow():
+            _credentials.refresh(google_auth_requests.Request())
+        return _credentials
+
+
+def _signed_url_cache(expiration_minutes: int) -> TTLCache:
+    cache = _signed_url_caches.get(expiration_minutes)
+    if cache is None:
+        lifetime = timedelta(minutes=expiration_minutes)
+        reuse_for = max(lifetime - _SIGNED_URL_REUSE_MARGIN, lifetime / 2)
+        cache = _signed_url_caches.setdefault(expiration_minutes, TTLCache(
+            f"signed_urls_{expiration_minutes}m", ttl=reuse_for.total_seconds(), maxsize=_SIGNED_URL_CACHE_SIZE,
+        ))
+    return cache
 
-    # Emulator mode: return public URL (emulator doesn't support signed URLs)
-    if os.getenv("FIREBASE_STORAGE_EMULATOR_HOST"):
-        return blob.public_url
 
+def _sign_url(blob, expiration_minutes: int) -> str:
     # Staging/Prod (Cloud Run): use IAM signBlob API (no private key needed)
-    credentials, _project = google_auth_default()
-    credentials.refresh(google_auth_requests.Request())
+    credentials = _get_signing_credentials()
     return blob.generate_signed_url(
         expiration=timedelta(minutes=expiration_minutes),
         method="GET",
@@ -103,12 +129,37 @@ def generate_signed_url(gcs_path: str, expiration_minutes: int = 60, bucket_name
     )
 
 
+def generate_signed_url(gcs_path: str, expiration_minutes: int = 60, bucket_name: str = None) -> str:
+    """Generate a signed URL for a GCS object (time-limited access).
+
+    URLs are cached per object and reused until 10 minutes before they expire
+    (or for half their lifetime, for short-lived URLs).
+    """
+    client = _get_client()
+    bucket_name = bucket_name or get_bucket_name()
+    blob = client.bucket(bucket_name).blob(gcs_path)
+
+    # Emulator mode: return public URL (emulator doesn't support signed URLs)
+    if os.getenv("FIREBASE_STORAGE_EMULATOR_HOST"):
+        return blob.public_url
+
+    return _signed_url_cache(expiration_minutes).get(
+        (bucket_name, gcs_path), lambda: _sign_url(blob, expiration_minutes),
+    )
+
+
+def _forget_signed_urls(bucket_name: str, gcs_path: str):
+    for cache in list(_signed_url_caches.values()):
+        cache.invalidate((bucket_name, gcs_path))
+
+
 def delete_file(destination_path: str, bucket_name: str = None):
     """Delete a file from GCS."""
     client = _get_client()
-    bucket = client.bucket(bucket_name or get_bucket_name())
-    blob = bucket.blob(destination_path)
+    bucket_name = bucket_name or get_bucket_name()
+    blob = client.bucket(bucket_name).blob(destination_path)
     blob.delete()
+    _forget_signed_urls(bucket_name, destination_path)
 
 
 def get_applicant_folder(first_name: str, last_name: str, birthdate: str, middle_name: str = "") -> str:
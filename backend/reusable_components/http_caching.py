@@ -0,0 +1,64 @@
+"""
+Conditional GET helpers for public, cacheable endpoints.
+
+ETags are strong validators derived from the data version behind a response
+(the cached course overrides, the sponsors cache, the address data files),
+not from the serialized body, so a matching If-None-Match is answered with a
+304 before any body is built. Because the tag is a content hash, every
+instance computes the same value for the same data.
+
+Cache-Control values let the CDN in front of the public frontend and the
+browser reuse responses and revalidate in the background.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+# Catalog data can change from the admin panel; keep edge copies short-lived
+CATALOG_CACHE_CONTROL = "public, max-age=60, s-maxage=300, stale-while-revalidate=86400"
+# Redirects to signed URLs (reused until 10 minutes before they expire)
+SIGNED_REDIRECT_CACHE_CONTROL = "public, max-age=300"
+# Static reference data (address lists ship with the code)
+STATIC_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+# Content-addressed URLs (the hash changes whenever the body does)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from one or more str/bytes version parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names this ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def json_bytes_response(body: bytes, etag: str, cache_control: str) -> Response:
+    """Send already-serialized JSON as-is (skips response_model validation and encoding)."""
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
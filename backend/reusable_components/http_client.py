@@ -0,0 +1,51 @@
+"""
+Shared outbound HTTP client for Zoho (OAuth and Mail API).
+
+One httpx.AsyncClient per process keeps TLS connections to accounts.zoho.com
+and mail.zoho.com alive between calls instead of paying a fresh handshake on
+every email. main.py opens it in the app lifespan and closes it on shutdown;
+get_http_client() also creates it lazily, so scripts can use the same code
+paths without the app.
+
+HTTP/2 needs the `h2` package (httpx[http2] in requirements.txt); without it
+the client falls back to HTTP/1.1 keep-alive.
+"""
+
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Zoho's send endpoint can take several seconds; connecting should not
+TIMEOUT = httpx.Timeout(connect=5.0, read=20.0, write=10.0, pool=5.0)
+LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=TIMEOUT, limits=LIMITS)
+    return _client
+
+
+async def start_http_client():
+    get_http_client()
+    if not HTTP2_AVAILABLE:
+        logger.info("h2 not installed; Zoho client uses HTTP/1.1 keep-alive")
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
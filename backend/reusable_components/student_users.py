@@ -0,0 +1,140 @@
+"""
+student_users lookups by email.
+
+student_users documents keep their auto-generated IDs (admin URLs use them),
+and `student_email_index/{normalized email}` maps an email to its student ID,
+so finding a user is a point read instead of a `where("email", "==", ...)`
+query. The index entry is created with the student document in one batch;
+`create()` fails if the email is already indexed, which also stops two
+concurrent submissions from creating duplicate users.
+
+Records created before the index existed are found with the legacy email
+query and indexed on first read, until scripts/migrate_student_email_index.py
+has backfilled them all.
+"""
+
+from google.api_core.exceptions import AlreadyExists
+
+from firebase_admin import firestore
+from google.cloud.firestore import async_transactional
+
+from reusable_components.firebase import async_db, db
+from reusable_components.firestore_repository import student_user_repo
+
+STUDENT_EMAIL_INDEX_COLLECTION = "student_email_index"
+
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def _index_entry(email: str, student_id: str) -> dict:
+    return {"student_id": student_id, "email": email, "updated_at": firestore.SERVER_TIMESTAMP}
+
+
+async def find_student_user(email: str):
+    """Return the student_users snapshot for an email, or None."""
+    email = normalize_email(email)
+    index_ref = async_db.collection(STUDENT_EMAIL_INDEX_COLLECTION).document(email)
+    index = await index_ref.get()
+    if index.exists:
+        doc = await student_user_repo.get(index.get("student_id"))
+        if doc.exists:
+            return doc
+
+    # Dual-read during cutover: record created before the email index
+    doc = await student_user_repo.find_one(("email", "==", email))
+    if doc:
+        await index_ref.set(_index_entry(email, doc.id))
+    return doc
+
+
+def find_student_user_sync(email: str):
+    """Sync variant of find_student_user() for threadpool handlers."""
+    email = normalize_email(email)
+    index_ref = db.collection(STUDENT_EMAIL_INDEX_COLLECTION).document(email)
+    index = index_ref.get()
+    if index.exists:
+        doc = student_user_repo.sync.get(index.get("student_id"))
+        if doc.exists:
+            return doc
+
+    doc = student_user_repo.sync.find_one(("email", "==", email))
+    if doc:
+        index_ref.set(_index_entry(email, doc.id))
+    return doc
+
+
+async def _replace_dangling_index(email: str, new_doc: dict) -> str | None:
+    """Re-point an index entry whose student document is gone at a new record, in one transaction.
+
+    Returns the new student ID, or None if the entry points at an existing student.
+    """
+    index_ref = async_db.collection(STUDENT_EMAIL_INDEX_COLLECTION).document(email)
+    student_ref = async_db.collection(student_user_repo.collection).document()
+
+    @async_transactional
+    async def _run(transaction):
+        index = await index_ref.get(transaction=transaction)
+        student_id = index.to_dict().get("student_id") if index.exists else None
+        if student_id:
+            current = await student_user_repo.ref(student_id).get(transaction=transaction)
+            if current.exists:
+                return None
+        transaction.set(index_ref, _index_entry(email, student_ref.id))
+        transaction.set(student_ref, {**new_doc, "email": email})
+        return student_ref.id
+
+    return await _run(async_db.transaction())
+
+
+async def upsert_student_user(
+    email: str, new_doc: dict, existing_updates: dict | None = None, _retried: bool = False,
+) -> str:
+    """Create the student_users record for an email, or apply `existing_updates` to it.
+
+    Returns the student ID.
+    """
+    email = normalize_email(email)
+    existing = await find_student_user(email)
+    if existing:
+        if existing_updates:
+            await existing.reference.update(existing_updates)
+        return existing.id
+
+    student_ref = async_db.collection(student_user_repo.collection).document()
+    batch = async_db.batch()
+    batch.create(
+        async_db.collection(STUDENT_EMAIL_INDEX_COLLECTION).document(email),
+        _index_entry(email, student_ref.id),
+    )
+    batch.set(student_ref, {**new_doc, "email": email})
+    try:
+        await batch.commit()
+    except AlreadyExists:
+        # The index points at a deleted student (or a half-applied migration): replace the entry
+        student_id = await _replace_dangling_index(email, new_doc)
+        if student_id:
+            return student_id
+        if _retried:
+            raise
+        # A concurrent request created the user first; update that record instead (once)
+        return await upsert_student_user(email, new_doc, existing_updates, _retried=True)
+    return student_ref.id
+
+
+def change_student_email(student_ref, old_email: str, new_email: str):
+    """Point the email index at the new address and update the student record, atomically.
+
+    Raises AlreadyExists if the new email is already indexed.
+    """
+    old_email, new_email = normalize_email(old_email), normalize_email(new_email)
+    index_col = db.collection(STUDENT_EMAIL_INDEX_COLLECTION)
+    batch = db.batch()
+    batch.create(index_col.document(new_email), _index_entry(new_email, student_ref.id))
+    batch.delete(index_col.document(old_email))
+    batch.update(student_ref, {
+        "email": new_email,
+        "updated_at": firestore.SERVER_TIMESTAMP,
+    })
+    batch.commit()
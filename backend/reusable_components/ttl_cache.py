@@ -0,0 +1,189 @@
+"""
+Thread-safe in-process TTL cache.
+
+Sync route handlers run on FastAPI's threadpool, so a cache shared between
+them needs locking. TTLCache adds, per key:
+
+- single-flight loading: when an entry is missing or expired, one caller
+  runs the loader and concurrent callers wait for its result instead of
+  all querying Firestore at once;
+- stale-while-revalidate: for `stale_ttl` seconds after expiry the old value
+  is served immediately while one background thread refreshes it;
+- a size bound (least recently used entries are evicted);
+- hit/miss counters via stats().
+
+invalidate()/clear() also detach any load that was already in flight: its
+result is not cached and later callers start a fresh load, so data read
+before an admin write never outlives the invalidation.
+
+get_many() serves a set of keys at once, loading every miss with one
+loader call (e.g. a single db.get_all()).
+
+Usage:
+    _courses_cache = TTLCache("course_overrides", ttl=86400)
+    overrides = _courses_cache.get("all", _load_overrides)
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_registry: dict[str, "TTLCache"] = {}
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Exception | None = None
+
+
+class TTLCache:
+    def __init__(self, name: str, ttl: float, maxsize: int = 128, stale_ttl: float = 0):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._data: OrderedDict = OrderedDict()  # key -> (value, loaded_at)
+        self._inflight: dict = {}
+        self._generation = 0
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "loads": 0, "load_errors": 0, "evictions": 0}
+        _registry[name] = self
+
+    def get(self, key, loader):
+        """Return the cached value for `key`, calling loader() to (re)load it.
+
+        Loader exceptions propagate to the callers waiting on that load.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            age = time.monotonic() - entry[1] if entry else None
+            if entry and age < self.ttl:
+                self._counters["hits"] += 1
+                self._data.move_to_end(key)
+                return entry[0]
+            if entry and age < self.ttl + self.stale_ttl:
+                self._counters["stale_hits"] += 1
+                self._data.move_to_end(key)
+                if key not in self._inflight:
+                    flight = self._inflight[key] = _Flight()
+                    threading.Thread(
+                        target=self._load, args=(key, loader, flight, self._generation), daemon=True,
+                    ).start()
+                return entry[0]
+
+            self._counters["misses"] += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+
+        if leader:
+            self._load(key, loader, flight, generation)
+        else:
+            flight.done.wait()
+        if flight.error:
+            raise flight.error
+        return flight.value
+
+    def get_many(self, keys, loader) -> dict:
+        """Return {key: value} for `keys`, loading missing or expired ones with one loader(missing) call.
+
+        loader must return a value for every key it is given (None is cached
+        like any other value). Batched loads skip the single-flight and
+        stale-while-revalidate paths of get().
+        """
+        now = time.monotonic()
+        result, missing = {}, []
+        with self._lock:
+            generation = self._generation
+            for key in dict.fromkeys(keys):
+                entry = self._data.get(key)
+                if entry and now - entry[1] < self.ttl:
+                    self._counters["hits"] += 1
+                    self._data.move_to_end(key)
+                    result[key] = entry[0]
+                else:
+                    self._counters["misses"] += 1
+                    missing.append(key)
+
+        if missing:
+            try:
+                loaded = loader(missing)
+            except Exception as e:
+                logger.warning("Cache %s: failed to load %d keys: %s", self.name, len(missing), e)
+                with self._lock:
+                    self._counters["load_errors"] += 1
+                raise
+            with self._lock:
+                self._counters["loads"] += 1
+                # Drop results read before an invalidation
+                if generation == self._generation:
+                    loaded_at = time.monotonic()
+                    for key in missing:
+                        self._data[key] = (loaded[key], loaded_at)
+                        self._data.move_to_end(key)
+                    self._evict()
+            result.update({key: loaded[key] for key in missing})
+        return result
+
+    def peek(self, key, default=None):
+        """Last loaded value regardless of age (e.g. a fallback when a reload fails)."""
+        with self._lock:
+            entry = self._data.get(key)
+        return entry[0] if entry else default
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._inflight.pop(key, None)
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._inflight.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"name": self.name, "size": len(self._data), **self._counters}
+
+    def _load(self, key, loader, flight: _Flight, generation: int):
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            logger.warning("Cache %s: failed to load %r: %s", self.name, key, e)
+            with self._lock:
+                self._counters["load_errors"] += 1
+        else:
+            with self._lock:
+                self._counters["loads"] += 1
+                # Drop results read before an invalidation
+                if generation == self._generation:
+                    self._data[key] = (flight.value, time.monotonic())
+                    self._data.move_to_end(key)
+                    self._evict()
+        finally:
+            with self._lock:
+                # An invalidation may have detached this flight and started a newer one
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.done.set()
+
+    def _evict(self):
+        """Drop least recently used entries beyond maxsize (caller holds the lock)."""
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._counters["evictions"] += 1
+
+
+def all_cache_stats() -> list[dict]:
+    """Counters for every TTLCache created in this process."""
+    return [cache.stats() for cache in _registry.values()]
@@ -2,51 +2,119 @@ import json
 from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, RedirectResponse
+
+from reusable_components.address_bundle import build_bundle
+from reusable_components.address_search import build_search_index, search
+from reusable_components.http_caching import (
+    IMMUTABLE_CACHE_CONTROL,
+    STATIC_CACHE_CONTROL,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
 
 router = APIRouter(prefix="/api/address", tags=["address"])
 
 # Load data once at module level
 _data_dir = Path(__file__).parent.parent / "data"
 
-with open(_data_dir / "philippines_location.json", encoding="utf-8") as f:
-    _locations = json.load(f)
+_locations_raw = (_data_dir / "philippines_location.json").read_bytes()
+_districts_raw = (_data_dir / "districts.json").read_bytes()
+_locations = json.loads(_locations_raw)
+_districts = json.loads(_districts_raw)
+
+# The data files only change with a deploy, so one ETag covers every address response
+_ADDRESS_ETAG = make_etag(_locations_raw, _districts_raw)
+_CACHE_HEADERS = {"ETag": _ADDRESS_ETAG, "Cache-Control": STATIC_CACHE_CONTROL}
+
+
+def _not_modified(request: Request):
+    """304 response if the client already holds this data version, else None."""
+    if etag_matches(request, _ADDRESS_ETAG):
+        return not_modified(_ADDRESS_ETAG, STATIC_CACHE_CONTROL)
+    return None
+
+
+# city -> [(region, province, barangays)]; city names repeat across provinces
+_city_index: dict[str, list[tuple[str, str, list[str]]]] = {}
+for _region, _provinces in _locations.items():
+    for _province, _cities in _provinces.items():
+        for _city, _barangays in _cities.items():
+            _city_index.setdefault(_city, []).append((_region, _province, _barangays))
+
+
+def find_city(city: str, region: Optional[str] = None, province: Optional[str] = None) -> list[tuple[str, str, list[str]]]:
+    """Index entries for a city, narrowed by region/province when those match."""
+    matches = _city_index.get(city, [])
+    scoped = [
+        m for m in matches
+        if (not region or m[0] == region) and (not province or m[1] == province)
+    ]
+    # A scope that matches nothing is ignored, as the old full scan did
+    return scoped or matches
+
+
+def _find_barangays(city: str, region: Optional[str], province: Optional[str]) -> list[str]:
+    matches = find_city(city, region, province)
+    if not matches:
+        raise HTTPException(status_code=404, detail=f"No barangays found for '{city}'")
+    if len(matches) > 1:
+        raise HTTPException(status_code=409, detail={
+            "message": f"'{city}' exists in more than one province; pass region and province",
+            "matches": [{"region": r, "province": p} for r, p, _ in matches],
+        })
+    return matches[0][2]
+
+
+_search_index = build_search_index(_locations, _districts)
 
-with open(_data_dir / "districts.json", encoding="utf-8") as f:
-    _districts = json.load(f)
 
 # Region IX only (for mailing address)
 _local_regions = [
     "Region IX (Zamboanga Peninsula)",
 ]
 
+# Pre-built bundles for /bundle, by scope and by version
+_bundles = {
+    "local": build_bundle(_locations, _districts, _local_regions),
+    "all": build_bundle(_locations, _districts, list(_locations.keys())),
+}
+_bundles_by_version = {bundle["version"]: bundle for bundle in _bundles.values()}
+
 
 @router.get("/regions")
-def get_regions(all: bool = Query(False)):
+def get_regions(request: Request, all: bool = Query(False)):
     """Return list of region names. Use ?all=true for all 17 regions."""
+    if cached := _not_modified(request):
+        return cached
     regions = list(_locations.keys()) if all else _local_regions
     return JSONResponse(
         content=regions,
-        headers={"Cache-Control": "public, max-age=86400"},
+        headers=_CACHE_HEADERS,
     )
 
 
 @router.get("/provinces")
-def get_provinces(region: str = Query(...)):
+def get_provinces(request: Request, region: str = Query(...)):
     """Return list of province names for a given region."""
+    if cached := _not_modified(request):
+        return cached
     region_data = _locations.get(region)
     if region_data is None:
         raise HTTPException(status_code=404, detail=f"Region not found: '{region}'")
     return JSONResponse(
         content=list(region_data.keys()),
-        headers={"Cache-Control": "public, max-age=86400"},
+        headers=_CACHE_HEADERS,
     )
 
 
 @router.get("/cities")
-def get_cities(region: str = Query(...), province: str = Query(...)):
+def get_cities(request: Request, region: str = Query(...), province: str = Query(...)):
     """Return list of cities with optional district info."""
+    if cached := _not_modified(request):
+        return cached
     region_data = _locations.get(region)
     if region_data is None:
         raise HTTPException(status_code=404, detail=f"Region not found: '{region}'")
@@ -61,49 +129,83 @@ def get_cities(region: str = Query(...), province: str = Query(...)):
     ]
     return JSONResponse(
         content=cities,
-        headers={"Cache-Control": "public, max-age=86400"},
+        headers=_CACHE_HEADERS,
     )
 
 
 @router.get("/barangays")
 def get_barangays(
+    request: Request,
     city: str = Query(...),
     region: Optional[str] = Query(None),
     province: Optional[str] = Query(None),
 ):
     """Return barangay list for a given city. Optionally scope by region/province."""
-    # If region and province given, do precise lookup
-    if region and province:
-        region_data = _locations.get(region, {})
-        province_data = region_data.get(province, {})
-        barangays = province_data.get(city)
-        if barangays is not None:
-            return JSONResponse(
-                content=barangays,
-                headers={"Cache-Control": "public, max-age=86400"},
-            )
-
-    # Fallback: search all regions/provinces for the city
-    for r_data in _locations.values():
-        for p_data in r_data.values():
-            if city in p_data:
-                return JSONResponse(
-                    content=p_data[city],
-                    headers={"Cache-Control": "public, max-age=86400"},
-                )
-
-    raise HTTPException(status_code=404, detail=f"No barangays found for '{city}'")
+    if cached := _not_modified(request):
+        return cached
+    return JSONResponse(
+        content=_find_barangays(city, region, province),
+        headers=_CACHE_HEADERS,
+    )
 
 
 @router.get("/barangays/{city_name}")
-def get_barangays_by_path(city_name: str):
+def get_barangays_by_path(
+    city_name: str,
+    request: Request,
+    region: Optional[str] = Query(None),
+    province: Optional[str] = Query(None),
+):
     """Return barangay list for a given city/municipality (path param)."""
-    for r_data in _locations.values():
-        for p_data in r_data.values():
-            if city_name in p_data:
-                return JSONResponse(
-                    content=p_data[city_name],
-                    headers={"Cache-Control": "public, max-age=86400"},
-                )
-
-    raise HTTPException(status_code=404, detail=f"No barangays found for '{city_name}'")
+    if cached := _not_modified(request):
+        return cached
+    return JSONResponse(
+        content=_find_barangays(city_name, region, province),
+        headers=_CACHE_HEADERS,
+    )
+
+
+@router.get("/search")
+def search_addresses(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Typeahead across regions, provinces, cities and barangays.
+
+    Each match carries its type and parent region/province/city so the form
+    can fill every dropdown from one pick.
+    """
+    if cached := _not_modified(request):
+        return cached
+    return JSONResponse(
+        content=search(_search_index, q, limit),
+        headers=_CACHE_HEADERS,
+    )
+
+
+@router.get("/bundle")
+def get_bundle(all: bool = Query(False)):
+    """Redirect to the current content-addressed bundle. Use ?all=true for all 17 regions."""
+    bundle = _bundles["all" if all else "local"]
+    return RedirectResponse(
+        url=f"{router.prefix}/bundle/{bundle['version']}",
+        status_code=307,
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
+
+@router.get("/bundle/{version}")
+def get_bundle_version(version: str, request: Request):
+    """The whole hierarchy in compact form (see reusable_components.address_bundle), cached forever."""
+    bundle = _bundles_by_version.get(version)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail="Unknown bundle version; fetch /api/address/bundle")
+    etag = f'"{version}"'
+    if etag_matches(request, etag):
+        return not_modified(etag, IMMUTABLE_CACHE_CONTROL)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=bundle["gzip"], media_type="application/json", headers=headers)
+    return Response(content=bundle["json"], media_type="application/json", headers=headers)
@@ -1,12 +1,23 @@
+import json
 import logging
-import time
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
 from firebase_admin import firestore
 from schemas.course_schema import Course, CourseModule, CourseSchedule, Instructor
 from reusable_components.firebase import db
 from reusable_components.auth import verify_jwt
+from reusable_components.bulk_writes import BulkMutation
+from reusable_components.firestore_repository import course_batch_repo
+from reusable_components import cache_invalidation
+from reusable_components.ttl_cache import TTLCache
+from reusable_components.http_caching import (
+    CATALOG_CACHE_CONTROL,
+    etag_matches,
+    json_bytes_response,
+    make_etag,
+    not_modified,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -366,81 +377,95 @@ This TESDA-accredited program prepares you for careers in wellness centers, spas
     ),
 ]
 
-# Build a lookup by slug for quick access
+# Build lookups by slug and title for quick access
 _COURSES_BY_SLUG = {c.slug: c for c in COURSES}
+_COURSES_BY_TITLE = {c.title: c for c in COURSES}
+
+
+def course_slug_for(data: dict) -> str | None:
+    """Slug of an enrollment's course: its stamped course_slug, else resolved from the title."""
+    slug = data.get("course_slug")
+    if slug in _COURSES_BY_SLUG:
+        return slug
+    course = _COURSES_BY_TITLE.get(data.get("course", ""))
+    return course.slug if course else None
 
 
 # ── Batch-based course overrides (cached) ────────────────────────────
 
-_overrides_cache: dict | None = None
-_overrides_cache_ts: float = 0
 _OVERRIDES_TTL = 86400  # 24 hours
+# Holds the merged catalog snapshot built from the overrides (see _build_catalog)
+_catalog_cache = TTLCache("course_catalog", ttl=_OVERRIDES_TTL, maxsize=1, stale_ttl=600)
 
 
-def _get_course_overrides() -> dict:
-    """Read active/enrollment_closed batches and course_settings as course overrides.
+def _load_course_overrides() -> dict:
+    """Read active/enrollment_closed batches and course_settings as course overrides."""
+    # Batch overrides
+    collection = "course_batches"
+    docs = (
+        db.collection(collection)
+        .where("status", "in", ["active", "enrollment_closed"])
+        .stream()
+    )
+    result = {}
+    for doc in docs:
+        data = doc.to_dict()
+        slug = data.get("course_slug")
+        if not slug:
+            continue
+        override = {}
+        if data.get("start_date"):
+            override["start_dates"] = [data["start_date"]]
+        if "enrollment_deadline" in data:
+            override["enrollment_deadline"] = data["enrollment_deadline"]
+        if data.get("instructor"):
+            override["instructor"] = data["instructor"]
+        result[slug] = override
+
+    # Course-level settings overrides (price, discounted_price)
+    try:
+        settings_docs = db.collection("course_settings").stream()
+        for sdoc in settings_docs:
+            sdata = sdoc.to_dict()
+            slug = sdoc.id  # document ID is the course slug
+            if slug not in result:
+                result[slug] = {}
+            if "price" in sdata and sdata["price"] is not None:
+                result[slug]["price"] = sdata["price"]
+            if "discounted_price" in sdata:
+                result[slug]["discounted_price"] = sdata["discounted_price"]
+    except Exception as e:
+        logger.warning("Failed to fetch course_settings: %s", e)
 
-    Results are cached for 10 minutes to avoid hitting Firestore on
-    every public page load. Admin batch mutations (create/edit/close)
-    call _invalidate_overrides_cache() to force a refresh.
-    """
-    global _overrides_cache, _overrides_cache_ts
+    return result
 
-    now = time.monotonic()
-    if _overrides_cache is not None and (now - _overrides_cache_ts) < _OVERRIDES_TTL:
-        return _overrides_cache
 
-    try:
-        # Batch overrides
-        collection = "course_batches"
-        docs = (
-            db.collection(collection)
-            .where("status", "in", ["active", "enrollment_closed"])
-            .stream()
-        )
-        result = {}
-        for doc in docs:
-            data = doc.to_dict()
-            slug = data.get("course_slug")
-            if not slug:
-                continue
-            override = {}
-            if data.get("start_date"):
-                override["start_dates"] = [data["start_date"]]
-            if "enrollment_deadline" in data:
-                override["enrollment_deadline"] = data["enrollment_deadline"]
-            if data.get("instructor"):
-                override["instructor"] = data["instructor"]
-            result[slug] = override
-
-        # Course-level settings overrides (price, discounted_price)
-        try:
-            settings_docs = db.collection("course_settings").stream()
-            for sdoc in settings_docs:
-                sdata = sdoc.to_dict()
-                slug = sdoc.id  # document ID is the course slug
-                if slug not in result:
-                    result[slug] = {}
-                if "price" in sdata and sdata["price"] is not None:
-                    result[slug]["price"] = sdata["price"]
-                if "discounted_price" in sdata:
-                    result[slug]["discounted_price"] = sdata["discounted_price"]
-        except Exception as e:
-            logger.warning("Failed to fetch course_settings: %s", e)
+def _load_catalog() -> dict:
+    return _build_catalog(_load_course_overrides())
+
 
-        _overrides_cache = result
-        _overrides_cache_ts = now
-        return result
+def _get_catalog() -> dict:
+    """Merged catalog snapshot, rebuilt when the overrides are reloaded (every 24 hours).
+
+    Expired entries are served for up to 10 more minutes while one background
+    reload runs. Admin batch mutations (create/edit/close) call
+    _invalidate_overrides_cache() to force a refresh.
+    """
+    try:
+        return _catalog_cache.get("all", _load_catalog)
     except Exception as e:
         logger.warning("Failed to fetch course overrides from batches: %s", e)
-        return _overrides_cache or {}
+        return _catalog_cache.peek("all", _DEFAULT_CATALOG)
+
+
+def _clear_course_caches():
+    _catalog_cache.clear()
+    _batch_cache.clear()
 
 
 def _invalidate_overrides_cache():
-    """Force the next _get_course_overrides() call to hit Firestore."""
-    global _overrides_cache, _overrides_cache_ts
-    _overrides_cache = None
-    _overrides_cache_ts = 0
+    """Force the next _get_catalog() and batch lookups to hit Firestore, on every instance."""
+    cache_invalidation.publish("courses")
 
 
 def _apply_overrides(course: Course, overrides: dict) -> Course:
@@ -464,6 +489,46 @@ def _apply_overrides(course: Course, overrides: dict) -> Course:
     return Course(**data)
 
 
+# Version of the static course definitions (changes only with a deploy)
+_COURSES_DIGEST = make_etag(json.dumps([c.model_dump() for c in COURSES], sort_keys=True))
+
+# Categories come from the static definitions only
+_CATEGORIES_JSON = json.dumps(sorted({c.category for c in COURSES})).encode("utf-8")
+
+
+def _json_array(items: list[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
+
+
+def _build_catalog(overrides: dict) -> dict:
+    """Merge overrides into every course once and pre-serialize the public responses.
+
+    Public endpoints send these bytes as-is, so a page load is a dict lookup
+    instead of a merge, a model validation and a JSON encode per course.
+    """
+    courses = {c.slug: _apply_overrides(c, overrides) for c in COURSES}
+    by_slug = {slug: course.model_dump_json().encode("utf-8") for slug, course in courses.items()}
+    grouped: dict[str, list[bytes]] = {}
+    for slug, course in courses.items():
+        grouped.setdefault(course.category.lower(), []).append(by_slug[slug])
+    return {
+        "courses": courses,
+        "etag": make_etag(_COURSES_DIGEST, json.dumps(overrides, sort_keys=True, default=str)),
+        "json": _json_array(list(by_slug.values())),
+        "json_by_slug": by_slug,
+        "json_by_category": {category: _json_array(items) for category, items in grouped.items()},
+    }
+
+
+# Served (without overrides) if the very first load from Firestore fails
+_DEFAULT_CATALOG = _build_catalog({})
+
+
+def get_merged_courses_by_slug() -> dict[str, Course]:
+    """Courses with overrides applied, keyed by slug."""
+    return _get_catalog()["courses"]
+
+
 def _get_active_batch(slug: str):
     """Return the active or enrollment_closed batch doc for a course, or None."""
     collection = "course_batches"
@@ -477,34 +542,72 @@ def _get_active_batch(slug: str):
     return docs[0] if docs else None
 
 
+# ── course_batches document cache ─────────────────────────────────────
+
+# Missing batches are cached as None; batch mutations clear it on every instance
+_batch_cache = TTLCache("course_batches", ttl=600, maxsize=2048)
+
+
+def _load_batches(batch_ids: list[str]) -> dict[str, dict | None]:
+    fetched = {batch_id: None for batch_id in batch_ids}
+    for doc in course_batch_repo.sync.get_all(batch_ids):
+        if doc.exists:
+            fetched[doc.id] = doc.to_dict()
+    return fetched
+
+
+def get_batches_by_id(batch_ids) -> dict[str, dict]:
+    """Return {batch_id: batch data} for the given IDs (missing batches are omitted).
+
+    Cache misses are resolved with a single db.get_all() round trip. The
+    returned dicts are shared with the cache and must not be mutated.
+    """
+    batches = _batch_cache.get_many([b for b in batch_ids if b], _load_batches)
+    return {batch_id: data for batch_id, data in batches.items() if data is not None}
+
+
+cache_invalidation.on_invalidate("courses", _clear_course_caches)
+
+
 # ── Public endpoints ──────────────────────────────────────────────────
 
 
+# Responses are the pre-serialized catalog bytes, sent as-is (response_model is
+# only used for the OpenAPI schema). They carry the catalog ETag; a matching
+# If-None-Match gets a bodiless 304.
+
+
+def _catalog_response(request: Request, body: bytes, etag: str) -> Response:
+    if etag_matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+    return json_bytes_response(body, etag, CATALOG_CACHE_CONTROL)
+
+
 @router.get("/courses", response_model=list[Course])
-def get_courses():
-    overrides = _get_course_overrides()
-    return [_apply_overrides(c, overrides) for c in COURSES]
+def get_courses(request: Request):
+    catalog = _get_catalog()
+    return _catalog_response(request, catalog["json"], catalog["etag"])
 
 
-@router.get("/categories")
-def get_categories():
-    categories = list(set(course.category for course in COURSES))
-    return categories
+@router.get("/categories", response_model=list[str])
+def get_categories(request: Request):
+    return _catalog_response(request, _CATEGORIES_JSON, _COURSES_DIGEST)
 
 
 @router.get("/courses/category/{category}", response_model=list[Course])
-def get_courses_by_category(category: str):
-    overrides = _get_course_overrides()
-    return [_apply_overrides(c, overrides) for c in COURSES if c.category.lower() == category.lower()]
+def get_courses_by_category(category: str, request: Request):
+    catalog = _get_catalog()
+    body = catalog["json_by_category"].get(category.lower(), b"[]")
+    return _catalog_response(request, body, catalog["etag"])
 
 
 @router.get("/courses/{slug}", response_model=Course)
-def get_course(slug: str):
-    course = _COURSES_BY_SLUG.get(slug)
-    if not course:
+def get_course(slug: str, request: Request):
+    catalog = _get_catalog()
+    body = catalog["json_by_slug"].get(slug)
+    if body is None:
         raise HTTPException(status_code=404, detail="Course not found")
-    overrides = _get_course_overrides()
-    return _apply_overrides(course, overrides)
+    return _catalog_response(request, body, catalog["etag"])
 
 
 # ── Admin: courses summary ────────────────────────────────────────────
@@ -513,8 +616,7 @@ def get_course(slug: str):
 @router.get("/courses-summary")
 def get_courses_summary(_admin: dict = Depends(verify_jwt)):
     """Get all courses with batch summary stats for the admin courses list."""
-    overrides = _get_course_overrides()
-    merged_courses = [_apply_overrides(c, overrides) for c in COURSES]
+    merged_courses = get_merged_courses_by_slug().values()
 
     # Get all batches to compute counts per course
     batch_collection = "course_batches"
@@ -540,13 +642,13 @@ def get_courses_summary(_admin: dict = Depends(verify_jwt)):
 
     results = []
     for course in merged_courses:
-        docs = (
+        count_query = (
             db.collection(enrollment_collection)
-            .where("course", "==", course.title)
+            .where("course_slug", "==", course.slug)
             .where("status", "==", "completed")
-            .stream()
+            .count()
         )
-        total_students = sum(1 for _ in docs)
+        total_students = int(count_query.get()[0][0].value)
 
         current_start = course.start_dates[0] if course.start_dates else "TBA"
         stats = batch_stats.get(course.slug, {})
@@ -716,40 +818,39 @@ def close_batch_enrollment(slug: str, batch_id: str, admin: dict = Depends(verif
     })
 
     # Move physical_docs_required enrollments back to in_waitlist
-    course_title = _COURSES_BY_SLUG[slug].title
     enrollment_collection = "pending_enrollment_application"
     affected_docs = (
         db.collection(enrollment_collection)
-        .where("course", "==", course_title)
+        .where("course_slug", "==", slug)
         .where("status", "==", "physical_docs_required")
         .stream()
     )
 
     admin_email = admin.get("sub", "unknown")
     now = datetime.now(timezone.utc).isoformat()
-    reverted_count = 0
 
+    bulk = BulkMutation()
     for edoc in affected_docs:
-        edata = edoc.to_dict()
-        existing_changelog = edata.get("changelog", [])
-        edoc.reference.update({
+        bulk.update(edoc.reference, {
             "status": "in_waitlist",
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": existing_changelog + [{
-                "field": "status",
-                "oldValue": "physical_docs_required",
-                "newValue": "in_waitlist",
-                "updatedBy": admin_email,
-                "updatedAt": now,
-                "note": "Enrollment closed for batch — reverted to waitlist",
-            }],
-        })
-        reverted_count += 1
+        }, [{
+            "field": "status",
+            "oldValue": "physical_docs_required",
+            "newValue": "in_waitlist",
+            "updatedBy": admin_email,
+            "updatedAt": now,
+            "note": "Enrollment closed for batch — reverted to waitlist",
+        }])
+    result = bulk.commit()
+    if result["failed"]:
+        logger.warning("Close enrollment for batch %s: %d enrollment(s) not reverted", batch_id, len(result["failed"]))
 
     _invalidate_overrides_cache()
     return {
         "message": "Enrollment closed",
-        "reverted_to_waitlist": reverted_count,
+        "reverted_to_waitlist": len(result["succeeded"]),
+        "failed": result["failed"],
     }
 
 
@@ -772,117 +873,208 @@ def close_batch(slug: str, batch_id: str, _admin: dict = Depends(verify_jwt)):
     if data.get("status") not in ("active", "enrollment_closed"):
         raise HTTPException(status_code=400, detail="Only active or enrollment_closed batches can be closed")
 
+    completed_at = datetime.now(timezone.utc)
     doc_ref.update({
         "status": "completed",
-        "completed_at": firestore.SERVER_TIMESTAMP,
+        "completed_at": completed_at,
         "updated_at": firestore.SERVER_TIMESTAMP,
     })
 
     _invalidate_overrides_cache()
+    try:
+        _record_closed_batch(slug, batch_id, {**data, "status": "completed", "completed_at": completed_at})
+    except Exception as e:
+        # Without this batch's snapshot the history is incomplete; make the next read rebuild it
+        logger.warning("Failed to record history for batch %s: %s", batch_id, e)
+        invalidate_batch_history(slug)
     return {"message": "Batch closed. Course reverts to TBA."}
 
 
 # ── Admin: batch history ──────────────────────────────────────────────
+#
+# Completed batches never change, so close_batch freezes each one's roster
+# into its own snapshot, course_batch_history/{slug}/batches/{batch_id}.
+# The pre-tracking "legacy" roster lives in batches/_legacy, which also marks
+# the history as built. The history page reads every snapshot with one query
+# plus the live active batch; no document grows with the number of batches.
+# A history without the marker is rebuilt from course_batches and the
+# completed enrollments (first use, or after invalidate_batch_history()).
 
+BATCH_HISTORY_COLLECTION = "course_batch_history"
+_LEGACY_SNAPSHOT = "_legacy"
 
-@router.get("/courses/{slug}/batches")
-def get_course_batches(slug: str, _admin: dict = Depends(verify_jwt)):
-    """Get batch history for a course from course_batches collection."""
-    course = _COURSES_BY_SLUG.get(slug)
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
 
-    overrides = _get_course_overrides()
-    merged_course = _apply_overrides(course, overrides)
+def _iso(value):
+    return value.isoformat() if value and hasattr(value, "isoformat") else value
 
-    # Get all batches for this course
-    batch_collection = "course_batches"
-    batch_docs = list(
-        db.collection(batch_collection)
+
+def _student_entry(edoc) -> dict:
+    edata = edoc.to_dict()
+    return {
+        "enrollment_id": edoc.id,
+        "firstName": edata.get("firstName", ""),
+        "lastName": edata.get("lastName", ""),
+        "email": edata.get("email", ""),
+        "created_at": _iso(edata.get("created_at")),
+    }
+
+
+def _batch_entry(batch_id: str | None, bdata: dict, students: list[dict]) -> dict:
+    return {
+        "batch_id": batch_id,
+        "status": bdata.get("status"),
+        "start_date": bdata.get("start_date"),
+        "enrollment_deadline": bdata.get("enrollment_deadline"),
+        "instructor": bdata.get("instructor"),
+        "student_count": len(students),
+        "students": students,
+        "created_at": _iso(bdata.get("created_at")),
+        "completed_at": _iso(bdata.get("completed_at")),
+        "closed_enrollment_at": _iso(bdata.get("closed_enrollment_at")),
+    }
+
+
+def _number_batch(entry: dict, number: int) -> dict:
+    entry["batch_number"] = number
+    entry["batch_label"] = f"Batch {number}"
+    return entry
+
+
+def _batch_roster(slug: str, batch_id: str) -> list[dict]:
+    enrollment_collection = "pending_enrollment_application"
+    docs = (
+        db.collection(enrollment_collection)
         .where("course_slug", "==", slug)
+        .where("batch_id", "==", batch_id)
+        .where("status", "==", "completed")
         .stream()
     )
+    return [_student_entry(edoc) for edoc in docs]
+
+
+def _build_batch_history(slug: str) -> dict:
+    """Full history of completed batches (oldest first), from course_batches and the completed enrollments."""
+    collection = "course_batches"
+    batch_docs = db.collection(collection).where("course_slug", "==", slug).where("status", "==", "completed").stream()
+    completed = {doc.id: doc.to_dict() for doc in batch_docs}
 
-    # Get completed enrollments for this course
     enrollment_collection = "pending_enrollment_application"
-    enrollment_docs = list(
+    enrollment_docs = (
         db.collection(enrollment_collection)
-        .where("course", "==", merged_course.title)
+        .where("course_slug", "==", slug)
         .where("status", "==", "completed")
         .stream()
     )
-
-    # Group enrollments by batch_id
-    enrollments_by_batch = {}
-    legacy_enrollments = []
+    students_by_batch: dict[str, list[dict]] = {}
+    legacy = []
     for edoc in enrollment_docs:
-        edata = edoc.to_dict()
-        created_at = edata.get("created_at")
-        if created_at and hasattr(created_at, "isoformat"):
-            created_at = created_at.isoformat()
-
-        student_entry = {
-            "enrollment_id": edoc.id,
-            "firstName": edata.get("firstName", ""),
-            "lastName": edata.get("lastName", ""),
-            "email": edata.get("email", ""),
-            "created_at": created_at,
-        }
-
-        bid = edata.get("batch_id")
-        if bid:
-            enrollments_by_batch.setdefault(bid, []).append(student_entry)
-        else:
-            legacy_enrollments.append(student_entry)
-
-    # Build batch list sorted by created_at
-    active_batch = None
-    completed_batches = []
-    for bdoc in batch_docs:
-        bdata = bdoc.to_dict()
-        created_at = bdata.get("created_at")
-        if created_at and hasattr(created_at, "isoformat"):
-            created_at = created_at.isoformat()
-        completed_at = bdata.get("completed_at")
-        if completed_at and hasattr(completed_at, "isoformat"):
-            completed_at = completed_at.isoformat()
-        closed_enrollment_at = bdata.get("closed_enrollment_at")
-        if closed_enrollment_at and hasattr(closed_enrollment_at, "isoformat"):
-            closed_enrollment_at = closed_enrollment_at.isoformat()
-
-        students = enrollments_by_batch.get(bdoc.id, [])
-        batch_entry = {
-            "batch_id": bdoc.id,
-            "status": bdata.get("status"),
-            "start_date": bdata.get("start_date"),
-            "enrollment_deadline": bdata.get("enrollment_deadline"),
-            "instructor": bdata.get("instructor"),
-            "student_count": len(students),
-            "students": students,
-            "created_at": created_at,
-            "completed_at": completed_at,
-            "closed_enrollment_at": closed_enrollment_at,
-        }
+        bid = edoc.to_dict().get("batch_id")
+        if not bid:
+            legacy.append(_student_entry(edoc))
+        elif bid in completed:
+            students_by_batch.setdefault(bid, []).append(_student_entry(edoc))
+
+    batches = [_batch_entry(bid, bdata, students_by_batch.get(bid, [])) for bid, bdata in completed.items()]
+    batches.sort(key=lambda b: b.get("created_at") or "")
+    return {
+        "course_slug": slug,
+        "batches": batches,
+        "legacy": legacy,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
 
-        if bdata.get("status") in ("active", "enrollment_closed"):
-            active_batch = batch_entry
-        else:
-            completed_batches.append(batch_entry)
-
-    # Sort completed batches by created_at descending
-    completed_batches.sort(key=lambda b: b.get("created_at") or "", reverse=True)
-
-    # Number the completed batches (oldest = Batch 1)
-    completed_batches_numbered = []
-    for idx, batch in enumerate(reversed(completed_batches)):
-        batch["batch_number"] = idx + 1
-        batch["batch_label"] = f"Batch {idx + 1}"
-        completed_batches_numbered.append(batch)
-    completed_batches_numbered.reverse()
-
-    # Add legacy enrollments as a special batch if any exist
-    if legacy_enrollments:
-        completed_batches_numbered.append({
+
+def _history_snapshots(slug: str):
+    return db.collection(BATCH_HISTORY_COLLECTION).document(slug).collection("batches")
+
+
+def _rebuild_batch_history(slug: str, existing_ids: set[str]) -> dict:
+    """Rewrite every snapshot from scratch; the legacy marker goes last, only if the rest landed."""
+    history = _build_batch_history(slug)
+    snapshots = _history_snapshots(slug)
+    bulk = BulkMutation()
+    for entry in history["batches"]:
+        bulk.set(snapshots.document(entry["batch_id"]), entry)
+    for stale_id in existing_ids - {b["batch_id"] for b in history["batches"]} - {_LEGACY_SNAPSHOT}:
+        bulk.delete(snapshots.document(stale_id))
+    # The single history document kept before per-batch snapshots
+    bulk.delete(db.collection(BATCH_HISTORY_COLLECTION).document(slug))
+    result = bulk.commit()
+    if result["failed"]:
+        logger.warning("Batch history rebuild for %s: %d write(s) failed", slug, len(result["failed"]))
+    else:
+        snapshots.document(_LEGACY_SNAPSHOT).set({"students": history["legacy"], "updated_at": history["updated_at"]})
+    return {
+        "batches": [_number_batch(b, i + 1) for i, b in enumerate(history["batches"])],
+        "legacy": history["legacy"],
+    }
+
+
+def _get_batch_history(slug: str, refresh: bool = False) -> dict:
+    """Completed batches (oldest first, numbered) and the legacy roster."""
+    docs = list(_history_snapshots(slug).stream())
+    legacy = next((doc for doc in docs if doc.id == _LEGACY_SNAPSHOT), None)
+    if refresh or legacy is None:
+        return _rebuild_batch_history(slug, {doc.id for doc in docs})
+    batches = sorted((doc.to_dict() for doc in docs if doc.id != _LEGACY_SNAPSHOT), key=lambda b: b.get("created_at") or "")
+    return {
+        "batches": [_number_batch(b, i + 1) for i, b in enumerate(batches)],
+        "legacy": legacy.to_dict().get("students") or [],
+    }
+
+
+def _record_closed_batch(slug: str, batch_id: str, bdata: dict):
+    """Freeze a completed batch's current roster into its snapshot document."""
+    entry = _batch_entry(batch_id, bdata, _batch_roster(slug, batch_id))
+    _history_snapshots(slug).document(batch_id).set(entry)
+
+
+def invalidate_batch_history(slug: str):
+    """Drop a course's history marker so the next read rebuilds every snapshot."""
+    try:
+        _history_snapshots(slug).document(_LEGACY_SNAPSHOT).delete()
+    except Exception as e:
+        logger.warning("Failed to invalidate batch history for %s: %s", slug, e)
+
+
+# Enrollment fields copied into frozen rosters
+ROSTER_FIELDS = {"status", "batch_id", "course", "firstName", "lastName", "email"}
+
+
+def on_roster_change(enrollment: dict):
+    """Call after editing roster fields of an enrollment; re-freezes its batch's snapshot if completed."""
+    batch_id = enrollment.get("batch_id")
+    slug = enrollment.get("course_slug")
+    if not batch_id or not slug:
+        return
+    batch = get_batches_by_id([batch_id]).get(batch_id)
+    if batch and batch.get("status") == "completed":
+        try:
+            _record_closed_batch(slug, batch_id, batch)
+        except Exception as e:
+            logger.warning("Failed to refresh history for batch %s: %s", batch_id, e)
+            invalidate_batch_history(slug)
+
+
+@router.get("/courses/{slug}/batches")
+def get_course_batches(slug: str, refresh: bool = False, _admin: dict = Depends(verify_jwt)):
+    """Get batch history for a course. ?refresh=true rebuilds the frozen history."""
+    merged_course = get_merged_courses_by_slug().get(slug)
+    if not merged_course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    history = _get_batch_history(slug, refresh)
+
+    active_batch = None
+    active_doc = _get_active_batch(slug)
+    if active_doc:
+        active_batch = _batch_entry(active_doc.id, active_doc.to_dict(), _batch_roster(slug, active_doc.id))
+
+    # Newest first
+    batches = list(reversed(history.get("batches", [])))
+    legacy = history.get("legacy") or []
+    if legacy:
+        batches.append({
             "batch_id": None,
             "batch_number": 0,
             "batch_label": "Legacy (Pre-tracking)",
@@ -890,19 +1082,21 @@ def get_course_batches(slug: str, _admin: dict = Depends(verify_jwt)):
             "start_date": None,
             "enrollment_deadline": None,
             "instructor": None,
-            "student_count": len(legacy_enrollments),
-            "students": legacy_enrollments,
+            "student_count": len(legacy),
+            "students": legacy,
             "created_at": None,
             "completed_at": None,
             "closed_enrollment_at": None,
         })
 
-    total_students = sum(len(enrollments_by_batch.get(bdoc.id, [])) for bdoc in batch_docs) + len(legacy_enrollments)
+    total_students = sum(b["student_count"] for b in batches)
+    if active_batch:
+        total_students += active_batch["student_count"]
 
     return {
         "course": merged_course.model_dump(),
         "active_batch": active_batch,
-        "batches": completed_batches_numbered,
+        "batches": batches,
         "total_students": total_students,
-        "total_batches": len(batch_docs),
+        "total_batches": len(history.get("batches", [])) + (1 if active_batch else 0),
     }
@@ -1,10 +1,14 @@
+import asyncio
 import logging
 import os
+from datetime import datetime, timezone
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException
 from reusable_components.auth import verify_jwt
-from reusable_components.firebase import db
+from reusable_components.http_client import get_http_client
+from reusable_components import email_outbox
+from reusable_components.email_notification_helper import zoho_token_expiry
+from reusable_components.firestore_repository import AsyncRepository
 
 logger = logging.getLogger(__name__)
 
@@ -12,23 +16,42 @@ router = APIRouter(prefix="/api/email", tags=["email"])
 
 ZOHO_CLIENT_ID = os.getenv("ZOHO_CLIENT_ID", "")
 ZOHO_CLIENT_SECRET = os.getenv("ZOHO_CLIENT_SECRET", "")
-ZOHO_MAIL_API = "https://mail.zoho.com/api"
-ZOHO_TOKEN_URL = "https://accounts.zoho.com/oauth/v2/token"
+ZOHO_MAIL_API = os.getenv("ZOHO_MAIL_API_URL", "https://mail.zoho.com/api")
+ZOHO_TOKEN_URL = os.getenv("ZOHO_ACCOUNTS_URL", "https://accounts.zoho.com") + "/oauth/v2/token"
+
+_zoho_token_repo = AsyncRepository("zoho_tokens")
+
+# Per-admin refresh guards, so concurrent 401s for one admin trigger a single token refresh
+_refresh_locks: dict[str, asyncio.Lock] = {}
 
 
 async def get_zoho_tokens(email: str) -> dict:
     """Get Zoho tokens from Firestore for the given admin email."""
-    collection = "zoho_tokens"
-    doc = db.collection(collection).document(email).get()
+    doc = await _zoho_token_repo.get(email)
     if not doc.exists:
         raise HTTPException(status_code=401, detail="Zoho tokens not found. Please re-login.")
     return doc.to_dict()
 
 
-async def refresh_zoho_access_token(email: str, refresh_token: str) -> str:
-    """Use refresh token to get a new Zoho access token."""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
+def _expired(tokens: dict) -> bool:
+    expires_at = tokens.get("access_token_expires_at")
+    return expires_at is not None and expires_at <= datetime.now(timezone.utc)
+
+
+async def refresh_zoho_access_token(email: str, refresh_token: str, stale_token: str | None = None) -> dict:
+    """Use refresh token to get a new Zoho access token; returns the stored token fields.
+
+    One refresh per admin at a time: callers that waited on the lock re-read
+    Firestore and reuse the token the first caller stored, unless it is the
+    same stale_token they saw fail.
+    """
+    async with _refresh_locks.setdefault(email, asyncio.Lock()):
+        doc = await _zoho_token_repo.get(email)
+        current = doc.to_dict() if doc.exists else {}
+        if current.get("access_token") and current["access_token"] != stale_token and not _expired(current):
+            return current
+
+        response = await get_http_client().post(
             ZOHO_TOKEN_URL,
             data={
                 "grant_type": "refresh_token",
@@ -37,35 +60,41 @@ async def refresh_zoho_access_token(email: str, refresh_token: str) -> str:
                 "refresh_token": refresh_token,
             },
         )
-    data = response.json()
-    if "error" in data:
-        raise HTTPException(status_code=401, detail="Zoho token refresh failed. Please re-login.")
+        data = response.json()
+        if "error" in data:
+            raise HTTPException(status_code=401, detail="Zoho token refresh failed. Please re-login.")
 
-    new_access_token = data["access_token"]
+        fields = {
+            "access_token": data["access_token"],
+            "access_token_expires_at": zoho_token_expiry(data),
+        }
 
-    # Update Firestore with new access token
-    collection = "zoho_tokens"
-    db.collection(collection).document(email).update({"access_token": new_access_token})
+        # Update Firestore with new access token
+        await _zoho_token_repo.update(email, fields)
 
-    return new_access_token
+        return {**current, **fields}
 
 
 async def zoho_mail_request(method: str, url: str, access_token: str, **kwargs):
     """Make a request to Zoho Mail API with the oauthtoken header."""
     headers = {"Authorization": f"Zoho-oauthtoken {access_token}"}
-    async with httpx.AsyncClient() as client:
-        response = await getattr(client, method)(url, headers=headers, **kwargs)
-    return response
+    return await get_http_client().request(method, url, headers=headers, **kwargs)
 
 
 async def zoho_request_with_refresh(method: str, url: str, email: str, tokens: dict, **kwargs):
-    """Make Zoho API request, refreshing token on 401."""
+    """Make Zoho API request, refreshing the token ahead of expiry or on 401.
+
+    `tokens` is updated in place, so later calls in the same handler use the new token.
+    """
+    if _expired(tokens):
+        tokens.update(await refresh_zoho_access_token(email, tokens["refresh_token"], tokens["access_token"]))
+
     response = await zoho_mail_request(method, url, tokens["access_token"], **kwargs)
 
     # If unauthorized, refresh token and retry once
     if response.status_code == 401:
-        new_token = await refresh_zoho_access_token(email, tokens["refresh_token"])
-        response = await zoho_mail_request(method, url, new_token, **kwargs)
+        tokens.update(await refresh_zoho_access_token(email, tokens["refresh_token"], tokens["access_token"]))
+        response = await zoho_mail_request(method, url, tokens["access_token"], **kwargs)
 
     return response
 
@@ -154,3 +183,36 @@ async def get_message(folder_id: str, message_id: str, payload: dict = Depends(v
         raise HTTPException(status_code=500, detail=str(e))
 
 
+
+# ── Outbox (queued notification emails) ──
+
+
+@router.get("/outbox")
+async def get_outbox(status: str = "dead", limit: int = 50, _admin: dict = Depends(verify_jwt)):
+    """List outbox jobs by status (dead letters by default), newest first."""
+    if status not in ("pending", "sending", "sent", "dead"):
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    try:
+        jobs = await email_outbox.store.list(status, min(limit, 200))
+        return [{k: v for k, v in job.items() if k != "html_content"} for job in jobs]
+    except Exception as e:
+        logger.exception("Failed to list email outbox")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/outbox/{job_id}/retry")
+async def retry_outbox_job(job_id: str, _admin: dict = Depends(verify_jwt)):
+    """Send a dead-lettered email through the outbox again."""
+    try:
+        job = await email_outbox.store.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Outbox job not found")
+        if job.get("status") != "dead":
+            raise HTTPException(status_code=400, detail=f"Only dead jobs can be retried (job is {job.get('status')})")
+        await email_outbox.requeue(job_id)
+        return {"message": "Email requeued"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to requeue email %s", job_id)
+        raise HTTPException(status_code=500, detail=str(e))
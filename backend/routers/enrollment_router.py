@@ -1,16 +1,43 @@
+import asyncio
+import copy
 import logging
 import os
-from datetime import datetime, timezone
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from firebase_admin import firestore
+from google.cloud.firestore import async_transactional
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from schemas.enrollment_schema import EnrollmentApplication
-from reusable_components.firebase import db
-from reusable_components.auth import verify_jwt, verify_applicant_jwt
+from schemas.enrollment_schema import EnrollmentApplication, EnrollmentSummary, EnrollmentSummaryPage, FollowUpBulkRequest
+from reusable_components.firebase import async_db, db
+from reusable_components.firestore_repository import AsyncRepository, enrollment_repo
+from reusable_components.student_users import upsert_student_user
+from reusable_components.changelog import (
+    DEFAULT_PAGE_SIZE as CHANGELOG_PAGE_SIZE,
+    read_changelog,
+    read_changelog_page,
+    stage_changelog,
+    update_with_changelog,
+    update_with_changelog_async,
+    with_status_stamp,
+)
+from reusable_components.auth import decode_jwt, verify_jwt, verify_applicant_jwt
+from reusable_components.document_links import (
+    DOCUMENT_SLOTS,
+    SUPPORTING_DOC_TYPE,
+    attach_document_links,
+    attach_supporting_links,
+    verify_document_link,
+)
 from reusable_components.gcloud_storage_helper import upload_file, delete_file, get_applicant_folder, generate_signed_url
 from reusable_components.email_notification_helper import send_email
+from reusable_components import email_outbox
 from email_templates.document_rejected import get_document_rejected_email_html
 from email_templates.documents_accepted import get_documents_accepted_email_html
 from email_templates.application_submitted import get_application_submitted_email_html
@@ -78,25 +105,58 @@ _WITHDRAWAL_REASONS = [
 ]
 
 
-def _log_email_sent(doc_ref, email_type: str, subject: str, triggered_by: str = "system"):
-    """Append an entry to the enrollment's emails_sent array."""
+def _email_log_updates(email_type: str, subject: str, triggered_by: str) -> dict:
+    """Fields that append one entry to emails_sent.
+
+    Follow-ups also stamp last_follow_up_at so list views never scan emails_sent.
+    """
+    updates = {
+        "emails_sent": firestore.ArrayUnion([{
+            "type": email_type,
+            "subject": subject,
+            "sent_at": datetime.now(timezone.utc).isoformat(),
+            "triggered_by": triggered_by,
+        }]),
+    }
+    if email_type == "follow_up":
+        updates["last_follow_up_at"] = firestore.SERVER_TIMESTAMP
+    return updates
+
+
+async def _log_email_sent(doc_ref, email_type: str, subject: str, triggered_by: str = "system"):
+    """Append an entry to the enrollment's emails_sent array (doc_ref is an async reference)."""
     try:
-        doc_ref.update({
-            "emails_sent": firestore.ArrayUnion([{
-                "type": email_type,
-                "subject": subject,
-                "sent_at": datetime.now(timezone.utc).isoformat(),
-                "triggered_by": triggered_by,
-            }]),
-        })
+        await doc_ref.update(_email_log_updates(email_type, subject, triggered_by))
     except Exception:
         logger.warning("Failed to log email_sent for %s", doc_ref.id)
 
 
-def _recompute_enrollment_status(doc_ref, data: dict) -> str | None:
+def _email_log_hook(doc_ref, email_type: str, subject: str, triggered_by: str = "system") -> tuple[str, dict]:
+    """Outbox hook that runs _log_email_sent once the email has actually been delivered."""
+    return ("enrollment_email_log", {
+        "enrollment_id": doc_ref.id,
+        "type": email_type,
+        "subject": subject,
+        "triggered_by": triggered_by,
+    })
+
+
+async def _on_enrollment_email_delivered(payload: dict):
+    await _log_email_sent(
+        enrollment_repo.ref(payload["enrollment_id"]),
+        payload["type"],
+        payload["subject"],
+        triggered_by=payload.get("triggered_by", "system"),
+    )
+
+
+email_outbox.on_delivered("enrollment_email_log", _on_enrollment_email_delivered)
+
+
+def _compute_status_update(data: dict) -> tuple[dict, list[dict]] | None:
     """Auto-advance enrollment status based on document review states.
 
-    Returns the new status string if changed, or None if unchanged.
+    Returns (update dict, changelog entries) if the status changes, or None if unchanged.
     """
     current_status = data.get("status", "pending_upload")
     if current_status not in _AUTO_STATUSES:
@@ -147,23 +207,89 @@ def _recompute_enrollment_status(doc_ref, data: dict) -> str | None:
 
     if new_status != current_status:
         now = datetime.now(timezone.utc).isoformat()
-        existing_changelog = data.get("changelog", [])
-        doc_ref.update({
+        updates = {
             "status": new_status,
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": existing_changelog + [{
-                "field": "status",
-                "oldValue": current_status,
-                "newValue": new_status,
-                "updatedBy": "system",
-                "updatedAt": now,
-                "note": "Auto-computed from document review states",
-            }],
-        })
-        return new_status
+        }
+        return updates, [{
+            "field": "status",
+            "oldValue": current_status,
+            "newValue": new_status,
+            "updatedBy": "system",
+            "updatedAt": now,
+            "note": "Auto-computed from document review states",
+        }]
     return None
 
 
+def _apply_field_updates(data: dict, updates: dict) -> dict:
+    """Apply dotted-path Firestore update fields to an in-memory document dict."""
+    for path, value in updates.items():
+        *parents, leaf = path.split(".")
+        node = data
+        for key in parents:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        if value is firestore.DELETE_FIELD:
+            node.pop(leaf, None)
+        else:
+            node[leaf] = value
+    return data
+
+
+def _plan_document_change(data: dict, build_updates) -> tuple[dict, list[dict], str | None]:
+    """Build a document-slot change plus the resulting auto-status transition.
+
+    build_updates(data) -> (update fields, changelog entries); it may raise HTTPException.
+    The status is recomputed on an in-memory copy with the updates applied, so the
+    whole change is committed in a single write.
+    Returns (updates, changelog entries, new status or None).
+    """
+    updates, entries = build_updates(data)
+    status_update = _compute_status_update(_apply_field_updates(copy.deepcopy(data), updates))
+    if not status_update:
+        return updates, entries, None
+    status_fields, status_entries = status_update
+    return {**updates, **status_fields}, entries + status_entries, status_fields["status"]
+
+
+def _commit_document_change(doc_ref, build_updates) -> tuple[dict, str | None]:
+    """Read, apply a document-slot change and recompute status in one transaction.
+
+    Returns (document data as read, new status or None).
+    """
+    @firestore.transactional
+    def _run(transaction):
+        snapshot = doc_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            raise HTTPException(status_code=404, detail="Enrollment not found")
+        data = snapshot.to_dict()
+        updates, entries, new_status = _plan_document_change(data, build_updates)
+        transaction.update(doc_ref, with_status_stamp(updates, entries))
+        stage_changelog(transaction, doc_ref, entries)
+        return data, new_status
+
+    return _run(db.transaction())
+
+
+async def _commit_document_change_async(doc_ref, build_updates) -> tuple[dict, str | None]:
+    """Async variant of _commit_document_change() for AsyncDocumentReference."""
+    @async_transactional
+    async def _run(transaction):
+        snapshot = await doc_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            raise HTTPException(status_code=404, detail="Enrollment not found")
+        data = snapshot.to_dict()
+        updates, entries, new_status = _plan_document_change(data, build_updates)
+        transaction.update(doc_ref, with_status_stamp(updates, entries))
+        stage_changelog(transaction, doc_ref, entries)
+        return data, new_status
+
+    return await _run(async_db.transaction())
+
+
 def _build_birthdate(data: dict) -> str:
     """Build YYYY-MM-DD birthdate string from enrollment fields."""
     month_str = data.get("birthMonth", "")
@@ -198,76 +324,186 @@ def _compute_age(data: dict) -> str:
     return str(age) if age >= 0 else ""
 
 
-def _sign_document_urls(documents: dict) -> dict:
-    """Replace public file_url with time-limited signed URLs for all document slots."""
-    for _doc_type, doc_data in documents.items():
-        for slot_key in ("applicant_upload", "official_scan"):
-            slot = doc_data.get(slot_key)
-            if slot and slot.get("gcs_path"):
-                slot["file_url"] = generate_signed_url(slot["gcs_path"])
-    return documents
+_DEFAULT_PAGE_SIZE = 50
+_MAX_PAGE_SIZE = 200
+
+
+def _parse_date_filter(value: str, param: str) -> datetime:
+    """Parse an ISO date/datetime query param into an aware UTC datetime."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {param}: expected ISO date (YYYY-MM-DD)")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _enrich_enrollment_row(doc, now: datetime) -> dict:
+    """Serialize an enrollment snapshot for the list view (adds derived age fields)."""
+    data = doc.to_dict()
+    data["id"] = doc.id
+    created_at = data.get("created_at")
+    status_since = data.get("status_changed_at") or created_at
+    last_follow_up = data.get("last_follow_up_at")
+
+    # Ages come from write-time stamps (see scripts/backfill_enrollment_timestamps.py)
+    data["days_in_status"] = _days_since(status_since, now)
+    data["days_since_follow_up"] = _days_since(last_follow_up, now)
+
+    # Convert Firestore timestamps to ISO strings
+    for ts_field in ("created_at", "status_changed_at", "last_follow_up_at"):
+        if hasattr(data.get(ts_field), "isoformat"):
+            data[ts_field] = data[ts_field].isoformat()
+    return data
+
+
+# Field mask for view=summary: list columns only (skips changelog, emails_sent, documents)
+_SUMMARY_FIELDS = [
+    "firstName", "lastName", "middleName", "email", "contactNo", "course", "status",
+    "sponsor_id", "street", "barangay", "district", "city", "province", "region",
+    "created_at", "status_changed_at", "last_follow_up_at",
+]
+
+
+def _days_since(value, now: datetime) -> int | None:
+    """Whole days between a Firestore timestamp / ISO string and now."""
+    if not value:
+        return None
+    try:
+        since_dt = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+    if since_dt.tzinfo is None:
+        since_dt = since_dt.replace(tzinfo=timezone.utc)
+    return (now - since_dt).days
+
+
+def _summarize_enrollment_row(doc, now: datetime) -> EnrollmentSummary:
+    """Build the slim list-view row from a field-masked snapshot."""
+    data = doc.to_dict()
+    created_at = data.pop("created_at", None)
+    status_since = data.pop("status_changed_at", None) or created_at
+    last_follow_up = data.pop("last_follow_up_at", None)
+    return EnrollmentSummary(
+        id=doc.id,
+        created_at=created_at.isoformat() if hasattr(created_at, "isoformat") else created_at,
+        days_in_status=_days_since(status_since, now),
+        days_since_follow_up=_days_since(last_follow_up, now),
+        **data,
+    )
+
+
+def _filter_enrollments(query, status: str | None, course: str | None, sponsor_id: str | None):
+    """Apply the list endpoints' equality filters (status is comma-separated)."""
+    if status:
+        statuses = [s.strip() for s in status.split(",") if s.strip()]
+        invalid = [s for s in statuses if s not in ENROLLMENT_STATUSES]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {', '.join(invalid)}")
+        if len(statuses) == 1:
+            query = query.where("status", "==", statuses[0])
+        elif statuses:
+            query = query.where("status", "in", statuses)
+    if course:
+        query = query.where("course", "==", course)
+    if sponsor_id:
+        query = query.where("sponsor_id", "==", sponsor_id)
+    return query
 
 
 @router.get("/enrollments")
-def get_enrollments(_admin: dict = Depends(verify_jwt)):
+def get_enrollments(
+    status: Optional[str] = Query(None, description="Comma-separated statuses"),
+    course: Optional[str] = Query(None),
+    sponsor_id: Optional[str] = Query(None),
+    created_from: Optional[str] = Query(None, description="ISO date, inclusive"),
+    created_to: Optional[str] = Query(None, description="ISO date, exclusive"),
+    limit: int = Query(_DEFAULT_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    stale_days: Optional[int] = Query(None, ge=0, description="Only rows whose status is at least N days old"),
+    _admin: dict = Depends(verify_jwt),
+):
+    """List enrollments, newest first, filtered server-side, one page at a time.
+
+    Returns {"items": [...], "next_cursor": id | null} with at most `limit` rows
+    (default _DEFAULT_PAGE_SIZE); pass next_cursor back as `cursor` to fetch the
+    following page.
+    view=summary fetches only list columns via a Firestore field mask and returns
+    EnrollmentSummary rows instead of full documents.
+    stale_days is a range query on status_changed_at, so those results are ordered
+    oldest status change first and cannot be combined with created_from/created_to.
+    Filters are backed by the composite indexes in emulator-data/firestore.indexes.json.
+    """
     try:
         collection = "pending_enrollment_application"
-        docs = db.collection(collection).order_by(
-            "created_at", direction=firestore.Query.DESCENDING
-        ).stream()
+        query = _filter_enrollments(db.collection(collection), status, course, sponsor_id)
+
+        if created_from:
+            query = query.where("created_at", ">=", _parse_date_filter(created_from, "created_from"))
+        if created_to:
+            query = query.where("created_at", "<", _parse_date_filter(created_to, "created_to"))
+
+        if stale_days is not None:
+            if created_from or created_to:
+                raise HTTPException(status_code=400, detail="stale_days cannot be combined with created_from/created_to")
+            stale_before = datetime.now(timezone.utc) - timedelta(days=stale_days)
+            query = query.where("status_changed_at", "<=", stale_before)
+            query = query.order_by("status_changed_at")
+        else:
+            query = query.order_by("created_at", direction=firestore.Query.DESCENDING)
 
-        now = datetime.now(timezone.utc)
-        enrollments = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            # Convert Firestore timestamp to ISO string
-            if data.get("created_at"):
-                data["created_at"] = data["created_at"].isoformat()
-
-            # Compute days_in_status from the most recent status changelog entry
-            status_since = None
-            for entry in reversed(data.get("changelog") or []):
-                if entry.get("field") == "status":
-                    status_since = entry.get("updatedAt")
-                    break
-            if status_since:
-                try:
-                    since_dt = datetime.fromisoformat(status_since)
-                    data["days_in_status"] = (now - since_dt).days
-                except (ValueError, TypeError):
-                    data["days_in_status"] = None
-            elif data.get("created_at"):
-                try:
-                    since_dt = datetime.fromisoformat(data["created_at"])
-                    data["days_in_status"] = (now - since_dt).days
-                except (ValueError, TypeError):
-                    data["days_in_status"] = None
-            else:
-                data["days_in_status"] = None
-
-            # Compute days since last follow-up email
-            last_follow_up = None
-            for email_entry in reversed(data.get("emails_sent") or []):
-                if email_entry.get("type") == "follow_up":
-                    last_follow_up = email_entry.get("sent_at")
-                    break
-            if last_follow_up:
-                try:
-                    fu_dt = datetime.fromisoformat(last_follow_up)
-                    data["days_since_follow_up"] = (now - fu_dt).days
-                except (ValueError, TypeError):
-                    data["days_since_follow_up"] = None
-            else:
-                data["days_since_follow_up"] = None
+        if cursor:
+            cursor_doc = db.collection(collection).document(cursor).get()
+            if not cursor_doc.exists:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.start_after(cursor_doc)
+
+        # Fetch one extra row to know whether another page exists
+        query = query.limit(limit + 1)
 
-            enrollments.append(data)
+        summary = view == "summary"
+        if summary:
+            query = query.select(_SUMMARY_FIELDS)
+        build_row = _summarize_enrollment_row if summary else _enrich_enrollment_row
+
+        now = datetime.now(timezone.utc)
+        docs = list(query.stream())
 
-        return enrollments
+        page = docs[:limit]
+        next_cursor = page[-1].id if len(docs) > limit else None
+        if summary:
+            return EnrollmentSummaryPage(items=[build_row(doc, now) for doc in page], next_cursor=next_cursor)
+        return {
+            "items": [build_row(doc, now) for doc in page],
+            "next_cursor": next_cursor,
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Failed to fetch enrollments")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/enrollments/count")
+def count_enrollments(
+    status: Optional[str] = Query(None, description="Comma-separated statuses"),
+    course: Optional[str] = Query(None),
+    sponsor_id: Optional[str] = Query(None),
+    _admin: dict = Depends(verify_jwt),
+):
+    """Number of enrollments matching the list filters (a server-side count aggregation)."""
+    try:
+        collection = "pending_enrollment_application"
+        query = _filter_enrollments(db.collection(collection), status, course, sponsor_id)
+        return {"count": int(query.count().get()[0][0].value)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to count enrollments")
+        raise HTTPException(status_code=500, detail=str(e))
+
 _STATUS_LABELS = {
     "pending": "Pending",
     "pending_upload": "Pending Upload",
@@ -283,42 +519,47 @@ _STATUS_LABELS = {
 }
 
 
+# Terminal / non-actionable statuses never get follow-ups
+_NO_FOLLOW_UP_STATUSES = {"withdrawn", "completed", "cancelled", "waiting_for_class_start"}
+
+
+def _follow_up_email(data: dict) -> tuple[str, str]:
+    """Subject and HTML of the follow-up email for an enrollment."""
+    status = data.get("status", "")
+    course = data.get("course", "")
+    subject = f"Follow-Up: Your {course} Application - Bright Horizon Institute"
+    html = get_follow_up_email_html(data.get("firstName", "Applicant"), course, _STATUS_LABELS.get(status, status))
+    return subject, html
+
+
 @router.post("/enrollments/{enrollment_id}/follow-up")
 async def send_follow_up_email(enrollment_id: str, _admin: dict = Depends(verify_jwt)):
     try:
-        collection = "pending_enrollment_application"
-        doc_ref = db.collection(collection).document(enrollment_id)
-        doc = doc_ref.get()
+        doc_ref = enrollment_repo.ref(enrollment_id)
+        doc = await doc_ref.get()
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Enrollment not found")
 
         data = doc.to_dict()
-        status = data.get("status", "")
 
-        # Don't allow follow-up for terminal / non-actionable statuses
-        if status in ("withdrawn", "completed", "cancelled", "waiting_for_class_start"):
+        if data.get("status", "") in _NO_FOLLOW_UP_STATUSES:
             raise HTTPException(status_code=400, detail="Follow-up not applicable for this status")
 
-        name = data.get("firstName", "Applicant")
         email = data.get("email")
-        course = data.get("course", "")
-        status_label = _STATUS_LABELS.get(status, status)
-
         if not email:
             raise HTTPException(status_code=400, detail="Applicant has no email address")
 
-        subject = f"Follow-Up: Your {course} Application - Bright Horizon Institute"
-        html = get_follow_up_email_html(name, course, status_label)
+        subject, html = _follow_up_email(data)
 
         await send_email(
             to=email,
             subject=subject,
             html_content=html,
             from_email=NOTIFICATION_FROM,
+            hook=_email_log_hook(doc_ref, "follow_up", subject, triggered_by="admin"),
         )
-        _log_email_sent(doc_ref, "follow_up", subject, triggered_by="admin")
 
-        return {"message": "Follow-up email sent successfully"}
+        return {"message": "Follow-up email queued"}
     except HTTPException:
         raise
     except Exception as e:
@@ -326,18 +567,263 @@ async def send_follow_up_email(enrollment_id: str, _admin: dict = Depends(verify
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ── Bulk follow-up ──
+#
+# POST /enrollments/follow-up/bulk resolves its targets up front, records a job
+# in follow_up_jobs and returns its id; a background task then queues the emails
+# through the outbox, BULK_FOLLOW_UP_CONCURRENCY at a time, updating the job's
+# counters as it goes. Delivered emails are logged to emails_sent in batched
+# writes (flush_email_logs) instead of one update per enrollment.
+
+FOLLOW_UP_JOBS_COLLECTION = "follow_up_jobs"
+BULK_FOLLOW_UP_MAX = 2000
+BULK_FOLLOW_UP_CONCURRENCY = 10
+_BULK_PROGRESS_EVERY = 50
+_BULK_MAX_ERRORS = 20
+# Enrollment updates per batch (plus one counter update per job; Firestore allows 500 writes)
+_EMAIL_LOG_BATCH = 450
+_EMAIL_LOG_FLUSH_SECONDS = 1.0
+
+_follow_up_job_repo = AsyncRepository(FOLLOW_UP_JOBS_COLLECTION)
+_bulk_tasks: set[asyncio.Task] = set()
+_email_log_buffer: list[dict] = []
+_email_log_flusher: asyncio.Task | None = None
+
+
+async def _resolve_follow_up_targets(body: FollowUpBulkRequest) -> list:
+    """Enrollment snapshots (firstName/email/course/status only) selected by the request."""
+    fields = ["firstName", "email", "course", "status"]
+    if body.enrollment_ids is not None:
+        if body.status or body.course or body.stale_days is not None:
+            raise HTTPException(status_code=400, detail="enrollment_ids cannot be combined with filters")
+        if len(set(body.enrollment_ids)) > BULK_FOLLOW_UP_MAX:
+            raise HTTPException(status_code=400, detail=f"At most {BULK_FOLLOW_UP_MAX} enrollments per job")
+        refs = [enrollment_repo.ref(i) for i in dict.fromkeys(body.enrollment_ids)]
+        return [doc async for doc in async_db.get_all(refs, field_paths=fields)] if refs else []
+
+    if not body.status and not body.course and body.stale_days is None:
+        raise HTTPException(status_code=400, detail="Provide enrollment_ids or at least one filter")
+
+    statuses = body.status or sorted(ENROLLMENT_STATUSES - _NO_FOLLOW_UP_STATUSES)
+    invalid = [s for s in statuses if s not in ENROLLMENT_STATUSES]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {', '.join(invalid)}")
+
+    collection = "pending_enrollment_application"
+    query = async_db.collection(collection).where("status", "in", statuses)
+    if body.course:
+        # Course title or slug; matched on the denormalized course_slug
+        from routers.course_router import course_slug_for
+        slug = course_slug_for({"course_slug": body.course, "course": body.course})
+        if not slug:
+            raise HTTPException(status_code=400, detail=f"Unknown course: {body.course}")
+        query = query.where("course_slug", "==", slug)
+    if body.stale_days is not None:
+        stale_before = datetime.now(timezone.utc) - timedelta(days=body.stale_days)
+        query = query.where("status_changed_at", "<=", stale_before).order_by("status_changed_at")
+    query = query.select(fields).limit(BULK_FOLLOW_UP_MAX + 1)
+
+    docs = [doc async for doc in query.stream()]
+    if len(docs) > BULK_FOLLOW_UP_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Filter matches more than {BULK_FOLLOW_UP_MAX} enrollments; narrow it down",
+        )
+    return docs
+
+
+def _follow_up_skip_reason(doc) -> str | None:
+    if not doc.exists:
+        return "not_found"
+    data = doc.to_dict()
+    if data.get("status", "") in _NO_FOLLOW_UP_STATUSES:
+        return "status_not_applicable"
+    if not data.get("email"):
+        return "no_email"
+    return None
+
+
+async def _run_bulk_follow_up(job_id: str, docs: list, triggered_by: str):
+    """Queue one follow-up per enrollment with bounded concurrency, reporting progress on the job."""
+    job_ref = _follow_up_job_repo.ref(job_id)
+    slots = asyncio.Semaphore(BULK_FOLLOW_UP_CONCURRENCY)
+    counts = {"queued": 0, "failed": 0}
+    errors: list[dict] = []
+
+    async def queue_one(doc):
+        async with slots:
+            data = doc.to_dict()
+            subject, html = _follow_up_email(data)
+            try:
+                await send_email(
+                    to=data["email"],
+                    subject=subject,
+                    html_content=html,
+                    from_email=NOTIFICATION_FROM,
+                    idempotency_key=f"{job_id}:{doc.id}:follow_up",
+                    hook=("bulk_follow_up_log", {
+                        "job_id": job_id,
+                        "enrollment_id": doc.id,
+                        "subject": subject,
+                        "triggered_by": triggered_by,
+                    }),
+                )
+                counts["queued"] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                if len(errors) < _BULK_MAX_ERRORS:
+                    errors.append({"enrollment_id": doc.id, "error": str(e)})
+            done = counts["queued"] + counts["failed"]
+            if done % _BULK_PROGRESS_EVERY == 0 and done < len(docs):
+                try:
+                    await job_ref.update(dict(counts))
+                except Exception as e:
+                    logger.warning("Failed to update follow-up job %s progress: %s", job_id, e)
+
+    try:
+        await asyncio.gather(*(queue_one(doc) for doc in docs))
+        await job_ref.update({
+            **counts,
+            "errors": errors,
+            "status": "completed",
+            "finished_at": firestore.SERVER_TIMESTAMP,
+        })
+    except Exception:
+        logger.exception("Bulk follow-up job %s failed", job_id)
+        try:
+            await job_ref.update({**counts, "errors": errors, "status": "failed", "finished_at": firestore.SERVER_TIMESTAMP})
+        except Exception as e:
+            logger.warning("Failed to mark follow-up job %s as failed: %s", job_id, e)
+
+
+async def _on_bulk_follow_up_delivered(payload: dict):
+    """Buffer the emails_sent entry; flush_email_logs writes it with its neighbours."""
+    global _email_log_flusher
+    _email_log_buffer.append(payload)
+    if len(_email_log_buffer) >= _EMAIL_LOG_BATCH:
+        await flush_email_logs()
+    elif _email_log_flusher is None or _email_log_flusher.done():
+        _email_log_flusher = asyncio.create_task(_flush_email_logs_later())
+
+
+async def _flush_email_logs_later():
+    await asyncio.sleep(_EMAIL_LOG_FLUSH_SECONDS)
+    await flush_email_logs()
+
+
+async def flush_email_logs():
+    """Write buffered bulk follow-up log entries, one batch per _EMAIL_LOG_BATCH enrollments.
+
+    Also called from the app lifespan on shutdown so buffered entries are not lost.
+    """
+    while _email_log_buffer:
+        chunk = _email_log_buffer[:_EMAIL_LOG_BATCH]
+        del _email_log_buffer[:len(chunk)]
+
+        delivered: dict[str, int] = {}
+        batch = async_db.batch()
+        for entry in chunk:
+            batch.update(
+                enrollment_repo.ref(entry["enrollment_id"]),
+                _email_log_updates("follow_up", entry["subject"], entry["triggered_by"]),
+            )
+            delivered[entry["job_id"]] = delivered.get(entry["job_id"], 0) + 1
+        for job_id, count in delivered.items():
+            batch.update(_follow_up_job_repo.ref(job_id), {"delivered": firestore.Increment(count)})
+
+        try:
+            await batch.commit()
+        except Exception as e:
+            # One missing document fails the whole batch; fall back to per-enrollment writes
+            logger.warning("Batched email log write failed (%s); writing %d entries one by one", e, len(chunk))
+            for entry in chunk:
+                await _log_email_sent(
+                    enrollment_repo.ref(entry["enrollment_id"]), "follow_up", entry["subject"], entry["triggered_by"],
+                )
+            # The emails went out whether or not their log entries could be written
+            for job_id, count in delivered.items():
+                try:
+                    await _follow_up_job_repo.update(job_id, {"delivered": firestore.Increment(count)})
+                except Exception as e:
+                    logger.warning("Failed to update follow-up job %s progress: %s", job_id, e)
+
+
+email_outbox.on_delivered("bulk_follow_up_log", _on_bulk_follow_up_delivered)
+
+
+@router.post("/enrollments/follow-up/bulk")
+async def send_bulk_follow_up(body: FollowUpBulkRequest, admin: dict = Depends(verify_jwt)):
+    """Queue follow-ups for many enrollments; poll GET /enrollments/follow-up/bulk/{job_id} for progress."""
+    try:
+        docs = await _resolve_follow_up_targets(body)
+
+        eligible = []
+        skipped: dict[str, int] = {}
+        for doc in docs:
+            reason = _follow_up_skip_reason(doc)
+            if reason:
+                skipped[reason] = skipped.get(reason, 0) + 1
+            else:
+                eligible.append(doc)
+
+        job_id = uuid.uuid4().hex
+        triggered_by = admin.get("sub", "unknown")
+        job = {
+            "status": "running" if eligible else "completed",
+            "filter": body.model_dump(exclude_none=True, exclude={"enrollment_ids"}),
+            "enrollment_ids_count": len(body.enrollment_ids) if body.enrollment_ids is not None else None,
+            "total": len(eligible),
+            "queued": 0,
+            "failed": 0,
+            "delivered": 0,
+            "skipped": skipped,
+            "errors": [],
+            "triggered_by": triggered_by,
+            "created_at": firestore.SERVER_TIMESTAMP,
+            "finished_at": None if eligible else firestore.SERVER_TIMESTAMP,
+        }
+        await _follow_up_job_repo.set(job_id, job)
+
+        if eligible:
+            task = asyncio.create_task(_run_bulk_follow_up(job_id, eligible, triggered_by))
+            _bulk_tasks.add(task)
+            task.add_done_callback(_bulk_tasks.discard)
+
+        return {"job_id": job_id, "status": job["status"], "total": len(eligible), "skipped": skipped}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to start bulk follow-up")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/enrollments/follow-up/bulk/{job_id}")
+async def get_bulk_follow_up(job_id: str, _admin: dict = Depends(verify_jwt)):
+    """Progress of a bulk follow-up job: queued/failed of total, and delivered so far."""
+    try:
+        doc = await _follow_up_job_repo.get(job_id)
+        if not doc.exists:
+            raise HTTPException(status_code=404, detail="Follow-up job not found")
+        data = doc.to_dict()
+        for ts_field in ("created_at", "finished_at"):
+            if hasattr(data.get(ts_field), "isoformat"):
+                data[ts_field] = data[ts_field].isoformat()
+        return {"id": job_id, **data}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to fetch follow-up job %s", job_id)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/enrollments")
 @limiter.limit("2/minute")
 async def submit_enrollment(request: Request, application: EnrollmentApplication):
     try:
-        collection = "pending_enrollment_application"
-
         # Duplicate application check: reject if same email+course has an active application
-        existing_apps = (
-            db.collection(collection)
-            .where("email", "==", application.email)
-            .where("course", "==", application.course)
-            .stream()
+        existing_apps = await enrollment_repo.find(
+            ("email", "==", application.email),
+            ("course", "==", application.course),
         )
         for existing_doc in existing_apps:
             if existing_doc.to_dict().get("status") not in _INACTIVE_STATUSES:
@@ -347,29 +833,24 @@ async def submit_enrollment(request: Request, application: EnrollmentApplication
                            f"Please check your existing application status before applying again.",
                 )
 
+        from routers.course_router import course_slug_for
+
         doc_data = application.model_dump()
+        doc_data["course_slug"] = course_slug_for(doc_data)
         doc_data["status"] = "pending_upload"
         doc_data["created_at"] = firestore.SERVER_TIMESTAMP
+        doc_data["status_changed_at"] = firestore.SERVER_TIMESTAMP
 
-        doc_ref = db.collection(collection).add(doc_data)
-        doc_id = doc_ref[1].id
+        doc_id = await enrollment_repo.add(doc_data)
+        doc_ref = enrollment_repo.ref(doc_id)
 
-        # Create student_users record with 'applicant' role (auto-generated ID)
-        student_collection = "student_users"
-        existing = list(
-            db.collection(student_collection)
-            .where("email", "==", application.email)
-            .limit(1)
-            .stream()
-        )
-        if not existing:
-            db.collection(student_collection).add({
-                "email": application.email,
-                "firstName": application.firstName,
-                "lastName": application.lastName,
-                "role": "applicant",
-                "created_at": firestore.SERVER_TIMESTAMP,
-            })
+        # Create student_users record with 'applicant' role (no-op if the email is known)
+        await upsert_student_user(application.email, {
+            "firstName": application.firstName,
+            "lastName": application.lastName,
+            "role": "applicant",
+            "created_at": firestore.SERVER_TIMESTAMP,
+        })
 
         # Send confirmation email with process overview
         try:
@@ -380,8 +861,9 @@ async def submit_enrollment(request: Request, application: EnrollmentApplication
                 subject=subject,
                 html_content=html,
                 from_email=NOTIFICATION_FROM,
+                idempotency_key=f"{doc_id}:application_submitted",
+                hook=_email_log_hook(doc_ref, "application_submitted", subject),
             )
-            _log_email_sent(doc_ref[1], "application_submitted", subject)
         except Exception as email_err:
             logger.warning("Failed to send submission confirmation email to %s: %s", application.email, email_err)
 
@@ -400,6 +882,7 @@ async def submit_enrollment(request: Request, application: EnrollmentApplication
                 subject=admin_subject,
                 html_content=admin_html,
                 from_email=NOTIFICATION_FROM,
+                idempotency_key=f"{doc_id}:admin_new_application",
             )
         except Exception as email_err:
             logger.warning("Failed to send admin notification email: %s", email_err)
@@ -425,15 +908,17 @@ def get_enrollment(enrollment_id: str, _admin: dict = Depends(verify_jwt)):
         data["id"] = doc.id
         data["age"] = _compute_age(data)
         if "documents" in data:
-            data["documents"] = _sign_document_urls(data["documents"])
+            data["documents"] = attach_document_links(enrollment_id, data["documents"])
+        if "supporting_documents" in data:
+            data["supporting_documents"] = attach_supporting_links(enrollment_id, data["supporting_documents"])
         if data.get("created_at"):
             data["created_at"] = data["created_at"].isoformat()
         if data.get("updated_at"):
             data["updated_at"] = data["updated_at"].isoformat()
-        # Convert changelog timestamps
-        for entry in data.get("changelog", []):
-            if hasattr(entry.get("updatedAt"), "isoformat"):
-                entry["updatedAt"] = entry["updatedAt"].isoformat()
+        for ts_field in ("status_changed_at", "last_follow_up_at"):
+            if hasattr(data.get(ts_field), "isoformat"):
+                data[ts_field] = data[ts_field].isoformat()
+        data["changelog"] = read_changelog(doc.reference, legacy=data.get("changelog"))
 
         return data
     except HTTPException:
@@ -443,8 +928,34 @@ def get_enrollment(enrollment_id: str, _admin: dict = Depends(verify_jwt)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/enrollments/{enrollment_id}/changelog")
+def get_enrollment_changelog(
+    enrollment_id: str,
+    limit: int = Query(CHANGELOG_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    _admin: dict = Depends(verify_jwt),
+):
+    """Page through an enrollment's changelog, newest first."""
+    try:
+        doc = enrollment_repo.sync.get(enrollment_id)
+        if not doc.exists:
+            raise HTTPException(status_code=404, detail="Enrollment not found")
+
+        entries, next_cursor = read_changelog_page(
+            doc.reference, limit=limit, cursor=cursor, legacy=doc.to_dict().get("changelog"),
+        )
+        return {"items": entries, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to fetch enrollment changelog")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # Fields that should not be editable by admin
-_PROTECTED_FIELDS = {"id", "created_at", "updated_at", "changelog"}
+_PROTECTED_FIELDS = {
+    "id", "created_at", "updated_at", "changelog", "status_changed_at", "last_follow_up_at", "course_slug",
+}
 
 
 @router.patch("/enrollments/{enrollment_id}")
@@ -491,18 +1002,28 @@ def update_enrollment(
         if not updates:
             return {"message": "No changes detected"}
 
-        # Append changelog entries
-        existing_changelog = current.get("changelog", [])
-        updates["changelog"] = existing_changelog + changelog_entries
-        updates["updated_at"] = firestore.SERVER_TIMESTAMP
+        # Keep the denormalized course slug in step with the course title
+        if "course" in updates:
+            from routers.course_router import course_slug_for
+            updates["course_slug"] = course_slug_for({"course": updates["course"]})
 
-        doc_ref.update(updates)
+        updates["updated_at"] = firestore.SERVER_TIMESTAMP
+        update_with_changelog(doc_ref, updates, changelog_entries)
 
         # If sponsor assignment changed, invalidate sponsors cache (scholars count)
         if "sponsor_id" in updates:
             from routers.sponsor_router import _invalidate_sponsors_cache
             _invalidate_sponsors_cache()
 
+        # A completed batch's frozen roster may now be out of date
+        from routers.course_router import ROSTER_FIELDS, on_roster_change
+        if ROSTER_FIELDS & updates.keys():
+            # Both the batch it left and the batch it is now in
+            updated = {**current, **updates}
+            on_roster_change(current)
+            if (updated.get("batch_id"), updated.get("course_slug")) != (current.get("batch_id"), current.get("course_slug")):
+                on_roster_change(updated)
+
         return {"message": f"{len(changelog_entries)} field(s) updated", "changes": changelog_entries}
     except HTTPException:
         raise
@@ -517,12 +1038,11 @@ async def send_interview_schedule(
     admin: dict = Depends(verify_jwt),
 ):
     """Send interview schedule email to a waitlisted applicant and update status."""
-    from routers.course_router import get_courses
+    from routers.course_router import course_slug_for, get_merged_courses_by_slug
 
     try:
-        collection = "pending_enrollment_application"
-        doc_ref = db.collection(collection).document(enrollment_id)
-        doc = doc_ref.get()
+        doc_ref = enrollment_repo.ref(enrollment_id)
+        doc = await doc_ref.get()
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Enrollment not found")
@@ -540,8 +1060,8 @@ async def send_interview_schedule(
             raise HTTPException(status_code=400, detail="Applicant has no email address")
 
         # Look up course data for start date and enrollment deadline
-        courses = get_courses()
-        course_data = next((c for c in courses if c.title == course_name), None)
+        courses = await run_in_threadpool(get_merged_courses_by_slug)
+        course_data = courses.get(course_slug_for(data))
 
         if not course_data:
             raise HTTPException(status_code=400, detail=f"Course '{course_name}' not found")
@@ -577,25 +1097,23 @@ async def send_interview_schedule(
             subject=subject,
             html_content=html,
             from_email=NOTIFICATION_FROM,
+            hook=_email_log_hook(doc_ref, "interview_schedule", subject, triggered_by=admin.get("sub", "system")),
         )
-        _log_email_sent(doc_ref, "interview_schedule", subject, triggered_by=admin.get("sub", "system"))
 
         # Update status to physical_docs_required
         admin_email = admin.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
-        existing_changelog = data.get("changelog", [])
-        doc_ref.update({
+        await update_with_changelog_async(doc_ref, {
             "status": "physical_docs_required",
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": existing_changelog + [{
-                "field": "status",
-                "oldValue": status,
-                "newValue": "physical_docs_required",
-                "updatedBy": admin_email,
-                "updatedAt": now,
-                "note": "Interview schedule email sent",
-            }],
-        })
+        }, [{
+            "field": "status",
+            "oldValue": status,
+            "newValue": "physical_docs_required",
+            "updatedBy": admin_email,
+            "updatedAt": now,
+            "note": "Interview schedule email sent",
+        }])
 
         return {"message": f"Interview schedule email sent to {applicant_email}"}
     except HTTPException:
@@ -611,12 +1129,11 @@ async def complete_enrollment(
     admin: dict = Depends(verify_jwt),
 ):
     """Assign an enrollment to a class batch and promote the applicant to a student account."""
-    from routers.course_router import get_courses, _get_active_batch, _COURSES_BY_SLUG
+    from routers.course_router import _get_active_batch, course_slug_for, get_merged_courses_by_slug
 
     try:
-        collection = "pending_enrollment_application"
-        doc_ref = db.collection(collection).document(enrollment_id)
-        doc = doc_ref.get()
+        doc_ref = enrollment_repo.ref(enrollment_id)
+        doc = await doc_ref.get()
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Enrollment not found")
@@ -634,10 +1151,10 @@ async def complete_enrollment(
         course_name = data.get("course", "")
 
         # Look up course and active batch for batch stamping
-        courses = get_courses()
-        course_data = next((c for c in courses if c.title == course_name), None)
-        course_obj = next((c for c in _COURSES_BY_SLUG.values() if c.title == course_name), None)
-        active_batch = _get_active_batch(course_obj.slug) if course_obj else None
+        course_slug = course_slug_for(data)
+        courses = await run_in_threadpool(get_merged_courses_by_slug)
+        course_data = courses.get(course_slug)
+        active_batch = await run_in_threadpool(_get_active_batch, course_slug) if course_slug else None
         if not active_batch:
             raise HTTPException(
                 status_code=400,
@@ -651,44 +1168,31 @@ async def complete_enrollment(
         # Update enrollment status to completed
         admin_email = admin.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
-        existing_changelog = data.get("changelog", [])
-        doc_ref.update({
+        await update_with_changelog_async(doc_ref, {
             "status": "completed",
             "batch_id": batch_id,
             "batch_start_date": batch_start_date,
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": existing_changelog + [{
-                "field": "status",
-                "oldValue": status,
-                "newValue": "completed",
-                "updatedBy": admin_email,
-                "updatedAt": now,
-                "note": f"Assigned to batch {batch_id}, student account activated",
-            }],
-        })
+        }, [{
+            "field": "status",
+            "oldValue": status,
+            "newValue": "completed",
+            "updatedBy": admin_email,
+            "updatedAt": now,
+            "note": f"Assigned to batch {batch_id}, student account activated",
+        }])
 
         # Promote student_users role from 'applicant' to 'student'
-        student_collection = "student_users"
         if applicant_email:
-            existing_students = list(
-                db.collection(student_collection)
-                .where("email", "==", applicant_email)
-                .limit(1)
-                .stream()
-            )
-            if existing_students:
-                existing_students[0].reference.update({
-                    "role": "student",
-                    "updated_at": firestore.SERVER_TIMESTAMP,
-                })
-            else:
-                db.collection(student_collection).add({
-                    "email": applicant_email,
-                    "firstName": data.get("firstName", ""),
-                    "lastName": data.get("lastName", ""),
-                    "role": "student",
-                    "created_at": firestore.SERVER_TIMESTAMP,
-                })
+            await upsert_student_user(applicant_email, {
+                "firstName": data.get("firstName", ""),
+                "lastName": data.get("lastName", ""),
+                "role": "student",
+                "created_at": firestore.SERVER_TIMESTAMP,
+            }, existing_updates={
+                "role": "student",
+                "updated_at": firestore.SERVER_TIMESTAMP,
+            })
 
         # Send batch assigned email
         if applicant_email:
@@ -714,8 +1218,8 @@ async def complete_enrollment(
                     subject=subject,
                     html_content=html,
                     from_email=NOTIFICATION_FROM,
+                    hook=_email_log_hook(doc_ref, "batch_assigned", subject, triggered_by=admin_email),
                 )
-                _log_email_sent(doc_ref, "batch_assigned", subject, triggered_by=admin_email)
             except Exception as email_err:
                 logger.warning("Failed to send batch assigned email to %s: %s", applicant_email, email_err)
 
@@ -737,9 +1241,8 @@ async def remove_from_batch(
 ):
     """Remove a completed enrollment from its batch and set back to waiting_for_class_start."""
     try:
-        collection = "pending_enrollment_application"
-        doc_ref = db.collection(collection).document(enrollment_id)
-        doc = doc_ref.get()
+        doc_ref = enrollment_repo.ref(enrollment_id)
+        doc = await doc_ref.get()
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Enrollment not found")
@@ -757,22 +1260,23 @@ async def remove_from_batch(
         course_name = data.get("course", "")
         admin_email = admin.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
-        existing_changelog = data.get("changelog", [])
 
-        doc_ref.update({
+        await update_with_changelog_async(doc_ref, {
             "status": "waiting_for_class_start",
             "batch_id": None,
             "batch_start_date": None,
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": existing_changelog + [{
-                "field": "status",
-                "oldValue": "completed",
-                "newValue": "waiting_for_class_start",
-                "updatedBy": admin_email,
-                "updatedAt": now,
-                "note": "Removed from batch, waiting for new class assignment",
-            }],
-        })
+        }, [{
+            "field": "status",
+            "oldValue": "completed",
+            "newValue": "waiting_for_class_start",
+            "updatedBy": admin_email,
+            "updatedAt": now,
+            "note": "Removed from batch, waiting for new class assignment",
+        }])
+
+        from routers.course_router import on_roster_change
+        await run_in_threadpool(on_roster_change, data)
 
         # Send notification email
         if applicant_email:
@@ -787,8 +1291,8 @@ async def remove_from_batch(
                     subject=subject,
                     html_content=html,
                     from_email=NOTIFICATION_FROM,
+                    hook=_email_log_hook(doc_ref, "batch_removed", subject, triggered_by=admin_email),
                 )
-                _log_email_sent(doc_ref, "batch_removed", subject, triggered_by=admin_email)
             except Exception as email_err:
                 logger.warning("Failed to send batch removed email to %s: %s", applicant_email, email_err)
 
@@ -808,11 +1312,8 @@ def get_documents(enrollment_id: str, _admin: dict = Depends(verify_jwt)):
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Enrollment not found")
         data = doc.to_dict()
-        documents = _sign_document_urls(data.get("documents", {}))
-        supporting = data.get("supporting_documents", [])
-        for s in supporting:
-            if s.get("gcs_path"):
-                s["file_url"] = generate_signed_url(s["gcs_path"])
+        documents = attach_document_links(enrollment_id, data.get("documents", {}))
+        supporting = attach_supporting_links(enrollment_id, data.get("supporting_documents", []))
         return {
             "document_types": REQUIRED_DOCUMENTS,
             "documents": documents,
@@ -825,6 +1326,69 @@ def get_documents(enrollment_id: str, _admin: dict = Depends(verify_jwt)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+_optional_bearer = HTTPBearer(auto_error=False)
+
+
+def _stored_document_path(data: dict, doc_type: str, slot: str) -> str | None:
+    """GCS path of a required-document slot or supporting document, if stored."""
+    if doc_type == SUPPORTING_DOC_TYPE:
+        entry = next(
+            (d for d in data.get("supporting_documents", []) if d.get("gcs_path", "").rsplit("/", 1)[-1] == slot),
+            None,
+        )
+        return entry.get("gcs_path") if entry else None
+    if slot not in DOCUMENT_SLOTS:
+        return None
+    return (data.get("documents", {}).get(doc_type, {}).get(slot) or {}).get("gcs_path")
+
+
+@router.get("/documents/{enrollment_id}/{doc_type}/{slot}/open")
+def open_document(
+    enrollment_id: str,
+    doc_type: str,
+    slot: str,
+    token: Optional[str] = Query(None, description="Link token from a detail payload's file_url"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_optional_bearer),
+):
+    """Sign one URL for a stored file at click time and redirect to it.
+
+    Authorized by the per-file link token embedded in detail payloads, or by an
+    admin JWT / the owning applicant's JWT in the Authorization header.
+    """
+    try:
+        applicant = None
+        if token:
+            if not verify_document_link(token, enrollment_id, doc_type, slot):
+                raise HTTPException(status_code=403, detail="Invalid or expired document link")
+        elif credentials:
+            payload = decode_jwt(credentials.credentials)
+            if payload.get("role") == "applicant":
+                applicant = payload
+        else:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+
+        if applicant:
+            if doc_type == SUPPORTING_DOC_TYPE:
+                raise HTTPException(status_code=403, detail="Access denied")
+            _doc_ref, data = _verify_enrollment_ownership(enrollment_id, applicant)
+        else:
+            doc = enrollment_repo.sync.get(enrollment_id)
+            if not doc.exists:
+                raise HTTPException(status_code=404, detail="Enrollment not found")
+            data = doc.to_dict()
+
+        gcs_path = _stored_document_path(data, doc_type, slot)
+        if not gcs_path:
+            raise HTTPException(status_code=404, detail="Document not found")
+
+        return RedirectResponse(generate_signed_url(gcs_path), status_code=302)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to open document")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/enrollments/{enrollment_id}/documents/{doc_type}")
 def upload_document(
     enrollment_id: str,
@@ -892,11 +1456,8 @@ def upload_document(
             update_fields[f"documents.{doc_type}.review.reviewed_by"] = admin_email
             update_fields[f"documents.{doc_type}.review.reviewed_at"] = now
 
-        doc_ref.update(update_fields)
-
-        # Re-read and auto-advance enrollment status
-        updated_data = doc_ref.get().to_dict()
-        _recompute_enrollment_status(doc_ref, updated_data)
+        # Apply the slot update and auto-advance enrollment status in one commit
+        _commit_document_change(doc_ref, lambda _data: (update_fields, []))
 
         return {"message": "Document uploaded", "slot": slot_key, "metadata": doc_metadata}
     except HTTPException:
@@ -919,44 +1480,34 @@ def delete_document(
         raise HTTPException(status_code=400, detail="Invalid source. Must be 'applicant' or 'official'")
 
     try:
-        collection = "pending_enrollment_application"
-        doc_ref = db.collection(collection).document(enrollment_id)
-        doc = doc_ref.get()
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Enrollment not found")
-
-        data = doc.to_dict()
+        doc_ref = enrollment_repo.sync.ref(enrollment_id)
         slot_key = "applicant_upload" if source == "applicant" else "official_scan"
-        documents = data.get("documents", {})
-        doc_data = documents.get(doc_type, {})
-        slot_data = doc_data.get(slot_key)
-
-        if not slot_data:
-            raise HTTPException(status_code=404, detail="Document not found")
-
-        # Delete from GCS
-        gcs_path = slot_data.get("gcs_path")
+        other_slot_key = "official_scan" if source == "applicant" else "applicant_upload"
+
+        def build_updates(data: dict):
+            doc_data = data.get("documents", {}).get(doc_type, {})
+            if not doc_data.get(slot_key):
+                raise HTTPException(status_code=404, detail="Document not found")
+            updates = {
+                f"documents.{doc_type}.{slot_key}": firestore.DELETE_FIELD,
+                "updated_at": firestore.SERVER_TIMESTAMP,
+            }
+            # If both slots end up empty, reset review to pending
+            if not doc_data.get(other_slot_key):
+                updates[f"documents.{doc_type}.review"] = {"status": "pending"}
+            return updates, []
+
+        # Remove from Firestore and auto-advance enrollment status in one commit
+        data, _new_status = _commit_document_change(doc_ref, build_updates)
+
+        # Delete from GCS once the slot no longer references it
+        gcs_path = data["documents"][doc_type][slot_key].get("gcs_path")
         if gcs_path:
             try:
                 delete_file(gcs_path)
             except Exception:
                 logger.warning(f"Failed to delete GCS file: {gcs_path}")
 
-        # Remove from Firestore
-        doc_ref.update({
-            f"documents.{doc_type}.{slot_key}": firestore.DELETE_FIELD,
-            "updated_at": firestore.SERVER_TIMESTAMP,
-        })
-
-        # If both slots are now empty, reset review to pending
-        updated_data = doc_ref.get().to_dict()
-        updated_doc = updated_data.get("documents", {}).get(doc_type, {})
-        if not updated_doc.get("applicant_upload") and not updated_doc.get("official_scan"):
-            doc_ref.update({f"documents.{doc_type}.review": {"status": "pending"}})
-            updated_data = doc_ref.get().to_dict()
-
-        _recompute_enrollment_status(doc_ref, updated_data)
-
         return {"message": "Document deleted", "slot": slot_key}
     except HTTPException:
         raise
@@ -1086,25 +1637,10 @@ async def review_document(
         raise HTTPException(status_code=400, detail="Reject reason is required")
 
     try:
-        collection = "pending_enrollment_application"
-        doc_ref = db.collection(collection).document(enrollment_id)
-        doc = doc_ref.get()
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Enrollment not found")
-
-        data = doc.to_dict()
-        doc_data = data.get("documents", {}).get(doc_type, {})
-
-        # Must have at least one file to review
-        if not doc_data.get("applicant_upload") and not doc_data.get("official_scan"):
-            raise HTTPException(status_code=400, detail="No file uploaded for this document")
-
+        doc_ref = enrollment_repo.ref(enrollment_id)
         admin_email = admin.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
 
-        old_review = doc_data.get("review", {})
-        old_status = old_review.get("status", "uploaded")
-
         review = {
             "status": status,
             "reviewed_by": admin_email,
@@ -1113,27 +1649,30 @@ async def review_document(
         if status == "rejected":
             review["reject_reason"] = reject_reason.strip()
 
-        # Append changelog entry
-        existing_changelog = data.get("changelog", [])
-        changelog_entry = {
-            "field": f"document_review.{doc_type}",
-            "oldValue": old_status,
-            "newValue": status,
-            "updatedBy": admin_email,
-            "updatedAt": now,
-        }
-        if status == "rejected":
-            changelog_entry["newValue"] = f"rejected: {reject_reason.strip()}"
+        def build_updates(data: dict):
+            doc_data = data.get("documents", {}).get(doc_type, {})
 
-        doc_ref.update({
-            f"documents.{doc_type}.review": review,
-            "changelog": existing_changelog + [changelog_entry],
-            "updated_at": firestore.SERVER_TIMESTAMP,
-        })
+            # Must have at least one file to review
+            if not doc_data.get("applicant_upload") and not doc_data.get("official_scan"):
+                raise HTTPException(status_code=400, detail="No file uploaded for this document")
 
-        # Auto-advance enrollment status
-        updated_data = doc_ref.get().to_dict()
-        new_enrollment_status = _recompute_enrollment_status(doc_ref, updated_data)
+            old_status = doc_data.get("review", {}).get("status", "uploaded")
+            changelog_entry = {
+                "field": f"document_review.{doc_type}",
+                "oldValue": old_status,
+                "newValue": status,
+                "updatedBy": admin_email,
+                "updatedAt": now,
+            }
+            if status == "rejected":
+                changelog_entry["newValue"] = f"rejected: {reject_reason.strip()}"
+            return {
+                f"documents.{doc_type}.review": review,
+                "updated_at": firestore.SERVER_TIMESTAMP,
+            }, [changelog_entry]
+
+        # Apply the review and auto-advance enrollment status in one transaction
+        data, new_enrollment_status = await _commit_document_change_async(doc_ref, build_updates)
 
         # Send email notifications
         applicant_email = data.get("email", "")
@@ -1149,8 +1688,8 @@ async def review_document(
                         subject=subject,
                         html_content=html,
                         from_email=NOTIFICATION_FROM,
+                        hook=_email_log_hook(doc_ref, "document_rejected", subject, triggered_by=admin_email),
                     )
-                    _log_email_sent(doc_ref, "document_rejected", subject, triggered_by=admin_email)
                 elif new_enrollment_status == "physical_docs_required":
                     subject = "Documents Accepted: Please Visit Our Office - Bright Horizon Institute"
                     html = get_documents_accepted_email_html(applicant_name)
@@ -1159,8 +1698,8 @@ async def review_document(
                         subject=subject,
                         html_content=html,
                         from_email=NOTIFICATION_FROM,
+                        hook=_email_log_hook(doc_ref, "documents_accepted", subject, triggered_by=admin_email),
                     )
-                    _log_email_sent(doc_ref, "documents_accepted", subject, triggered_by=admin_email)
             except Exception as email_err:
                 logger.warning("Failed to send review notification email to %s: %s", applicant_email, email_err)
 
@@ -1175,21 +1714,34 @@ async def review_document(
 # ── Applicant-facing endpoints (OTP-verified JWT) ─────────────────────
 
 
+def _check_enrollment_ownership(doc, applicant: dict) -> dict:
+    """Raise 404/403 unless the snapshot exists and belongs to the applicant. Returns its data."""
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="Enrollment not found")
+
+    data = doc.to_dict()
+    if data.get("email", "").lower() != applicant.get("sub", "").lower():
+        raise HTTPException(status_code=403, detail="Access denied")
+    return data
+
+
 def _verify_enrollment_ownership(enrollment_id: str, applicant: dict):
     """Verify the applicant JWT owns the enrollment. Returns (doc_ref, data)."""
     if enrollment_id not in applicant.get("enrollment_ids", []):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    collection = "pending_enrollment_application"
-    doc_ref = db.collection(collection).document(enrollment_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Enrollment not found")
+    doc_ref = enrollment_repo.sync.ref(enrollment_id)
+    data = _check_enrollment_ownership(doc_ref.get(), applicant)
+    return doc_ref, data
 
-    data = doc.to_dict()
-    if data.get("email", "").lower() != applicant.get("sub", "").lower():
+
+async def _verify_enrollment_ownership_async(enrollment_id: str, applicant: dict):
+    """Async variant of _verify_enrollment_ownership. Returns (async doc_ref, data)."""
+    if enrollment_id not in applicant.get("enrollment_ids", []):
         raise HTTPException(status_code=403, detail="Access denied")
 
+    doc_ref = enrollment_repo.ref(enrollment_id)
+    data = _check_enrollment_ownership(await doc_ref.get(), applicant)
     return doc_ref, data
 
 
@@ -1200,7 +1752,7 @@ def get_applicant_enrollment(enrollment_id: str, applicant: dict = Depends(verif
         data["id"] = enrollment_id
         data["age"] = _compute_age(data)
         if "documents" in data:
-            data["documents"] = _sign_document_urls(data["documents"])
+            data["documents"] = attach_document_links(enrollment_id, data["documents"])
         if data.get("created_at"):
             data["created_at"] = data["created_at"].isoformat()
         if data.get("updated_at"):
@@ -1218,7 +1770,7 @@ def get_applicant_enrollment(enrollment_id: str, applicant: dict = Depends(verif
 def get_applicant_documents(enrollment_id: str, applicant: dict = Depends(verify_applicant_jwt)):
     try:
         _doc_ref, data = _verify_enrollment_ownership(enrollment_id, applicant)
-        documents = _sign_document_urls(data.get("documents", {}))
+        documents = attach_document_links(enrollment_id, data.get("documents", {}))
         return {
             "document_types": REQUIRED_DOCUMENTS,
             "documents": documents,
@@ -1275,14 +1827,12 @@ def upload_applicant_document(
             "uploaded_by": applicant_email,
         }
 
-        doc_ref.update({
+        update_fields = {
             f"documents.{doc_type}.applicant_upload": doc_metadata,
             f"documents.{doc_type}.review.status": "uploaded",
             "updated_at": firestore.SERVER_TIMESTAMP,
-        })
-
-        updated_data = doc_ref.get().to_dict()
-        _recompute_enrollment_status(doc_ref, updated_data)
+        }
+        _commit_document_change(doc_ref, lambda _data: (update_fields, []))
 
         return {"message": "Document uploaded", "slot": "applicant_upload", "metadata": doc_metadata}
     except HTTPException:
@@ -1294,8 +1844,8 @@ def upload_applicant_document(
 
 # Fields applicants may never edit
 _APPLICANT_PROTECTED_FIELDS = {
-    "id", "created_at", "updated_at", "changelog", "status",
-    "documents", "email", "course", "privacyConsent",
+    "id", "created_at", "updated_at", "changelog", "status", "status_changed_at", "last_follow_up_at",
+    "documents", "email", "course", "course_slug", "privacyConsent",
 }
 
 
@@ -1338,11 +1888,8 @@ def update_applicant_enrollment(
         if not updates:
             return {"message": "No changes detected"}
 
-        existing_changelog = data.get("changelog", [])
-        updates["changelog"] = existing_changelog + changelog_entries
         updates["updated_at"] = firestore.SERVER_TIMESTAMP
-
-        doc_ref.update(updates)
+        update_with_changelog(doc_ref, updates, changelog_entries)
 
         return {"message": f"{len(changelog_entries)} field(s) updated", "changes": changelog_entries}
     except HTTPException:
@@ -1355,35 +1902,29 @@ def update_applicant_enrollment(
 @router.get("/applicant/my-classes")
 def get_my_classes(applicant: dict = Depends(verify_applicant_jwt)):
     """Return the student's enrolled classes with batch and course info."""
-    from routers.course_router import COURSES
+    from routers.course_router import _COURSES_BY_SLUG, course_slug_for, get_batches_by_id
 
     email = applicant.get("sub", "").lower()
     try:
         collection = "pending_enrollment_application"
-        docs = (
+        docs = list(
             db.collection(collection)
             .where("email", "==", email)
             .where("status", "==", "completed")
             .stream()
         )
 
-        # Build a lookup from course title → Course object
-        course_map = {c.title: c for c in COURSES}
+        # Resolve every referenced batch in one round trip
+        batches = get_batches_by_id(doc.to_dict().get("batch_id") for doc in docs)
 
         classes = []
         for doc in docs:
             data = doc.to_dict()
             batch_id = data.get("batch_id")
             course_title = data.get("course", "")
-            course_info = course_map.get(course_title)
+            course_info = _COURSES_BY_SLUG.get(course_slug_for(data))
 
-            # Fetch batch details if available
-            batch = None
-            if batch_id:
-                batch_collection = "course_batches"
-                batch_doc = db.collection(batch_collection).document(batch_id).get()
-                if batch_doc.exists:
-                    batch = batch_doc.to_dict()
+            batch = batches.get(batch_id) if batch_id else None
 
             created_at = data.get("created_at")
             if created_at and hasattr(created_at, "isoformat"):
@@ -1434,18 +1975,17 @@ def archive_enrollment(
         admin_email = admin.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
 
-        doc_ref.update({
+        update_with_changelog(doc_ref, {
             "status": "archived",
             "previous_status": current.get("status", "pending_upload"),
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": current.get("changelog", []) + [{
-                "field": "status",
-                "oldValue": current.get("status", ""),
-                "newValue": "archived",
-                "updatedBy": admin_email,
-                "updatedAt": now,
-            }],
-        })
+        }, [{
+            "field": "status",
+            "oldValue": current.get("status", ""),
+            "newValue": "archived",
+            "updatedBy": admin_email,
+            "updatedAt": now,
+        }])
 
         return {"message": "Enrollment archived"}
     except HTTPException:
@@ -1477,17 +2017,16 @@ def unarchive_enrollment(
         admin_email = admin.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
 
-        doc_ref.update({
+        update_with_changelog(doc_ref, {
             "status": restored_status,
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": current.get("changelog", []) + [{
-                "field": "status",
-                "oldValue": "archived",
-                "newValue": restored_status,
-                "updatedBy": admin_email,
-                "updatedAt": now,
-            }],
-        })
+        }, [{
+            "field": "status",
+            "oldValue": "archived",
+            "newValue": restored_status,
+            "updatedBy": admin_email,
+            "updatedAt": now,
+        }])
 
         return {"message": f"Enrollment restored to {restored_status}"}
     except HTTPException:
@@ -1515,7 +2054,7 @@ async def withdraw_enrollment(
         raise HTTPException(status_code=400, detail="Please provide details for your reason")
 
     try:
-        doc_ref, data = _verify_enrollment_ownership(enrollment_id, applicant)
+        doc_ref, data = await _verify_enrollment_ownership_async(enrollment_id, applicant)
 
         current_status = data.get("status", "pending_upload")
         if current_status not in _WITHDRAWABLE_STATUSES:
@@ -1527,21 +2066,20 @@ async def withdraw_enrollment(
         applicant_email = applicant.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
 
-        doc_ref.update({
+        await update_with_changelog_async(doc_ref, {
             "status": "withdrawn",
             "previous_status": current_status,
             "withdraw_reason": reason,
             "withdraw_comments": comments,
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": data.get("changelog", []) + [{
-                "field": "status",
-                "oldValue": current_status,
-                "newValue": "withdrawn",
-                "updatedBy": applicant_email,
-                "updatedAt": now,
-                "note": f"Withdrawn by applicant. Reason: {reason}",
-            }],
-        })
+        }, [{
+            "field": "status",
+            "oldValue": current_status,
+            "newValue": "withdrawn",
+            "updatedBy": applicant_email,
+            "updatedAt": now,
+            "note": f"Withdrawn by applicant. Reason: {reason}",
+        }])
 
         # Send withdrawal confirmation email to applicant
         applicant_name = data.get("firstName", "Applicant")
@@ -1554,8 +2092,9 @@ async def withdraw_enrollment(
                 subject=subject,
                 html_content=html,
                 from_email=NOTIFICATION_FROM,
+                idempotency_key=f"{enrollment_id}:application_withdrawn",
+                hook=_email_log_hook(doc_ref, "application_withdrawn", subject, triggered_by=applicant_email),
             )
-            _log_email_sent(doc_ref, "application_withdrawn", subject, triggered_by=applicant_email)
         except Exception as email_err:
             logger.warning("Failed to send withdrawal email to %s: %s", applicant_email, email_err)
 
@@ -1575,6 +2114,7 @@ async def withdraw_enrollment(
                 subject=admin_subject,
                 html_content=admin_html,
                 from_email=NOTIFICATION_FROM,
+                idempotency_key=f"{enrollment_id}:admin_application_withdrawn",
             )
         except Exception as email_err:
             logger.warning("Failed to send withdrawal admin notification: %s", email_err)
@@ -1618,20 +2158,19 @@ def cancel_enrollment(
         admin_email = admin.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
 
-        doc_ref.update({
+        update_with_changelog(doc_ref, {
             "status": "cancelled",
             "previous_status": current_status,
             "cancel_reason": reason,
             "updated_at": firestore.SERVER_TIMESTAMP,
-            "changelog": current.get("changelog", []) + [{
-                "field": "status",
-                "oldValue": current_status,
-                "newValue": "cancelled",
-                "updatedBy": admin_email,
-                "updatedAt": now,
-                "note": f"Cancelled by admin. Reason: {reason}",
-            }],
-        })
+        }, [{
+            "field": "status",
+            "oldValue": current_status,
+            "newValue": "cancelled",
+            "updatedBy": admin_email,
+            "updatedAt": now,
+            "note": f"Cancelled by admin. Reason: {reason}",
+        }])
 
         return {"message": "Enrollment cancelled"}
     except HTTPException:
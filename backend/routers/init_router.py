@@ -5,12 +5,14 @@ Creates default admin user when brighthii_staffs collection is empty.
 
 import logging
 from fastapi import APIRouter, HTTPException
-from reusable_components.firebase import db
+from reusable_components.firestore_repository import AsyncRepository
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/init", tags=["initialization"])
 
+_staff_repo = AsyncRepository("brighthii_staffs")
+
 
 @router.post("/admin")
 async def initialize_first_admin():
@@ -23,10 +25,8 @@ async def initialize_first_admin():
     This solves the bootstrapping problem for dev/staging/prod environments.
     """
     try:
-        staffs_collection = db.collection("brighthii_staffs")
-
         # SECURITY: Check if any staffs already exist
-        existing_staffs = list(staffs_collection.limit(1).stream())
+        existing_staffs = await _staff_repo.find(limit=1)
 
         if existing_staffs:
             logger.warning("Initialize admin rejected: staffs already exist")
@@ -45,7 +45,7 @@ async def initialize_first_admin():
             "created_via": "initialization_endpoint"
         }
 
-        staffs_collection.document("admin@brighthii.com").set(default_admin)
+        await _staff_repo.set("admin@brighthii.com", default_admin)
 
         logger.info("Default admin created: admin@brighthii.com")
 
@@ -70,8 +70,7 @@ async def check_initialization_status():
     Returns whether any admin users exist.
     """
     try:
-        staffs_collection = db.collection("brighthii_staffs")
-        existing_staffs = list(staffs_collection.limit(1).stream())
+        existing_staffs = await _staff_repo.find(limit=1)
 
         needs_init = len(existing_staffs) == 0
 
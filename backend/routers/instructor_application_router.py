@@ -6,8 +6,9 @@ from firebase_admin import firestore
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from schemas.instructor_application_schema import InstructorApplication
-from reusable_components.firebase import db
+from reusable_components.firestore_repository import AsyncRepository
 from reusable_components.auth import verify_jwt
+from reusable_components.changelog import read_changelog, update_with_changelog_async
 from reusable_components.email_notification_helper import send_email
 from email_templates.admin_new_instructor_application import get_admin_new_instructor_application_email_html
 
@@ -22,18 +23,18 @@ router = APIRouter(prefix="/api", tags=["instructor-applications"])
 
 STATUSES = {"new", "reviewed", "contacted", "archived"}
 
+_instructor_application_repo = AsyncRepository("instructor_applications")
+
 
 @router.post("/instructor-applications")
 @limiter.limit("5/minute")
 async def submit_instructor_application(request: Request, application: InstructorApplication):
     try:
-        collection = "instructor_applications"
         doc_data = application.model_dump()
         doc_data["status"] = "new"
         doc_data["created_at"] = firestore.SERVER_TIMESTAMP
 
-        doc_ref = db.collection(collection).add(doc_data)
-        doc_id = doc_ref[1].id
+        doc_id = await _instructor_application_repo.add(doc_data)
 
         # Notify admissions team
         try:
@@ -63,12 +64,9 @@ async def submit_instructor_application(request: Request, application: Instructo
 
 
 @router.get("/instructor-applications")
-def get_instructor_applications(_admin: dict = Depends(verify_jwt)):
+async def get_instructor_applications(_admin: dict = Depends(verify_jwt)):
     try:
-        collection = "instructor_applications"
-        docs = db.collection(collection).order_by(
-            "created_at", direction=firestore.Query.DESCENDING
-        ).stream()
+        docs = await _instructor_application_repo.find(order_by="created_at", descending=True)
 
         applications = []
         for doc in docs:
@@ -88,9 +86,9 @@ def get_instructor_applications(_admin: dict = Depends(verify_jwt)):
 
 @router.get("/instructor-applications/{application_id}")
 def get_instructor_application(application_id: str, _admin: dict = Depends(verify_jwt)):
+    # Sync (threadpool) handler: read_changelog() reads the subcollection with the sync client
     try:
-        collection = "instructor_applications"
-        doc = db.collection(collection).document(application_id).get()
+        doc = _instructor_application_repo.sync.get(application_id)
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Application not found")
@@ -101,9 +99,7 @@ def get_instructor_application(application_id: str, _admin: dict = Depends(verif
             data["created_at"] = data["created_at"].isoformat()
         if data.get("updated_at"):
             data["updated_at"] = data["updated_at"].isoformat()
-        for entry in data.get("changelog", []):
-            if hasattr(entry.get("updatedAt"), "isoformat"):
-                entry["updatedAt"] = entry["updatedAt"].isoformat()
+        data["changelog"] = read_changelog(doc.reference, legacy=data.get("changelog"))
 
         return data
     except HTTPException:
@@ -114,15 +110,14 @@ def get_instructor_application(application_id: str, _admin: dict = Depends(verif
 
 
 @router.patch("/instructor-applications/{application_id}")
-def update_instructor_application(
+async def update_instructor_application(
     application_id: str,
     fields: dict = Body(...),
     admin: dict = Depends(verify_jwt),
 ):
     try:
-        collection = "instructor_applications"
-        doc_ref = db.collection(collection).document(application_id)
-        doc = doc_ref.get()
+        doc_ref = _instructor_application_repo.ref(application_id)
+        doc = await doc_ref.get()
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Application not found")
@@ -136,7 +131,7 @@ def update_instructor_application(
 
         changelog_entries = []
         updates = {}
-        protected = {"id", "created_at", "updated_at", "changelog"}
+        protected = {"id", "created_at", "updated_at", "changelog", "status_changed_at"}
 
         for key, new_value in fields.items():
             if key in protected:
@@ -155,11 +150,8 @@ def update_instructor_application(
         if not updates:
             return {"message": "No changes detected"}
 
-        existing_changelog = current.get("changelog", [])
-        updates["changelog"] = existing_changelog + changelog_entries
         updates["updated_at"] = firestore.SERVER_TIMESTAMP
-
-        doc_ref.update(updates)
+        await update_with_changelog_async(doc_ref, updates, changelog_entries)
 
         return {"message": f"{len(changelog_entries)} field(s) updated", "changes": changelog_entries}
     except HTTPException:
@@ -170,16 +162,15 @@ def update_instructor_application(
 
 
 @router.delete("/instructor-applications/{application_id}")
-def delete_instructor_application(application_id: str, _admin: dict = Depends(verify_jwt)):
+async def delete_instructor_application(application_id: str, _admin: dict = Depends(verify_jwt)):
     try:
-        collection = "instructor_applications"
-        doc_ref = db.collection(collection).document(application_id)
-        doc = doc_ref.get()
+        doc_ref = _instructor_application_repo.ref(application_id)
+        doc = await doc_ref.get()
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Application not found")
 
-        doc_ref.delete()
+        await doc_ref.delete()
 
         return {"message": "Application deleted"}
     except HTTPException:
@@ -4,10 +4,12 @@ import string
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr
 from reusable_components.email_notification_helper import send_email
 from reusable_components.auth import create_applicant_jwt
-from reusable_components.firebase import db
+from reusable_components.firestore_repository import enrollment_repo, otp_code_repo
+from reusable_components.student_users import find_student_user
 from email_templates.otp_verification import get_otp_email_html
 
 logger = logging.getLogger(__name__)
@@ -37,19 +39,13 @@ async def send_otp(request: OtpSendRequest):
     email = request.email.lower().strip()
 
     # Check if an enrollment exists for this email
-    collection = "pending_enrollment_application"
-    docs = db.collection(collection).where("email", "==", email).limit(1).stream()
-    enrollment = None
-    for doc in docs:
-        enrollment = doc.to_dict()
-        break
-
-    if not enrollment:
+    enrollment_doc = await enrollment_repo.find_one(("email", "==", email))
+    if not enrollment_doc:
         raise HTTPException(status_code=404, detail="No application found for this email address.")
+    enrollment = enrollment_doc.to_dict()
 
     # Rate limit: check if OTP was sent recently (within 60 seconds)
-    otp_collection = "otp_codes"
-    existing_doc = db.collection(otp_collection).document(email).get()
+    existing_doc = await otp_code_repo.get(email)
     if existing_doc.exists:
         existing_data = existing_doc.to_dict()
         created_at = existing_data.get("created_at")
@@ -58,7 +54,7 @@ async def send_otp(request: OtpSendRequest):
 
     # Generate and store OTP
     code = generate_otp()
-    db.collection(otp_collection).document(email).set({
+    await otp_code_repo.set(email, {
         "code": code,
         "email": email,
         "created_at": datetime.now(timezone.utc),
@@ -74,6 +70,7 @@ async def send_otp(request: OtpSendRequest):
             to=email,
             subject="Your Verification Code - Bright Horizon Institute",
             html_content=html,
+            max_age=timedelta(minutes=OTP_EXPIRY_MINUTES),
         )
     except Exception as e:
         logger.exception("Failed to send OTP email to %s", email)
@@ -89,8 +86,7 @@ async def verify_otp(request: OtpVerifyRequest):
     code = request.code.strip()
 
     # Lookup OTP
-    otp_collection = "otp_codes"
-    otp_doc = db.collection(otp_collection).document(email).get()
+    otp_doc = await otp_code_repo.get(email)
 
     if not otp_doc.exists:
         raise HTTPException(status_code=400, detail="No verification code found. Please request a new one.")
@@ -103,36 +99,33 @@ async def verify_otp(request: OtpVerifyRequest):
         if expires_at.tzinfo is None:
             expires_at = expires_at.replace(tzinfo=timezone.utc)
         if datetime.now(timezone.utc) > expires_at:
-            db.collection(otp_collection).document(email).delete()
+            await otp_code_repo.delete(email)
             raise HTTPException(status_code=400, detail="Verification code has expired. Please request a new one.")
 
     # Check attempts
     attempts = otp_data.get("attempts", 0)
     if attempts >= MAX_ATTEMPTS:
-        db.collection(otp_collection).document(email).delete()
+        await otp_code_repo.delete(email)
         raise HTTPException(status_code=400, detail="Too many failed attempts. Please request a new code.")
 
     # Verify code
     if otp_data["code"] != code:
-        db.collection(otp_collection).document(email).update({"attempts": attempts + 1})
+        await otp_code_repo.update(email, {"attempts": attempts + 1})
         remaining = MAX_ATTEMPTS - attempts - 1
         raise HTTPException(status_code=400, detail=f"Invalid code. {remaining} attempts remaining.")
 
     # Code is valid — delete OTP and fetch enrollment
-    db.collection(otp_collection).document(email).delete()
+    await otp_code_repo.delete(email)
 
     # Look up the user's role from student_users (if exists)
-    student_collection = "student_users"
-    student_docs = list(db.collection(student_collection).where("email", "==", email).limit(1).stream())
-    role = student_docs[0].to_dict().get("role", "applicant") if student_docs else "applicant"
+    student_doc = await find_student_user(email)
+    role = student_doc.to_dict().get("role", "applicant") if student_doc else "applicant"
 
     # Fetch course data for enrichment (start date, deadline, instructor)
-    from routers.course_router import get_courses
-    courses = get_courses()
-    course_map = {c.title: c for c in courses}
+    from routers.course_router import course_slug_for, get_merged_courses_by_slug
+    courses = await run_in_threadpool(get_merged_courses_by_slug)
 
-    enrollment_collection = "pending_enrollment_application"
-    docs = db.collection(enrollment_collection).where("email", "==", email).stream()
+    docs = await enrollment_repo.find(("email", "==", email))
 
     applications = []
     for doc in docs:
@@ -144,7 +137,7 @@ async def verify_otp(request: OtpVerifyRequest):
         if created_at and hasattr(created_at, "isoformat"):
             created_at = created_at.isoformat()
         course_name = data.get("course", "")
-        course_info = course_map.get(course_name)
+        course_info = courses.get(course_slug_for(data))
         start_date = None
         enrollment_deadline = None
         instructor_name = None
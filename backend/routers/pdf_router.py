@@ -9,7 +9,7 @@ from reportlab.pdfgen import canvas
 from pypdf import PdfReader, PdfWriter
 
 from reusable_components.auth import verify_jwt
-from reusable_components.firebase import db
+from reusable_components.firestore_repository import enrollment_repo
 
 logger = logging.getLogger(__name__)
 
@@ -400,8 +400,7 @@ def build_tesda_pdf(data: dict) -> io.BytesIO:
 async def export_enrollment_pdf(enrollment_id: str, _admin: dict = Depends(verify_jwt)):
     """Generate and return a TESDA MIS 03-01 PDF for an enrollment."""
     try:
-        collection = "pending_enrollment_application"
-        doc_ref = db.collection(collection).document(enrollment_id).get()
+        doc_ref = await enrollment_repo.get(enrollment_id)
 
         if not doc_ref.exists:
             raise HTTPException(status_code=404, detail="Enrollment not found")
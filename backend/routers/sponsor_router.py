@@ -1,8 +1,10 @@
+import json
 import logging
-import time
 import uuid
+from urllib.parse import quote
 
-from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, Request, Response, UploadFile
+from fastapi.responses import RedirectResponse
 from firebase_admin import firestore
 from typing import Optional
 
@@ -10,71 +12,108 @@ from schemas.sponsor_schema import Sponsor
 from reusable_components.firebase import db
 from reusable_components.auth import verify_jwt
 from reusable_components.gcloud_storage_helper import upload_file, delete_file, generate_signed_url
+from reusable_components import cache_invalidation
+from reusable_components.ttl_cache import TTLCache
+from reusable_components.http_caching import (
+    CATALOG_CACHE_CONTROL,
+    SIGNED_REDIRECT_CACHE_CONTROL,
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_cache_headers,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["sponsors"])
 
-# ── 24-hour cache (same pattern as course_router._overrides_cache) ──
+# ── 24-hour cache (reusable_components.ttl_cache) ──
 
-_sponsors_cache: list | None = None
-_sponsors_cache_ts: float = 0
 _SPONSORS_TTL = 86400  # 24 hours
+_sponsors_cache = TTLCache("sponsors", ttl=_SPONSORS_TTL, maxsize=1, stale_ttl=600)
 
 
-def _get_sponsors_from_db() -> list[dict]:
-    global _sponsors_cache, _sponsors_cache_ts
-    now = time.monotonic()
-    if _sponsors_cache is not None and (now - _sponsors_cache_ts) < _SPONSORS_TTL:
-        return _sponsors_cache
-
+def _load_sponsors() -> tuple[list[dict], str]:
+    """Sponsors with scholar counts, plus an ETag for that exact list."""
+    collection = "sponsors"
+    docs = db.collection(collection).order_by("order").stream()
+    result = []
+    sponsor_ids = []
+    for doc in docs:
+        data = doc.to_dict()
+        data["id"] = doc.id
+        # Stable link instead of a signed URL (public_url doesn't work on private buckets)
+        gcs_path = data.get("gcs_path")
+        if gcs_path:
+            data["image"] = _image_link(doc.id, gcs_path)
+        result.append(data)
+        sponsor_ids.append(doc.id)
+
+    # Compute scholars_sponsored from actual enrollments
+    if sponsor_ids:
+        enrollment_col = "pending_enrollment_application"
+        counts: dict[str, int] = {}
+        # Query enrollments that have a sponsor_id assigned
+        enrolled = db.collection(enrollment_col).where("sponsor_id", "!=", "").stream()
+        for edoc in enrolled:
+            sid = edoc.to_dict().get("sponsor_id", "")
+            if sid:
+                counts[sid] = counts.get(sid, 0) + 1
+        for sponsor in result:
+            sponsor["scholars_sponsored"] = counts.get(sponsor["id"], 0)
+
+    # Image links don't expire, so the same data gives the same tag on every instance
+    etag = make_etag(json.dumps(result, sort_keys=True, default=str))
+    return result, etag
+
+
+def _image_link(sponsor_id: str, gcs_path: str) -> str:
+    """Root-relative link to GET /sponsors/{id}/image; v changes whenever the image does."""
+    version = make_etag(gcs_path).strip('"')[:12]
+    return f"/api/sponsors/{quote(sponsor_id, safe='')}/image?v={version}"
+
+
+def _get_sponsors_snapshot() -> tuple[list[dict], str]:
     try:
-        collection = "sponsors"
-        docs = db.collection(collection).order_by("order").stream()
-        result = []
-        sponsor_ids = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            # Generate signed URL from gcs_path (public_url doesn't work on private buckets)
-            gcs_path = data.get("gcs_path")
-            if gcs_path:
-                data["image"] = generate_signed_url(gcs_path, expiration_minutes=1500)
-            result.append(data)
-            sponsor_ids.append(doc.id)
-
-        # Compute scholars_sponsored from actual enrollments
-        if sponsor_ids:
-            enrollment_col = "pending_enrollment_application"
-            counts: dict[str, int] = {}
-            # Query enrollments that have a sponsor_id assigned
-            enrolled = db.collection(enrollment_col).where("sponsor_id", "!=", "").stream()
-            for edoc in enrolled:
-                sid = edoc.to_dict().get("sponsor_id", "")
-                if sid:
-                    counts[sid] = counts.get(sid, 0) + 1
-            for sponsor in result:
-                sponsor["scholars_sponsored"] = counts.get(sponsor["id"], 0)
-
-        _sponsors_cache = result
-        _sponsors_cache_ts = now
-        return result
+        return _sponsors_cache.get("all", _load_sponsors)
     except Exception as e:
         logger.warning("Failed to fetch sponsors: %s", e)
-        return _sponsors_cache or []
+        return _sponsors_cache.peek("all", ([], make_etag("no-sponsors")))
+
+
+def _get_sponsors_from_db() -> list[dict]:
+    return _get_sponsors_snapshot()[0]
 
 
 def _invalidate_sponsors_cache():
-    global _sponsors_cache, _sponsors_cache_ts
-    _sponsors_cache = None
-    _sponsors_cache_ts = 0
+    """Drop the cached sponsors list on every instance."""
+    cache_invalidation.publish("sponsors")
+
+
+cache_invalidation.on_invalidate("sponsors", _sponsors_cache.clear)
 
 
 # ── Public endpoint ──
 
 @router.get("/sponsors", response_model=list[Sponsor])
-def get_sponsors():
-    return _get_sponsors_from_db()
+def get_sponsors(request: Request, response: Response):
+    sponsors, etag = _get_sponsors_snapshot()
+    if etag_matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+    set_cache_headers(response, etag, CATALOG_CACHE_CONTROL)
+    return sponsors
+
+
+@router.get("/sponsors/{sponsor_id}/image")
+def open_sponsor_image(sponsor_id: str):
+    """Sign a URL for a sponsor's image when it is requested and redirect to it."""
+    sponsor = next((s for s in _get_sponsors_from_db() if s["id"] == sponsor_id), None)
+    gcs_path = sponsor.get("gcs_path") if sponsor else None
+    if not gcs_path:
+        raise HTTPException(status_code=404, detail="Sponsor image not found")
+    return RedirectResponse(
+        generate_signed_url(gcs_path), status_code=302, headers={"Cache-Control": SIGNED_REDIRECT_CACHE_CONTROL},
+    )
 
 
 @router.get("/sponsors/{sponsor_id}/scholars")
@@ -226,6 +265,7 @@ def reorder_sponsors(
     if not order_list or not isinstance(order_list, list):
         raise HTTPException(status_code=400, detail="'order' must be a non-empty list of sponsor IDs")
 
+    # One WriteBatch (sponsors are far below its 500-write limit): the new order applies entirely or not at all
     collection = "sponsors"
     batch = db.batch()
     for idx, sponsor_id in enumerate(order_list):
@@ -3,9 +3,12 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter, Body, Depends, HTTPException
 from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
 from reusable_components.firebase import db
 from reusable_components.auth import verify_jwt
-from reusable_components.gcloud_storage_helper import generate_signed_url
+from reusable_components.bulk_writes import BulkMutation
+from reusable_components.document_links import attach_document_links
+from reusable_components.student_users import change_student_email, find_student_user_sync
 
 logger = logging.getLogger(__name__)
 
@@ -35,16 +38,6 @@ def get_students(_admin: dict = Depends(verify_jwt)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def _sign_doc_urls(documents: dict) -> dict:
-    """Replace GCS paths with time-limited signed URLs."""
-    for _doc_type, doc_data in documents.items():
-        for slot_key in ("applicant_upload", "official_scan"):
-            slot = doc_data.get(slot_key)
-            if slot and slot.get("gcs_path"):
-                slot["file_url"] = generate_signed_url(slot["gcs_path"])
-    return documents
-
-
 @router.get("/students/{student_id}")
 def get_student_detail(student_id: str, _admin: dict = Depends(verify_jwt)):
     """Get student info, enrollment history, and latest documents."""
@@ -78,9 +71,6 @@ def get_student_detail(student_id: str, _admin: dict = Depends(verify_jwt)):
             for ts_field in ("created_at", "updated_at"):
                 if data.get(ts_field) and hasattr(data[ts_field], "isoformat"):
                     data[ts_field] = data[ts_field].isoformat()
-            for entry in data.get("changelog", []):
-                if hasattr(entry.get("updatedAt"), "isoformat"):
-                    entry["updatedAt"] = entry["updatedAt"].isoformat()
 
             enrollments.append({
                 "id": data["id"],
@@ -89,8 +79,8 @@ def get_student_detail(student_id: str, _admin: dict = Depends(verify_jwt)):
                 "created_at": data.get("created_at"),
             })
 
-            # Collect latest documents across all enrollments
-            docs_data = data.get("documents", {})
+            # Collect latest documents across all enrollments (links point at their own enrollment)
+            docs_data = attach_document_links(doc.id, data.get("documents", {}))
             for doc_type, doc_info in docs_data.items():
                 # Keep the most recent version of each document type
                 if doc_type not in latest_documents:
@@ -106,10 +96,6 @@ def get_student_detail(student_id: str, _admin: dict = Depends(verify_jwt)):
         # Sort enrollments by date descending
         enrollments.sort(key=lambda e: e.get("created_at") or "", reverse=True)
 
-        # Sign URLs for documents
-        if latest_documents:
-            latest_documents = _sign_doc_urls(latest_documents)
-
         return {
             "student": student,
             "enrollments": enrollments,
@@ -147,13 +133,8 @@ def update_student_email(
             return {"message": "Email is already the same. No changes made."}
 
         # Check if new email is already taken by another student
-        existing = list(
-            db.collection(student_collection)
-            .where("email", "==", new_email)
-            .limit(1)
-            .stream()
-        )
-        if existing and existing[0].id != student_id:
+        existing = find_student_user_sync(new_email)
+        if existing and existing.id != student_id:
             raise HTTPException(
                 status_code=409,
                 detail="This email is already associated with another student account.",
@@ -162,11 +143,14 @@ def update_student_email(
         admin_email = admin.get("sub", "unknown")
         now = datetime.now(timezone.utc).isoformat()
 
-        # Update student_users record
-        student_ref.update({
-            "email": new_email,
-            "updated_at": firestore.SERVER_TIMESTAMP,
-        })
+        # Update student_users record and move its email index entry
+        try:
+            change_student_email(student_ref, old_email, new_email)
+        except AlreadyExists:
+            raise HTTPException(
+                status_code=409,
+                detail="This email is already associated with another student account.",
+            )
 
         # Update all enrollment applications that used the old email
         enrollment_collection = "pending_enrollment_application"
@@ -176,26 +160,37 @@ def update_student_email(
             .stream()
         )
 
-        updated_count = 0
+        bulk = BulkMutation()
         for edoc in enrollment_docs:
-            edata = edoc.to_dict()
-            existing_changelog = edata.get("changelog", [])
-            edoc.reference.update({
+            bulk.update(edoc.reference, {
                 "email": new_email,
                 "updated_at": firestore.SERVER_TIMESTAMP,
-                "changelog": existing_changelog + [{
-                    "field": "email",
-                    "oldValue": old_email,
-                    "newValue": new_email,
-                    "updatedBy": admin_email,
-                    "updatedAt": now,
-                    "note": "Student email changed by admin (identity verified)",
-                }],
-            })
-            updated_count += 1
+            }, [{
+                "field": "email",
+                "oldValue": old_email,
+                "newValue": new_email,
+                "updatedBy": admin_email,
+                "updatedAt": now,
+                "note": "Student email changed by admin (identity verified)",
+            }])
+        result = bulk.commit()
+        if result["failed"]:
+            logger.warning("Email change for student %s: %d enrollment(s) not updated", student_id, len(result["failed"]))
+
+        # Completed batches' frozen rosters show the email too
+        from routers.course_router import on_roster_change
+        updated_ids = set(result["succeeded"])
+        rosters = {}
+        for edoc in enrollment_docs:
+            edata = edoc.to_dict()
+            if edoc.id in updated_ids and edata.get("batch_id"):
+                rosters.setdefault((edata.get("course_slug"), edata["batch_id"]), edata)
+        for edata in rosters.values():
+            on_roster_change(edata)
 
         return {
-            "message": f"Email updated from {old_email} to {new_email}. {updated_count} enrollment(s) updated.",
+            "message": f"Email updated from {old_email} to {new_email}. {len(result['succeeded'])} enrollment(s) updated.",
+            "failed": result["failed"],
         }
     except HTTPException:
         raise
@@ -1,10 +1,11 @@
 import logging
 import os
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException
 from reusable_components.auth import create_jwt, refresh_jwt, verify_jwt
-from reusable_components.firebase import db
+from reusable_components.email_notification_helper import zoho_token_expiry
+from reusable_components.http_client import get_http_client
+from reusable_components.firestore_repository import AsyncRepository
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +15,12 @@ ZOHO_CLIENT_ID = os.getenv("ZOHO_CLIENT_ID", "")
 ZOHO_CLIENT_SECRET = os.getenv("ZOHO_CLIENT_SECRET", "")
 ZOHO_REDIRECT_URI = os.getenv("ZOHO_REDIRECT_URI", "")
 ADMIN_FRONTEND_URL = os.getenv("ADMIN_FRONTEND_URL", "")
-ZOHO_TOKEN_URL = "https://accounts.zoho.com/oauth/v2/token"
-ZOHO_USERINFO_URL = "https://accounts.zoho.com/oauth/user/info"
+ZOHO_ACCOUNTS_URL = os.getenv("ZOHO_ACCOUNTS_URL", "https://accounts.zoho.com")
+ZOHO_TOKEN_URL = f"{ZOHO_ACCOUNTS_URL}/oauth/v2/token"
+ZOHO_USERINFO_URL = f"{ZOHO_ACCOUNTS_URL}/oauth/user/info"
+
+_staff_repo = AsyncRepository("brighthii_staffs")
+_zoho_token_repo = AsyncRepository("zoho_tokens")
 
 
 @router.get("/callback")
@@ -26,17 +31,17 @@ async def zoho_callback(code: str):
     """
     try:
         # Exchange auth code for access + refresh tokens
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                ZOHO_TOKEN_URL,
-                data={
-                    "grant_type": "authorization_code",
-                    "client_id": ZOHO_CLIENT_ID,
-                    "client_secret": ZOHO_CLIENT_SECRET,
-                    "redirect_uri": ZOHO_REDIRECT_URI,
-                    "code": code,
-                },
-            )
+        client = get_http_client()
+        token_response = await client.post(
+            ZOHO_TOKEN_URL,
+            data={
+                "grant_type": "authorization_code",
+                "client_id": ZOHO_CLIENT_ID,
+                "client_secret": ZOHO_CLIENT_SECRET,
+                "redirect_uri": ZOHO_REDIRECT_URI,
+                "code": code,
+            },
+        )
 
         token_data = token_response.json()
 
@@ -48,11 +53,10 @@ async def zoho_callback(code: str):
         refresh_token = token_data.get("refresh_token", "")
 
         # Get user info from Zoho
-        async with httpx.AsyncClient() as client:
-            user_response = await client.get(
-                ZOHO_USERINFO_URL,
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
+        user_response = await client.get(
+            ZOHO_USERINFO_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
 
         user_data = user_response.json()
         email = user_data.get("Email", "")
@@ -63,16 +67,16 @@ async def zoho_callback(code: str):
             raise HTTPException(status_code=400, detail="Could not retrieve user email from Zoho")
 
         # Check if this email is an authorized admin
-        staff_doc = db.collection("brighthii_staffs").document(email).get()
+        staff_doc = await _staff_repo.get(email)
         if not staff_doc.exists or staff_doc.to_dict().get("role") != "admin":
             logger.warning("Unauthorized admin login attempt: %s", email)
             from fastapi.responses import RedirectResponse
             return RedirectResponse(url=f"{ADMIN_FRONTEND_URL}/login?error=unauthorized")
 
         # Store Zoho tokens in Firestore (keyed by email)
-        collection = "zoho_tokens"
-        db.collection(collection).document(email).set({
+        await _zoho_token_repo.set(email, {
             "access_token": access_token,
+            "access_token_expires_at": zoho_token_expiry(token_data),
             "refresh_token": refresh_token,
             "email": email,
             "first_name": first_name,
@@ -62,3 +62,45 @@ class EnrollmentApplication(BaseModel):
         if '@' not in v or '.' not in v.split('@')[-1]:
             raise ValueError('Invalid email address')
         return v
+
+
+class EnrollmentSummary(BaseModel):
+    """Slim list-view row for GET /api/enrollments?view=summary (no changelog/emails/documents)."""
+    id: str
+    firstName: Optional[str] = ""
+    lastName: Optional[str] = ""
+    middleName: Optional[str] = ""
+    email: Optional[str] = ""
+    contactNo: Optional[str] = ""
+    course: Optional[str] = ""
+    status: Optional[str] = ""
+    sponsor_id: Optional[str] = None
+    street: Optional[str] = ""
+    barangay: Optional[str] = ""
+    district: Optional[str] = ""
+    city: Optional[str] = ""
+    province: Optional[str] = ""
+    region: Optional[str] = ""
+    created_at: Optional[str] = None
+    days_in_status: Optional[int] = None
+    days_since_follow_up: Optional[int] = None
+
+
+class EnrollmentSummaryPage(BaseModel):
+    items: List[EnrollmentSummary]
+    next_cursor: Optional[str] = None
+
+
+class FollowUpBulkRequest(BaseModel):
+    """Targets for POST /api/enrollments/follow-up/bulk: explicit IDs, or a filter."""
+    enrollment_ids: Optional[List[str]] = None
+    status: Optional[List[str]] = None
+    course: Optional[str] = None  # title or slug
+    stale_days: Optional[int] = None
+
+    @field_validator('stale_days')
+    @classmethod
+    def validate_stale_days(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('stale_days must be 0 or more')
+        return v
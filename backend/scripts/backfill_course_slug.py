@@ -0,0 +1,60 @@
+"""
+One-time backfill: stamp `course_slug` on enrollments created before it was
+written at submit time.
+
+Course joins (batch history, courses summary, close-enrollment) query
+enrollments by `course_slug`, so run this once when deploying that change.
+Rows whose course title matches no known course are listed and left alone.
+Only rows missing or disagreeing with the resolved slug are written, so
+re-running the script is safe.
+
+Usage:
+  python scripts/backfill_course_slug.py            # dry run
+  python scripts/backfill_course_slug.py --apply
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reusable_components.bulk_writes import BulkMutation
+from reusable_components.firebase import db
+from routers.course_router import _COURSES_BY_TITLE
+
+COLLECTION = "pending_enrollment_application"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Write changes (default is a dry run)")
+    args = parser.parse_args()
+
+    bulk = BulkMutation()
+    unknown = Counter()
+    for doc in db.collection(COLLECTION).select(["course", "course_slug"]).stream():
+        data = doc.to_dict()
+        course = _COURSES_BY_TITLE.get(data.get("course", ""))
+        if not course:
+            unknown[data.get("course", "")] += 1
+            continue
+        if data.get("course_slug") != course.slug:
+            bulk.update(doc.reference, {"course_slug": course.slug})
+
+    for title, count in unknown.most_common():
+        print(f"unknown course title: {title!r} ({count} enrollments)")
+
+    if not args.apply:
+        print(f"Would stamp course_slug on {len(bulk)} enrollments")
+        return
+
+    result = bulk.commit()
+    print(f"Stamped {len(result['succeeded'])} enrollments, {len(result['failed'])} failed")
+    for failure in result["failed"]:
+        print(f"  failed: {failure['id']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
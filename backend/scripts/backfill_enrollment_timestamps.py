@@ -0,0 +1,93 @@
+"""
+One-time backfill: stamp `status_changed_at` and `last_follow_up_at` on
+enrollments written before these fields were maintained at write time.
+
+- status_changed_at: latest status entry of the changelog (subcollection,
+  then any unmigrated legacy array), else created_at.
+- last_follow_up_at: latest `follow_up` entry in emails_sent.
+
+List views derive days_in_status / days_since_follow_up from these fields
+only, and GET /api/enrollments?stale_days=N is a range query on
+status_changed_at, so rows without the stamp are invisible to it until this
+has run. Fields that are already set are never overwritten.
+
+Usage:
+  python scripts/backfill_enrollment_timestamps.py            # dry run
+  python scripts/backfill_enrollment_timestamps.py --apply
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reusable_components.bulk_writes import BulkMutation
+from reusable_components.changelog import read_changelog
+from reusable_components.firebase import db
+
+COLLECTION = "pending_enrollment_application"
+
+
+def _parse(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _status_changed_at(doc, data: dict):
+    for entry in reversed(read_changelog(doc.reference, legacy=data.get("changelog"))):
+        if entry.get("field") == "status":
+            parsed = _parse(entry.get("updatedAt"))
+            if parsed:
+                return parsed
+    return data.get("created_at")
+
+
+def _last_follow_up_at(data: dict):
+    for entry in reversed(data.get("emails_sent") or []):
+        if entry.get("type") == "follow_up":
+            parsed = _parse(entry.get("sent_at"))
+            if parsed:
+                return parsed
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Write changes (default is a dry run)")
+    args = parser.parse_args()
+
+    bulk = BulkMutation()
+    fields = ["created_at", "changelog", "emails_sent", "status_changed_at", "last_follow_up_at"]
+    for doc in db.collection(COLLECTION).select(fields).stream():
+        data = doc.to_dict()
+        updates = {}
+        if not data.get("status_changed_at"):
+            status_changed_at = _status_changed_at(doc, data)
+            if status_changed_at:
+                updates["status_changed_at"] = status_changed_at
+        if not data.get("last_follow_up_at"):
+            last_follow_up_at = _last_follow_up_at(data)
+            if last_follow_up_at:
+                updates["last_follow_up_at"] = last_follow_up_at
+        if updates:
+            bulk.update(doc.reference, updates)
+
+    if not args.apply:
+        print(f"Would backfill timestamps on {len(bulk)} enrollments")
+        return
+
+    result = bulk.commit()
+    print(f"Backfilled {len(result['succeeded'])} enrollments, {len(result['failed'])} failed")
+    for failure in result["failed"]:
+        print(f"  failed: {failure['id']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
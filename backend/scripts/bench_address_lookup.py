@@ -0,0 +1,68 @@
+"""
+Benchmark: barangay lookup by city name.
+
+Compares the old nested scan over every region and province in
+philippines_location.json ("before") with the city index built at import
+in routers/address_router.py ("after"). Runs offline; no Firestore needed.
+
+  python scripts/bench_address_lookup.py --rounds 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routers.address_router import _locations, find_city
+
+
+def scan(city: str):
+    for r_data in _locations.values():
+        for p_data in r_data.values():
+            if city in p_data:
+                return p_data[city]
+    return None
+
+
+def index(city: str):
+    matches = find_city(city)
+    return matches[0][2] if matches else None
+
+
+def _time_per_call(fn, cities: list[str]) -> list[float]:
+    samples = []
+    for city in cities:
+        start = time.perf_counter()
+        fn(city)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    all_cities = [city for r_data in _locations.values() for p_data in r_data.values() for city in p_data]
+    rng = random.Random(args.seed)
+    # Mix of real cities (uniform over the file) and misses, which scan everything
+    cities = [rng.choice(all_cities) for _ in range(args.rounds)] + ["Atlantis"] * (args.rounds // 10)
+    rng.shuffle(cities)
+
+    print(f"{len(all_cities)} cities, {len(cities)} lookups")
+    print(f"{'variant':<8} {'mean':>9} {'p50':>9} {'max':>9}")
+    for label, fn in (("before", scan), ("after", index)):
+        samples = _time_per_call(fn, cities)
+        print(
+            f"{label:<8} {statistics.mean(samples):>7.2f}us {statistics.median(samples):>7.2f}us"
+            f" {max(samples):>7.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
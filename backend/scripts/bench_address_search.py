@@ -0,0 +1,77 @@
+"""
+Benchmark: /api/address/search typeahead, in-process.
+
+Times reusable_components.address_search.search() on the index that
+routers/address_router.py builds at import, over query sets that exercise
+each path: short prefixes, full names, accent/punctuation variants and
+one-typo queries (fuzzy fallback). Reports mean/p50/p99/max per set. Runs
+offline; no Firestore needed.
+
+  python scripts/bench_address_search.py --rounds 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reusable_components.address_search import search
+from routers.address_router import _locations, _search_index
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    chars = list(name)
+    i = rng.randrange(1, len(chars) - 1)
+    chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = [
+        name
+        for provinces in _locations.values()
+        for province, cities in provinces.items()
+        for city, barangays in cities.items()
+        for name in (province, city, *barangays)
+    ]
+    picks = [rng.choice(names) for _ in range(args.rounds)]
+    query_sets = {
+        "prefix 1-3": [name[: rng.randint(1, 3)] for name in picks],
+        "full name": picks,
+        "accents": [name.upper().replace("N", "Ñ").replace("-", " ") for name in picks],
+        "one typo": [_typo(name, rng) for name in picks if len(name) >= 5],
+    }
+
+    print(f"{len(_search_index['records'])} records, limit={args.limit}")
+    print(f"{'queries':<11} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>9}")
+    for label, queries in query_sets.items():
+        samples = []
+        for q in queries:
+            start = time.perf_counter()
+            search(_search_index, q, args.limit)
+            samples.append((time.perf_counter() - start) * 1_000_000)
+        print(
+            f"{label:<11} {statistics.mean(samples):>7.1f}us {statistics.median(samples):>7.1f}us"
+            f" {_percentile(samples, 99):>7.1f}us {max(samples):>7.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: event-loop blocking of sync vs async Firestore access.
+
+Hosts two variants of the same `async def` read handler on an in-process
+FastAPI app, plus a trivial /ping endpoint, and fires concurrent load at
+each variant while pinging. Reports p50/p99 latency for both the Firestore
+route and the unrelated /ping route ("before" = sync client called from an
+async handler, "after" = AsyncRepository).
+
+Run against the Firestore emulator (see EMULATOR_SETUP.md):
+  FIRESTORE_EMULATOR_HOST=localhost:8080 GCLOUD_PROJECT=brighthii-dev \\
+      python scripts/bench_firestore_event_loop.py --requests 400 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+
+from reusable_components.firestore_repository import AsyncRepository
+
+BENCH_COLLECTION = "bench_event_loop"
+BENCH_DOC_ID = "sample"
+
+repo = AsyncRepository(BENCH_COLLECTION)
+app = FastAPI()
+
+
+@app.get("/before")
+async def read_blocking():
+    doc = repo.sync.get(BENCH_DOC_ID)
+    return doc.to_dict()
+
+
+@app.get("/after")
+async def read_non_blocking():
+    doc = await repo.get(BENCH_DOC_ID)
+    return doc.to_dict()
+
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def _timed_get(client: httpx.AsyncClient, path: str, samples: list[float]):
+    start = time.perf_counter()
+    response = await client.get(path)
+    response.raise_for_status()
+    samples.append((time.perf_counter() - start) * 1000)
+
+
+async def _run_variant(path: str, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        route_samples: list[float] = []
+        ping_samples: list[float] = []
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(i: int):
+            async with sem:
+                await _timed_get(client, path, route_samples)
+                if i % 4 == 0:
+                    await _timed_get(client, "/ping", ping_samples)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "throughput": total / elapsed,
+        "route_p50": statistics.median(route_samples),
+        "route_p99": _percentile(route_samples, 99),
+        "ping_p50": statistics.median(ping_samples),
+        "ping_p99": _percentile(ping_samples, 99),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set; refusing to benchmark against a live project.")
+
+    await repo.set(BENCH_DOC_ID, {"status": "pending_upload", "course": "Bookkeeping NC III"})
+
+    print(f"{'variant':<8} {'req/s':>8} {'route p50':>10} {'route p99':>10} {'ping p50':>9} {'ping p99':>9}")
+    for label, path in (("before", "/before"), ("after", "/after")):
+        r = await _run_variant(path, args.requests, args.concurrency)
+        print(
+            f"{label:<8} {r['throughput']:>8.1f} {r['route_p50']:>8.1f}ms {r['route_p99']:>8.1f}ms"
+            f" {r['ping_p50']:>7.1f}ms {r['ping_p99']:>7.1f}ms"
+        )
+
+    await repo.delete(BENCH_DOC_ID)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
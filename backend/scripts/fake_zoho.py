@@ -0,0 +1,239 @@
+"""
+Local stand-in for the Zoho OAuth and Mail endpoints the backend calls.
+
+Serves the token exchange/refresh and user info endpoints of
+accounts.zoho.com and the accounts, folders, messages (send, list, content)
+endpoints of the Mail API, so send_email, the admin inbox and OTP delivery
+can run without Zoho credentials. Failures can be injected:
+
+  --latency-ms / --jitter-ms   delay every API call by latency + U(0, jitter)
+  --token-ttl                  expires_in of issued tokens; expired tokens get 401
+  --unauthorized-rate          revoke the caller's token (401) on this share of calls
+  --rate-limit                 Mail API requests per second before answering 429
+  --error-rate                 share of Mail API calls answered with a 500
+
+Point the backend at it with
+
+  ZOHO_ACCOUNTS_URL=http://127.0.0.1:8765 ZOHO_MAIL_API_URL=http://127.0.0.1:8765/api
+  ZOHO_MAIL_REFRESH_TOKEN=fake
+
+and run it with
+
+  python scripts/fake_zoho.py --latency-ms 150 --jitter-ms 100 --unauthorized-rate 0.01 --rate-limit 20
+
+GET /_stats returns counters (sends, 401s, 429s, tokens issued); POST /_reset
+clears them. scripts/load_test_email.py can also start it in-process.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Form, Request
+from fastapi.responses import JSONResponse
+
+ACCOUNT_ID = "1000000000001"
+INBOX_FOLDER_ID = "2000000000001"
+
+
+def create_app(
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    token_ttl: int = 3600,
+    unauthorized_rate: float = 0,
+    rate_limit: float = 0,
+    error_rate: float = 0,
+    admin_email: str = "admin@brighthii.com",
+    seed: int | None = None,
+) -> FastAPI:
+    app = FastAPI(title="Fake Zoho")
+    rng = random.Random(seed)
+    ids = itertools.count(1)
+
+    tokens: dict[str, float] = {}  # access token -> monotonic expiry
+    sent: list[dict] = []
+    stats = Counter()
+    window = {"second": 0, "count": 0}
+
+    def _status(code: int, description: str, data=None, headers: dict | None = None) -> JSONResponse:
+        body = {"status": {"code": code, "description": description}}
+        if data is not None:
+            body["data"] = data
+        return JSONResponse(body, status_code=code, headers=headers)
+
+    def _check_mail_call(request: Request) -> JSONResponse | None:
+        """Auth, rate-limit and fault injection shared by every Mail API route."""
+        stats["mail_requests"] += 1
+
+        if rate_limit:
+            second = int(time.monotonic())
+            if window["second"] != second:
+                window.update(second=second, count=0)
+            window["count"] += 1
+            if window["count"] > rate_limit:
+                stats["rate_limited"] += 1
+                return _status(429, "Too many requests", {"errorCode": "TOO_MANY_REQUESTS"}, {"Retry-After": "1"})
+
+        auth = request.headers.get("authorization", "")
+        token = auth.removeprefix("Zoho-oauthtoken ").strip()
+        expires_at = tokens.get(token)
+        if expires_at is None or expires_at <= time.monotonic():
+            stats["unauthorized"] += 1
+            return _status(401, "Invalid Input", {"errorCode": "INVALID_OAUTHTOKEN"})
+        if unauthorized_rate and rng.random() < unauthorized_rate:
+            tokens.pop(token, None)
+            stats["unauthorized"] += 1
+            stats["revoked"] += 1
+            return _status(401, "Invalid Input", {"errorCode": "INVALID_OAUTHTOKEN"})
+
+        if error_rate and rng.random() < error_rate:
+            stats["server_errors"] += 1
+            return _status(500, "Internal Error")
+        return None
+
+    @app.middleware("http")
+    async def inject_latency(request: Request, call_next):
+        if not request.url.path.startswith("/_"):
+            delay = latency_ms + (rng.uniform(0, jitter_ms) if jitter_ms else 0)
+            if delay:
+                await asyncio.sleep(delay / 1000)
+        return await call_next(request)
+
+    # ── OAuth (accounts.zoho.com) ──
+
+    @app.post("/oauth/v2/token")
+    async def token(grant_type: str = Form(...), refresh_token: str = Form(""), code: str = Form("")):
+        if grant_type == "refresh_token" and not refresh_token:
+            return JSONResponse({"error": "invalid_code"})
+        if grant_type == "authorization_code" and not code:
+            return JSONResponse({"error": "invalid_code"})
+        access_token = f"fake-access-{next(ids)}"
+        tokens[access_token] = time.monotonic() + token_ttl
+        stats["tokens_issued"] += 1
+        body = {"access_token": access_token, "expires_in": token_ttl, "token_type": "Bearer", "api_domain": ""}
+        if grant_type == "authorization_code":
+            body["refresh_token"] = f"fake-refresh-{next(ids)}"
+        return body
+
+    @app.get("/oauth/user/info")
+    async def user_info():
+        return {"Email": admin_email, "First_Name": "Local", "Last_Name": "Admin"}
+
+    # ── Mail API (mail.zoho.com/api) ──
+
+    @app.get("/api/accounts")
+    async def accounts(request: Request):
+        error = _check_mail_call(request)
+        if error:
+            return error
+        return _status(200, "success", [{"accountId": ACCOUNT_ID, "primaryEmailAddress": admin_email}])
+
+    @app.post("/api/accounts/{account_id}/messages")
+    async def send_message(account_id: str, request: Request):
+        error = _check_mail_call(request)
+        if error:
+            return error
+        payload = await request.json()
+        message_id = str(next(ids))
+        sent.append({
+            "messageId": message_id,
+            "fromAddress": payload.get("fromAddress", ""),
+            "toAddress": payload.get("toAddress", ""),
+            "subject": payload.get("subject", ""),
+            "content": payload.get("content", ""),
+            "receivedTime": str(int(time.time() * 1000)),
+        })
+        stats["sent"] += 1
+        if stats["sent"] == 1:
+            stats["first_sent_at"] = time.time()
+        stats["last_sent_at"] = time.time()
+        return _status(200, "success", {"messageId": message_id, "subject": payload.get("subject", "")})
+
+    @app.get("/api/accounts/{account_id}/folders")
+    async def folders(account_id: str, request: Request):
+        error = _check_mail_call(request)
+        if error:
+            return error
+        return _status(200, "success", [
+            {"folderId": INBOX_FOLDER_ID, "folderName": "Inbox"},
+            {"folderId": "2000000000002", "folderName": "Sent"},
+        ])
+
+    @app.get("/api/accounts/{account_id}/messages/view")
+    async def list_messages(account_id: str, request: Request, limit: int = 20, start: int = 1):
+        error = _check_mail_call(request)
+        if error:
+            return error
+        newest = list(reversed(sent))[start - 1:start - 1 + limit]
+        return _status(200, "success", [
+            {**{k: v for k, v in m.items() if k != "content"}, "folderId": INBOX_FOLDER_ID, "summary": m["subject"]}
+            for m in newest
+        ])
+
+    @app.get("/api/accounts/{account_id}/folders/{folder_id}/messages/{message_id}/content")
+    async def message_content(account_id: str, folder_id: str, message_id: str, request: Request):
+        error = _check_mail_call(request)
+        if error:
+            return error
+        for m in sent:
+            if m["messageId"] == message_id:
+                return _status(200, "success", {"messageId": message_id, "content": m["content"]})
+        return _status(404, "Message not found")
+
+    # ── Control ──
+
+    @app.get("/_stats")
+    async def get_stats():
+        return dict(stats)
+
+    @app.post("/_reset")
+    async def reset():
+        stats.clear()
+        sent.clear()
+        return {"message": "reset"}
+
+    return app
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=0, help="Base delay per call")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra uniform random delay per call")
+    parser.add_argument("--token-ttl", type=int, default=3600, help="expires_in of issued access tokens")
+    parser.add_argument("--unauthorized-rate", type=float, default=0, help="Share of Mail calls that revoke the token")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Mail API requests/second before 429 (0 = off)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of Mail calls answered with a 500")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def app_from_args(args) -> FastAPI:
+    return create_app(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        token_ttl=args.token_ttl,
+        unauthorized_rate=args.unauthorized_rate,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(app_from_args(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Load test: enrollment submission and review flows, through to email delivery.
+
+Runs the app in-process (httpx ASGITransport, app lifespan included, so the
+outbox dispatcher delivers for real) with Zoho replaced by scripts/fake_zoho.py.
+Phases:
+
+  submit    POST /api/enrollments (2 emails each: applicant + admissions)
+  review    per submitted enrollment: GET it, PATCH status to in_waitlist,
+            POST follow-up (1 email)
+  delivery  wait until the fake Zoho has received every queued email
+
+Reports count, errors, throughput and p50/p95/p99/max latency per endpoint,
+the end-to-end email delivery rate, and the fake's counters (401s, 429s,
+tokens issued). Rate limiting (slowapi) is switched off for the run.
+
+Writes enrollments and student_users to Firestore, so it refuses to run
+unless FIRESTORE_EMULATOR_HOST is set; --cleanup deletes the enrollments
+it created afterwards.
+
+  # fake Zoho in-process, 150ms +-100ms per call, 20 sends/s, 1% revoked tokens
+  python scripts/load_test_email.py --applications 200 --concurrency 20 \\
+      --spawn-fake --latency-ms 150 --jitter-ms 100 --rate-limit 20 --unauthorized-rate 0.01
+
+  # against an already running fake (python scripts/fake_zoho.py ...)
+  python scripts/load_test_email.py --zoho-url http://127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from scripts.fake_zoho import add_fault_arguments, app_from_args
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _start_fake(args) -> str:
+    """Serve the fake Zoho on a background thread; returns its base URL."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app_from_args(args), host="127.0.0.1", port=args.zoho_port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            sys.exit("Fake Zoho did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{args.zoho_port}"
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+        self.spans: dict[str, list[float]] = {}
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except Exception as e:
+            response, status = None, type(e).__name__
+        elapsed = time.perf_counter() - start
+        self.latencies[name].append(elapsed)
+        self.statuses[name][status] += 1
+        return response
+
+    def report(self):
+        print(f"{'endpoint':<14} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  statuses")
+        for name, samples in self.latencies.items():
+            start, end = self.spans.get(name, (0, 0))
+            rate = len(samples) / (end - start) if end > start else 0
+            ms = [s * 1000 for s in samples]
+            statuses = ", ".join(f"{k}: {v}" for k, v in sorted(self.statuses[name].items(), key=str))
+            print(
+                f"{name:<14} {len(samples):>6} {rate:>8.1f} {statistics.median(ms):>8.1f} "
+                f"{_percentile(ms, 95):>8.1f} {_percentile(ms, 99):>8.1f} {max(ms):>8.1f}  {statuses}"
+            )
+
+
+async def _phase(recorder: Recorder, names: list[str], concurrency: int, items, work):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with slots:
+            return await work(item)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run(item) for item in items))
+    for name in names:
+        recorder.spans[name] = (start, time.perf_counter())
+    return results
+
+
+async def run(args, zoho_url: str):
+    import main as app_main
+    from reusable_components.auth import create_jwt
+    from routers import enrollment_router, instructor_application_router
+
+    for limiter in (app_main.limiter, enrollment_router.limiter, instructor_application_router.limiter):
+        limiter.enabled = False
+
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    admin_headers = {"Authorization": f"Bearer {create_jwt({'email': 'loadtest@brighthii.com', 'name': 'Load Test'})}"}
+    transport = httpx.ASGITransport(app=app_main.app, client=("127.0.0.1", 123))
+
+    async with app_main.app.router.lifespan_context(app_main.app), \
+            httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client, \
+            httpx.AsyncClient(base_url=zoho_url) as zoho:
+        await zoho.post("/_reset")
+        courses = (await client.get("/api/courses")).json()
+        if not courses:
+            sys.exit("No courses found; seed the emulator first")
+        course = args.course or courses[0]["title"]
+        started = time.perf_counter()
+
+        # ── Submit ──
+        async def submit(i: int):
+            response = await recorder.call(client, "submit", "POST", "/api/enrollments", json={
+                "lastName": "Loadtest",
+                "firstName": f"Applicant{i}",
+                "email": f"loadtest+{run_id}-{i}@example.com",
+                "contactNo": "09170000000",
+                "course": course,
+            })
+            return response.json().get("id") if response is not None and response.status_code == 200 else None
+
+        ids = [i for i in await _phase(recorder, ["submit"], args.concurrency, range(args.applications), submit) if i]
+
+        # ── Review ──
+        async def review(enrollment_id: str) -> bool:
+            await recorder.call(client, "get", "GET", f"/api/enrollments/{enrollment_id}", headers=admin_headers)
+            await recorder.call(
+                client, "patch_status", "PATCH", f"/api/enrollments/{enrollment_id}",
+                headers=admin_headers, json={"status": "in_waitlist"},
+            )
+            response = await recorder.call(
+                client, "follow_up", "POST", f"/api/enrollments/{enrollment_id}/follow-up", headers=admin_headers,
+            )
+            return response is not None and response.status_code == 200
+
+        follow_ups = sum(await _phase(recorder, ["get", "patch_status", "follow_up"], args.concurrency, ids, review))
+
+        # ── Delivery ──
+        expected = 2 * len(ids) + follow_ups
+        deadline = time.monotonic() + args.drain_timeout
+        stats = {}
+        while time.monotonic() < deadline:
+            stats = (await zoho.get("/_stats")).json()
+            if stats.get("sent", 0) >= expected:
+                break
+            await asyncio.sleep(0.5)
+        drained = time.perf_counter() - started
+
+        if args.cleanup:
+            from reusable_components.firestore_repository import enrollment_repo
+            await asyncio.gather(*(enrollment_repo.delete(i) for i in ids))
+
+    print(f"\ncourse={course!r} applications={args.applications} concurrency={args.concurrency}\n")
+    recorder.report()
+    delivered = stats.get("sent", 0)
+    print(
+        f"\nemails: {delivered}/{expected} delivered in {drained:.1f}s "
+        f"({delivered / drained:.1f}/s end to end{'' if delivered >= expected else ', drain timed out'})"
+    )
+    print("fake zoho: " + ", ".join(f"{k}={v}" for k, v in sorted(stats.items()) if not k.endswith("_at")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--course", default=None, help="Course title (default: first in /api/courses)")
+    parser.add_argument("--drain-timeout", type=float, default=120, help="Seconds to wait for the outbox to drain")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the created enrollments afterwards")
+    parser.add_argument("--zoho-url", default="http://127.0.0.1:8765", help="Running fake Zoho (ignored with --spawn-fake)")
+    parser.add_argument("--spawn-fake", action="store_true", help="Start the fake Zoho in-process")
+    parser.add_argument("--zoho-port", type=int, default=8765)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set; refusing to load-test a real Firestore")
+
+    zoho_url = _start_fake(args) if args.spawn_fake else args.zoho_url.rstrip("/")
+    # Before the app is imported: these are read at import time
+    os.environ["ZOHO_ACCOUNTS_URL"] = zoho_url
+    os.environ["ZOHO_MAIL_API_URL"] = f"{zoho_url}/api"
+    os.environ.setdefault("ZOHO_MAIL_REFRESH_TOKEN", "fake")
+    os.environ.setdefault("JWT_SECRET_KEY", "load-test")
+
+    asyncio.run(run(args, zoho_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+One-time migration: move legacy `changelog` arrays into the append-only
+`changelog` subcollection (see reusable_components/changelog.py).
+
+For every document that still has a non-empty `changelog` array, each entry is
+written to `{doc}/changelog/{entry_id}`, `status_changed_at` is stamped from the
+latest status entry, and the array field is deleted — all in one batch per
+document, so a document is either fully migrated or untouched. Entry IDs are
+deterministic, so re-running the script is safe.
+
+Usage:
+  python scripts/migrate_changelog_subcollection.py            # dry run
+  python scripts/migrate_changelog_subcollection.py --apply
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firebase_admin import firestore
+
+from reusable_components.changelog import CHANGELOG_SUBCOLLECTION, changelog_entry_id
+from reusable_components.firebase import db
+
+COLLECTIONS = ["pending_enrollment_application", "instructor_applications"]
+
+# Firestore allows 500 writes per batch; leave room for the parent update
+MAX_ENTRIES_PER_BATCH = 498
+
+
+def _latest_status_change(entries: list[dict]):
+    for entry in reversed(entries):
+        if entry.get("field") == "status" and entry.get("updatedAt"):
+            value = entry["updatedAt"]
+            if isinstance(value, str):
+                try:
+                    return datetime.fromisoformat(value)
+                except ValueError:
+                    return None
+            return value
+    return None
+
+
+def migrate_document(doc, apply: bool) -> int:
+    entries = doc.to_dict().get("changelog") or []
+    if not isinstance(entries, list) or not entries:
+        return 0
+    if not apply:
+        return len(entries)
+
+    col = doc.reference.collection(CHANGELOG_SUBCOLLECTION)
+    # Very long histories are written in chunks; the array is only removed in the final batch
+    for start in range(0, len(entries), MAX_ENTRIES_PER_BATCH):
+        chunk = entries[start:start + MAX_ENTRIES_PER_BATCH]
+        batch = db.batch()
+        for offset, entry in enumerate(chunk):
+            seq = start + offset
+            batch.set(col.document(changelog_entry_id(entry, seq, suffix="legacy")), entry)
+        if start + MAX_ENTRIES_PER_BATCH >= len(entries):
+            parent_updates = {"changelog": firestore.DELETE_FIELD}
+            status_changed_at = _latest_status_change(entries)
+            if status_changed_at and not doc.to_dict().get("status_changed_at"):
+                parent_updates["status_changed_at"] = status_changed_at
+            batch.update(doc.reference, parent_updates)
+        batch.commit()
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Write changes (default is a dry run)")
+    args = parser.parse_args()
+
+    for collection in COLLECTIONS:
+        migrated_docs = 0
+        migrated_entries = 0
+        for doc in db.collection(collection).stream():
+            count = migrate_document(doc, args.apply)
+            if count:
+                migrated_docs += 1
+                migrated_entries += count
+        verb = "Migrated" if args.apply else "Would migrate"
+        print(f"{collection}: {verb} {migrated_entries} entries across {migrated_docs} documents")
+
+
+if __name__ == "__main__":
+    main()
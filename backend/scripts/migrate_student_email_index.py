@@ -0,0 +1,74 @@
+"""
+One-time migration: build `student_email_index` for existing student_users
+(see reusable_components/student_users.py).
+
+Every student_users document gets an index entry keyed by its normalized
+email. When several documents share an email, the entry points at the one
+with the `student` role (else the oldest) and the duplicates are listed so
+they can be merged by hand. Existing index entries are left alone, so
+re-running the script is safe. Until it has run, lookups fall back to the
+legacy email query.
+
+Usage:
+  python scripts/migrate_student_email_index.py            # dry run
+  python scripts/migrate_student_email_index.py --apply
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firebase_admin import firestore
+
+from reusable_components.bulk_writes import BulkMutation
+from reusable_components.firebase import db
+from reusable_components.student_users import STUDENT_EMAIL_INDEX_COLLECTION, normalize_email
+
+
+def _preference(doc) -> tuple:
+    data = doc.to_dict()
+    created_at = data.get("created_at")
+    return (data.get("role") != "student", created_at.timestamp() if hasattr(created_at, "timestamp") else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Write changes (default is a dry run)")
+    args = parser.parse_args()
+
+    by_email: dict[str, list] = {}
+    for doc in db.collection("student_users").stream():
+        email = normalize_email(doc.to_dict().get("email"))
+        if email:
+            by_email.setdefault(email, []).append(doc)
+
+    indexed = {doc.id for doc in db.collection(STUDENT_EMAIL_INDEX_COLLECTION).stream()}
+
+    bulk = BulkMutation()
+    index_col = db.collection(STUDENT_EMAIL_INDEX_COLLECTION)
+    for email, docs in sorted(by_email.items()):
+        docs.sort(key=_preference)
+        if len(docs) > 1:
+            print(f"duplicate: {email} -> keeping {docs[0].id}, also {[d.id for d in docs[1:]]}")
+        if email in indexed:
+            continue
+        bulk.set(index_col.document(email), {
+            "student_id": docs[0].id,
+            "email": email,
+            "updated_at": firestore.SERVER_TIMESTAMP,
+        })
+
+    if not args.apply:
+        print(f"Would index {len(bulk)} of {len(by_email)} emails ({len(indexed)} already indexed)")
+        return
+
+    result = bulk.commit()
+    print(f"Indexed {len(result['succeeded'])} emails, {len(result['failed'])} failed")
+    for failure in result["failed"]:
+        print(f"  failed: {failure['id']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from unittest.mock import MagicMock
 sys.modules["reusable_components"] = types.ModuleType("reusable_components")
 sys.modules["reusable_components.auth"] = MagicMock()
 sys.modules["reusable_components.firebase"] = MagicMock()
+sys.modules["reusable_components.firestore_repository"] = MagicMock()
 sys.modules["fastapi"] = MagicMock()
 sys.modules["fastapi.responses"] = MagicMock()
 
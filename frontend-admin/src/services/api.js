@@ -9,6 +9,9 @@ const api = axios.create({
   },
 })
 
+// Document links in API payloads are root-relative ('/api/documents/...'); resolve them against the API host
+export const apiLink = (path) => (path && path.startsWith('/api/') ? API_BASE_URL.replace(/\/api\/?$/, '') + path : path)
+
 // Attach Bearer token to every request
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('admin_token')
@@ -81,11 +84,34 @@ export const getCategories = async () => {
   return response.data
 }
 
-export const getEnrollments = async () => {
-  const response = await api.get('/enrollments')
+// Server-filtered page: params = { status, course, sponsor_id, created_from, created_to, stale_days, limit, cursor, view }
+// view: 'summary' returns slim list rows (no changelog/emails_sent/documents)
+// stale_days: only rows whose status changed at least N days ago (oldest first)
+// limit defaults to 50 on the server (max 200)
+// Returns { items, next_cursor }
+export const getEnrollmentsPage = async (params) => {
+  const response = await api.get('/enrollments', { params })
   return response.data
 }
 
+// Every row matching params, fetched page by page (for exports)
+export const getAllEnrollments = async (params) => {
+  const items = []
+  let cursor = null
+  do {
+    const page = await getEnrollmentsPage({ ...params, limit: 200, cursor: cursor || undefined })
+    items.push(...page.items)
+    cursor = page.next_cursor
+  } while (cursor)
+  return items
+}
+
+// Number of enrollments matching { status, course, sponsor_id }
+export const getEnrollmentCount = async (params) => {
+  const response = await api.get('/enrollments/count', { params })
+  return response.data.count
+}
+
 export const sendInterviewSchedule = async (enrollmentId) => {
   const response = await api.post(`/enrollments/${enrollmentId}/send-interview-schedule`)
   return response.data
@@ -10,6 +10,9 @@ const api = axios.create({
   },
 })
 
+// Document links in API payloads are root-relative ('/api/documents/...'); resolve them against the API host
+export const apiLink = (path) => (path && path.startsWith('/api/') ? API_BASE_URL.replace(/\/api\/?$/, '') + path : path)
+
 export const getCourses = async () => {
   const response = await api.get('/courses')
   return response.data
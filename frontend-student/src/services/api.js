@@ -9,6 +9,9 @@ const api = axios.create({
   },
 })
 
+// Document links in API payloads are root-relative ('/api/documents/...'); resolve them against the API host
+export const apiLink = (path) => (path && path.startsWith('/api/') ? API_BASE_URL.replace(/\/api\/?$/, '') + path : path)
+
 // Attach Bearer token to every request
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('student_token')